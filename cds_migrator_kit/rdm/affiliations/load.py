@@ -6,15 +6,11 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM migration load module."""
-import json
-import logging
-import os
-
-import psycopg2
 from cds_rdm.legacy.models import CDSMigrationAffiliationMapping
 from invenio_db import db
 from invenio_rdm_migrator.load.base import Load
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import null
+from sqlalchemy.dialects.postgresql import insert
 
 from .log import AffiliationsLogger
 
@@ -22,48 +18,91 @@ logger = AffiliationsLogger.get_logger()
 
 
 class CDSAffiliationsLoad(Load):
-    """CDSAffiliationsLoad."""
+    """CDSAffiliationsLoad.
+
+    The affiliations are buffered and inserted ``batch_size`` at a time, the
+    ones already in the table being skipped by the database.
+    """
 
     def __init__(
         self,
         dry_run=False,
+        batch_size=1000,
     ):
         """Constructor."""
         self.dry_run = dry_run
+        self.batch_size = batch_size
+        self._buffer = []
+        # legacy inputs of the run, buffered or inserted
+        self._seen = set()
 
     def _prepare(self, entry):
         """Prepare the record."""
         pass
 
     def _save_affiliation(self, affiliations):
-        """."""
+        """Buffer the new affiliations, inserting them by batch."""
         for affiliation in affiliations:
-            _affiliation_model = None
             _original_input = affiliation.pop("original_input")
+            if _original_input in self._seen:
+                continue
+            self._seen.add(_original_input)
+            _affiliation = {
+                "legacy_affiliation_input": _original_input,
+                "ror_exact_match": null(),
+                "ror_not_exact_match": null(),
+                "ror_match_info": null(),
+            }
+            if affiliation.get("ror_exact_match"):
+                _affiliation["ror_exact_match"] = affiliation["ror_exact_match"]
+                _affiliation["ror_match_info"] = affiliation["ror_match_info"]
+            elif affiliation.get("ror_not_exact_match"):
+                _affiliation["ror_not_exact_match"] = affiliation["ror_not_exact_match"]
+                _affiliation["ror_match_info"] = affiliation["ror_match_info"]
+            self._buffer.append(_affiliation)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def _insert(self, affiliations):
+        """Insert affiliations, skipping the existing ones."""
+        table = CDSMigrationAffiliationMapping.__table__
+        stmt = (
+            insert(table)
+            .values(affiliations)
+            .on_conflict_do_nothing(index_elements=[table.c.legacy_affiliation_input])
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+
+    def _flush(self):
+        """Insert the buffered affiliations.
+
+        If the batch fails, the affiliations are inserted one by one, to
+        insert the valid ones and report the errors of each of the others.
+        """
+        if not self._buffer:
+            return
+        affiliations, self._buffer = self._buffer, []
+        try:
+            self._insert(affiliations)
+            return
+        except Exception as ex:
+            db.session.rollback()
+            if len(affiliations) == 1:
+                logger.error(
+                    f"Failed to load affiliation "
+                    f"{affiliations[0]['legacy_affiliation_input']!r}: {ex}"
+                )
+                return
+        for affiliation in affiliations:
             try:
-                if affiliation.get("ror_exact_match"):
-                    _affiliation_model = CDSMigrationAffiliationMapping(
-                        legacy_affiliation_input=_original_input,
-                        ror_exact_match=affiliation["ror_exact_match"],
-                        ror_match_info=affiliation["ror_match_info"],
-                    )
-                elif affiliation.get("ror_not_exact_match"):
-                    _affiliation_model = CDSMigrationAffiliationMapping(
-                        legacy_affiliation_input=_original_input,
-                        ror_not_exact_match=affiliation["ror_not_exact_match"],
-                        ror_match_info=affiliation["ror_match_info"],
-                    )
-                else:
-                    _affiliation_model = CDSMigrationAffiliationMapping(
-                        legacy_affiliation_input=_original_input,
-                    )
-                db.session.add(_affiliation_model)
-                db.session.commit()
-            except IntegrityError as e:
+                self._insert([affiliation])
+            except Exception as ex:
                 db.session.rollback()
-                # We continue when the legacy affiliation input is already in the db
-                if isinstance(e.orig, psycopg2.errors.UniqueViolation):
-                    continue
+                logger.error(
+                    f"Failed to load affiliation "
+                    f"{affiliation['legacy_affiliation_input']!r}: {ex}"
+                )
 
     def _load(self, entry):
         """Use the services to load the entries."""
@@ -76,6 +115,11 @@ class CDSAffiliationsLoad(Load):
             except Exception as ex:
                 logger.error(ex)
 
+    def run(self, entries, cleanup=False):
+        """Load the entries, then the affiliations left in the buffer."""
+        super().run(entries, cleanup=cleanup)
+        self._flush()
+
     def _cleanup(self, *args, **kwargs):
         """Cleanup the entries."""
         pass
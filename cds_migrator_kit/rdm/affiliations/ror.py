@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration ROR organizations lookups module."""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+cli_logger = logging.getLogger("migrator")
+
+ROR_API_URL = "https://api.ror.org/organizations"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def normalize_affiliation(affiliation):
+    """Normalize an affiliation string, to look it up once per spelling."""
+    return " ".join(affiliation.split()).casefold()
+
+
+def ror_session(pool_size=10, retries=3):
+    """Return an HTTP session with a pool of connections to the ROR API."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=(
+            Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=RETRY_STATUSES,
+            )
+            if retries
+            else 0
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RORAffiliationCache:
+    """On-disk cache of the ROR lookups, keyed by normalized affiliation.
+
+    The (chosen, match or candidates) result of a lookup is stored as JSON in
+    a SQLite database, so that a new run does not query the ROR API again for
+    the affiliations already looked up.
+    """
+
+    def __init__(self, filepath):
+        """Constructor."""
+        self.filepath = str(filepath)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.filepath, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS ror_affiliations ("
+                "affiliation TEXT PRIMARY KEY, chosen INTEGER, payload TEXT)"
+            )
+
+    def get(self, affiliation):
+        """Return the cached result of an affiliation, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT chosen, payload FROM ror_affiliations WHERE affiliation = ?",
+                (normalize_affiliation(affiliation),),
+            ).fetchone()
+        if row is None:
+            return None
+        chosen, payload = row
+        return (bool(chosen), json.loads(payload))
+
+    def set(self, affiliation, result):
+        """Cache the result of an affiliation lookup."""
+        chosen, payload = result
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ror_affiliations VALUES (?, ?, ?)",
+                (normalize_affiliation(affiliation), int(chosen), json.dumps(payload)),
+            )
+
+    def __len__(self):
+        """Return the number of cached affiliations."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM ror_affiliations"
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+
+def parse_ror_response(items):
+    """Return the (chosen, match or candidates) of the ROR affiliation items."""
+    if items:
+        for item in items:
+            if item["chosen"] is True:
+                return (True, item)
+    return (False, items)
+
+
+def affiliations_search(affiliation_name, session=None, cache=None, url=ROR_API_URL):
+    """Query ROR organizations API to normalize affiliations.
+
+    :param session: HTTP session to reuse the connections of, see
+        :func:`ror_session`.
+    :param cache: :class:`RORAffiliationCache` of the previous lookups.
+    :returns: ``(True, match)`` for the chosen organization, else ``(False,
+        candidates)``, or ``None`` if the ROR API could not be queried.
+    """
+    assert affiliation_name
+
+    if cache is not None:
+        cached = cache.get(affiliation_name)
+        if cached is not None:
+            return cached
+
+    params = {"affiliation": affiliation_name}
+    try:
+        response = (session or requests).get(url, params=params)
+        response.raise_for_status()
+        result = parse_ror_response(response.json().get("items"))
+    except requests.exceptions.HTTPError as http_err:
+        cli_logger.exception(http_err)
+        return None
+    except Exception as err:
+        cli_logger.exception(err)
+        return None
+
+    if cache is not None:
+        cache.set(affiliation_name, result)
+    return result
+
+
+class TokenBucket:
+    """Token bucket limiting the rate of the ROR requests of an event loop.
+
+    ``rate`` tokens are added per second, up to ``capacity``. A token is
+    reserved by each request, waiting for it when the bucket is empty.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """Constructor."""
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _reserve(self):
+        """Reserve a token, returning the time to wait for it."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        return max(0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        """Wait for a token."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class _Retry(Exception):
+    """A ROR request to retry."""
+
+
+class AsyncRORResolver:
+    """Resolve many affiliations concurrently with the ROR API.
+
+    The requests are sent from an asyncio event loop, at most
+    ``concurrency`` at a time and ``rate`` per second, through a pooled
+    session. The requests failing with a connection error, a timeout or a
+    429 or 5xx response are retried ``retries`` times with an exponential
+    backoff.
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        url=ROR_API_URL,
+        concurrency=8,
+        rate=None,
+        retries=3,
+        backoff=0.5,
+        timeout=30,
+    ):
+        """Constructor.
+
+        :param cache: :class:`RORAffiliationCache` of the previous lookups.
+        :param rate: maximum number of requests per second, if any.
+        """
+        self.cache = cache
+        self.url = url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate) if rate else None
+        # the retries are done by the resolver
+        self.session = ror_session(pool_size=concurrency, retries=0)
+
+    def _get(self, affiliation_name):
+        response = self.session.get(
+            self.url, params={"affiliation": affiliation_name}, timeout=self.timeout
+        )
+        if response.status_code in RETRY_STATUSES:
+            raise _Retry(f"{response.status_code} for {response.url}")
+        response.raise_for_status()
+        return parse_ror_response(response.json().get("items"))
+
+    async def _search(self, affiliation_name, semaphore):
+        """Look up an affiliation, see :func:`affiliations_search`."""
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    if self.bucket:
+                        await self.bucket.acquire()
+                    return await asyncio.to_thread(self._get, affiliation_name)
+            except (
+                _Retry,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as err:
+                if attempt == self.retries:
+                    cli_logger.error(f"ROR lookup of {affiliation_name} failed: {err}")
+                    return None
+                await asyncio.sleep(self.backoff * 2**attempt)
+            except Exception as err:
+                cli_logger.exception(err)
+                return None
+
+    async def _search_all(self, affiliation_names):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(
+            *(self._search(name, semaphore) for name in affiliation_names)
+        )
+
+    def resolve(self, affiliation_names):
+        """Look up the distinct affiliations of a batch.
+
+        :returns: the results by normalized affiliation, ``None`` for the
+            affiliations which could not be looked up.
+        """
+        to_search = {}
+        results = {}
+        for affiliation_name in affiliation_names:
+            key = normalize_affiliation(affiliation_name)
+            if key in results or key in to_search:
+                continue
+            cached = self.cache.get(affiliation_name) if self.cache else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                to_search[key] = affiliation_name
+
+        if to_search:
+            searched = asyncio.run(self._search_all(list(to_search.values())))
+            for (key, affiliation_name), result in zip(to_search.items(), searched):
+                results[key] = result
+                if result is not None and self.cache is not None:
+                    self.cache.set(affiliation_name, result)
+        return results
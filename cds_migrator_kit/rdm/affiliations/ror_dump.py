@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration offline ROR matching module."""
+
+import json
+import re
+import unicodedata
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+
+from Levenshtein import ratio
+
+# words too common to tell organizations apart
+STOP_WORDS = {"and", "de", "der", "des", "di", "du", "for", "la", "of", "the", "und"}
+
+# abbreviations of the legacy affiliations
+ABBREVIATIONS = {
+    "ctr": "center",
+    "dept": "department",
+    "inst": "institute",
+    "intl": "international",
+    "lab": "laboratory",
+    "natl": "national",
+    "univ": "university",
+}
+
+
+def normalize_name(name):
+    """Normalize an organization name: no accents, case or punctuation."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(
+        ABBREVIATIONS.get(token, token)
+        for token in re.sub(r"[^\w]+", " ", name.casefold()).split()
+    )
+
+
+def _tokens(normalized_name):
+    return {
+        token
+        for token in normalized_name.split()
+        if len(token) > 1 and token not in STOP_WORDS
+    }
+
+
+def read_ror_dump(filepath):
+    """Return the organizations of a ROR data dump, JSON or zipped JSON."""
+    filepath = Path(filepath)
+    if not zipfile.is_zipfile(filepath):
+        with open(filepath, encoding="utf-8") as dump_file:
+            return json.load(dump_file)
+    with zipfile.ZipFile(filepath) as dump_zip:
+        members = [name for name in dump_zip.namelist() if name.endswith(".json")]
+        # the dumps ship both schemas, prefer the v2 one
+        members.sort(key=lambda name: not name.endswith("schema_v2.json"))
+        with dump_zip.open(members[0]) as dump_file:
+            return json.load(dump_file)
+
+
+def _organization_names(organization):
+    """Return the display name and the (name, type) of a ROR organization.
+
+    Both the v1 (``name``, ``aliases``, ``acronyms``, ``labels``) and the v2
+    (``names``) schemas of the ROR data dumps are supported.
+    """
+    if "names" in organization:
+        display_name = None
+        names = []
+        for name in organization["names"]:
+            types = name.get("types", [])
+            if "ror_display" in types:
+                display_name = name["value"]
+            name_type = "acronym" if "acronym" in types else "name"
+            names.append((name["value"], name_type))
+        return display_name or names[0][0], names
+    names = [(organization["name"], "name")]
+    names += [(alias, "name") for alias in organization.get("aliases", [])]
+    names += [(label["label"], "name") for label in organization.get("labels", [])]
+    names += [(acronym, "acronym") for acronym in organization.get("acronyms", [])]
+    return organization["name"], names
+
+
+class RORDumpMatcher:
+    """Match affiliations against the organizations of a ROR data dump.
+
+    The names, aliases, labels and acronyms of the organizations are indexed
+    in memory. An affiliation is only compared to the organizations sharing
+    one of its least frequent words, and scored by the Levenshtein ratio of
+    the normalized names. The results follow the ``affiliation`` endpoint of
+    the ROR API: ``(True, match)`` for an organization whose name is the
+    affiliation, else ``(False, candidates)`` sorted by score.
+    """
+
+    def __init__(self, organizations, max_candidates=10, max_block_size=2000):
+        """Constructor.
+
+        :param organizations: organizations of a ROR data dump.
+        :param max_candidates: number of candidates returned for a fuzzy match.
+        :param max_block_size: number of organizations compared at most to an
+            affiliation.
+        """
+        self.max_candidates = max_candidates
+        self.max_block_size = max_block_size
+        self._organizations = []
+        # normalized name of each organization, by organization
+        self._names = []
+        self._exact_names = defaultdict(set)
+        self._acronyms = defaultdict(set)
+        self._blocks = defaultdict(set)
+
+        for organization in organizations:
+            if organization.get("status", "active") != "active":
+                continue
+            display_name, names = _organization_names(organization)
+            index = len(self._organizations)
+            self._organizations.append({"id": organization["id"], "name": display_name})
+            normalized_names = set()
+            for name, name_type in names:
+                normalized = normalize_name(name)
+                if not normalized:
+                    continue
+                if name_type == "acronym":
+                    self._acronyms[normalized].add(index)
+                    continue
+                normalized_names.add(normalized)
+                self._exact_names[normalized].add(index)
+                for token in _tokens(normalized):
+                    self._blocks[token].add(index)
+            self._names.append(normalized_names)
+
+    @classmethod
+    def from_dump(cls, filepath, **kwargs):
+        """Build the matcher of a ROR data dump file."""
+        return cls(read_ror_dump(filepath), **kwargs)
+
+    def _item(self, index, score, matching_type, affiliation, chosen=False):
+        return {
+            "substring": affiliation,
+            "score": round(score, 2),
+            "matching_type": matching_type,
+            "chosen": chosen,
+            "organization": self._organizations[index],
+        }
+
+    def _block(self, tokens):
+        """Return the organizations sharing the least frequent words."""
+        blocks = sorted(
+            (self._blocks[token] for token in tokens if token in self._blocks),
+            key=len,
+        )
+        candidates = set()
+        for block in blocks:
+            if candidates and len(candidates) + len(block) > self.max_block_size:
+                break
+            candidates.update(block)
+        return candidates
+
+    def search(self, affiliation_name):
+        """Match an affiliation, see :func:`affiliations_search`."""
+        normalized = normalize_name(affiliation_name)
+        exact = self._exact_names.get(normalized, set())
+        if len(exact) == 1:
+            (index,) = exact
+            return (True, self._item(index, 1.0, "EXACT", affiliation_name, True))
+
+        scores = {index: 1.0 for index in exact}
+        matching_types = {index: "EXACT" for index in exact}
+        for index in self._acronyms.get(normalized, ()):
+            scores[index] = 1.0
+            matching_types.setdefault(index, "ACRONYM")
+        for index in self._block(_tokens(normalized)):
+            if index in scores:
+                continue
+            scores[index] = max(ratio(normalized, name) for name in self._names[index])
+            matching_types[index] = "FUZZY"
+
+        best = sorted(scores.items(), key=lambda item: -item[1])
+        return (
+            False,
+            [
+                self._item(index, score, matching_types[index], affiliation_name)
+                for index, score in best[: self.max_candidates]
+            ],
+        )
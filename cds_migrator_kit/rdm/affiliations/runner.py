@@ -12,12 +12,23 @@ from pathlib import Path
 from invenio_rdm_migrator.streams import Stream
 
 from cds_migrator_kit.rdm.affiliations.log import AffiliationsLogger
+from cds_migrator_kit.rdm.affiliations.transform import AFFILIATIONS_MARC_TAGS
 
 
 class RecordAffiliationsRunner:
     """ETL streams runner."""
 
-    def __init__(self, stream_definition, filepath, log_dir, dry_run):
+    def __init__(
+        self,
+        stream_definition,
+        filepath,
+        log_dir,
+        dry_run,
+        ror_cache_filepath=None,
+        ror_dump_filepath=None,
+        ror_concurrency=None,
+        ror_rate_limit=None,
+    ):
         """Constructor."""
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -27,7 +38,13 @@ class RecordAffiliationsRunner:
         self.stream = Stream(
             stream_definition.name,
             extract=stream_definition.extract_cls(filepath),
-            transform=stream_definition.transform_cls(),
+            transform=stream_definition.transform_cls(
+                ror_cache_filepath=ror_cache_filepath,
+                ror_dump_filepath=ror_dump_filepath,
+                ror_concurrency=ror_concurrency,
+                ror_rate_limit=ror_rate_limit,
+                marc_tags=AFFILIATIONS_MARC_TAGS,
+            ),
             load=stream_definition.load_cls(dry_run=dry_run),
         )
 
@@ -8,45 +8,28 @@
 """CDS-RDM transform step module."""
 import logging
 from copy import deepcopy
+from itertools import islice
 
-import requests
 from invenio_rdm_migrator.streams.records.transform import RDMRecordTransform
 
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 
 from . import affiliations_migrator_marc21
 from .log import AffiliationsLogger
+from .ror import (
+    ROR_API_URL,
+    AsyncRORResolver,
+    RORAffiliationCache,
+    affiliations_search,
+    normalize_affiliation,
+    ror_session,
+)
+from .ror_dump import RORDumpMatcher
 
 cli_logger = logging.getLogger("migrator")
 
-
-def affiliations_search(affiliation_name):
-    """Query ROR organizations API to normalize affiliations."""
-
-    def get_ror_affiliation(affiliation):
-        """Query ROR organizations API to normalize affiliations."""
-        assert affiliation
-
-        url = "https://api.ror.org/organizations"
-        params = {"affiliation": affiliation}
-
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            items = response.json().get("items")
-            if items:
-                for item in items:
-                    if item["chosen"] is True:
-                        return (True, item)
-            return (False, items)
-        except requests.exceptions.HTTPError as http_err:
-            cli_logger.exception(http_err)
-        except Exception as err:
-            cli_logger.exception(err)
-
-    (chosen, affiliation) = get_ror_affiliation(affiliation_name)
-
-    return (chosen, affiliation)
+# creators and contributors, with their affiliations
+AFFILIATIONS_MARC_TAGS = ("100", "700", "701")
 
 
 class CDSToRDMAffiliationTransform(RDMRecordTransform):
@@ -55,11 +38,70 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
     def __init__(
         self,
         dry_run=False,
+        ror_cache_filepath=None,
+        ror_url=ROR_API_URL,
+        ror_dump_filepath=None,
+        ror_concurrency=None,
+        ror_rate_limit=None,
+        batch_size=100,
+        marc_tags=None,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param ror_cache_filepath: path of the on-disk cache of the ROR lookups,
+            kept between runs.
+        :param ror_dump_filepath: path of a ROR data dump to match the
+            affiliations offline with, instead of the ROR API.
+        :param ror_concurrency: number of concurrent ROR requests. When set, the
+            affiliations of ``batch_size`` records are looked up at once.
+        :param ror_rate_limit: maximum number of ROR requests per second.
+        :param marc_tags: MARC tags to parse, all of them if not set.
+        """
         self.dry_run = dry_run
+        self.marc_tags = marc_tags
+        self.ror_matcher = (
+            RORDumpMatcher.from_dump(ror_dump_filepath) if ror_dump_filepath else None
+        )
+        self.ror_url = ror_url
+        self.ror_session = ror_session()
+        self.ror_cache = (
+            RORAffiliationCache(ror_cache_filepath) if ror_cache_filepath else None
+        )
+        self.ror_resolver = None
+        if ror_concurrency and not self.ror_matcher:
+            self.ror_resolver = AsyncRORResolver(
+                cache=self.ror_cache,
+                url=ror_url,
+                concurrency=ror_concurrency,
+                rate=ror_rate_limit,
+            )
+        self.batch_size = batch_size
+        # results of the run, by normalized affiliation
+        self._ror_results = {}
         super().__init__()
 
+    def _affiliations_search(self, affiliation_name):
+        """Look up each distinct affiliation of the run once."""
+        key = normalize_affiliation(affiliation_name)
+        if key not in self._ror_results:
+            if self.ror_resolver:
+                # looked up with the batch of the record, and failed
+                return None
+            if self.ror_matcher:
+                result = self.ror_matcher.search(affiliation_name)
+            else:
+                result = affiliations_search(
+                    affiliation_name,
+                    session=self.ror_session,
+                    cache=self.ror_cache,
+                    url=self.ror_url,
+                )
+            if result is None:
+                # not cached, the lookup failed
+                return result
+            self._ror_results[key] = result
+        return self._ror_results[key]
+
     def _affiliations(self, json_entry, key):
         _creators = deepcopy(json_entry.get(key, []))
         _creators = list(filter(lambda x: x is not None, _creators))
@@ -76,7 +118,9 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
                     "original_input": affiliation_name,
                 }
 
-                (chosen, match_or_suggestions) = affiliations_search(affiliation_name)
+                (chosen, match_or_suggestions) = self._affiliations_search(
+                    affiliation_name
+                )
 
                 if chosen:
                     _affiliation.update(
@@ -104,14 +148,14 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
 
         return _affiliations
 
-    def _transform(self, entry):
-        """Transform a single entry."""
-        # creates the output structure for load step
+    def _record_json(self, entry):
+        """Return the latest revision of the record."""
         try:
             record_dump = CDSRecordDump(
                 entry,
                 dojson_model=affiliations_migrator_marc21,
                 raise_on_missing_rules=False,
+                marc_tags=self.marc_tags,
             )
             record_dump.prepare_revisions()
         except Exception as e:
@@ -119,6 +163,10 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
             logger.error(str(e))
 
         timestamp, json_data = record_dump.latest_revision
+        return json_data
+
+    def _transform_json(self, json_data):
+        """Transform the latest revision of a record."""
         try:
             return {
                 "creators_affiliations": self._affiliations(json_data, "creators"),
@@ -129,6 +177,49 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
         except Exception as e:
             cli_logger.exception(e)
 
+    def _transform(self, entry):
+        """Transform a single entry."""
+        # creates the output structure for load step
+        return self._transform_json(self._record_json(entry))
+
+    def _resolve_batch(self, records):
+        """Look up the new affiliations of a batch of records concurrently."""
+        affiliation_names = [
+            affiliation_name
+            for json_data in records
+            for key in ("creators", "contributors")
+            for creator in json_data.get(key) or []
+            if creator
+            for affiliation_name in creator.get("affiliations", [])
+            if affiliation_name
+            and normalize_affiliation(affiliation_name) not in self._ror_results
+        ]
+        results = self.ror_resolver.resolve(affiliation_names)
+        for key, result in results.items():
+            if result is not None:
+                self._ror_results[key] = result
+
+    def run(self, entries):
+        """Transform the entries, looking up their affiliations by batch."""
+        if not self.ror_resolver:
+            yield from super().run(entries)
+            return
+
+        entries = iter(entries)
+        while batch := list(islice(entries, self.batch_size)):
+            records = []
+            for entry in batch:
+                try:
+                    records.append(self._record_json(entry))
+                except Exception:
+                    self.logger.exception(entry, exc_info=True)
+                    if self._throw:
+                        raise
+            self._resolve_batch(records)
+            # in the order of the records
+            for json_data in records:
+                yield self._transform_json(json_data)
+
     def _draft(self, entry):
         return None
 
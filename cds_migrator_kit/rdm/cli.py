@@ -6,13 +6,16 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM command line module."""
+import json
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
 
 import click
 from flask import current_app
 from flask.cli import with_appcontext
+from opensearchpy import OpenSearch
 
 from cds_migrator_kit.rdm.affiliations.runner import RecordAffiliationsRunner
 from cds_migrator_kit.rdm.affiliations.streams import AffiliationsStreamDefinition
@@ -21,12 +24,18 @@ from cds_migrator_kit.rdm.comments.streams import (
     CommenterStreamDefinition,
     CommentsStreamDefinition,
 )
+from cds_migrator_kit.rdm.records.load.dois import DOIRepublishQueue
 from cds_migrator_kit.rdm.records.streams import (  # UserStreamDefinition,
     RecordEPApprovalStreamDefinition,
     RecordStreamDefinition,
 )
+from cds_migrator_kit.rdm.stats.log import StatsLogger
 from cds_migrator_kit.rdm.stats.runner import RecordStatsRunner
-from cds_migrator_kit.rdm.stats.streams import RecordStatsStreamDefinition
+from cds_migrator_kit.rdm.stats.search import BulkIndexer
+from cds_migrator_kit.rdm.stats.streams import (
+    RecordStatsExportStreamDefinition,
+    RecordStatsStreamDefinition,
+)
 from cds_migrator_kit.rdm.users.runner import PeopleAuthorityRunner, SubmitterRunner
 from cds_migrator_kit.rdm.users.streams import (
     SubmitterStreamDefinition,
@@ -35,6 +44,7 @@ from cds_migrator_kit.rdm.users.streams import (
 from cds_migrator_kit.rdm.users.transform.xml_processing.models.people import (
     PeopleAuthority,
 )
+from cds_migrator_kit.reports.log import MigrationProgressLogger
 from cds_migrator_kit.runner.runner import Runner
 
 cli_logger = logging.getLogger("migrator")
@@ -70,13 +80,30 @@ def migration():
         "Can also be set per-collection in streams.yaml under transform.workers."
     ),
 )
+@click.option(
+    "--load-workers",
+    type=int,
+    default=None,
+    help=(
+        "Number of processes loading the records, sharded by legacy recid. "
+        "Defaults to a single process. "
+        "Can also be set per-collection in streams.yaml under load.workers."
+    ),
+)
 @click.option(
     "--ep-approval",
     is_flag=True,
     help="Use the EP approval load stream (pre-EP draft snapshots without legacy minting).",
 )
 @with_appcontext
-def run(collection, dry_run=False, keep_logs=False, workers=None, ep_approval=False):
+def run(
+    collection,
+    dry_run=False,
+    keep_logs=False,
+    workers=None,
+    load_workers=None,
+    ep_approval=False,
+):
     """Run."""
     stream_config = current_app.config["CDS_MIGRATOR_KIT_STREAM_CONFIG"]
     stream_definition = (
@@ -90,11 +117,73 @@ def run(collection, dry_run=False, keep_logs=False, workers=None, ep_approval=Fa
         collection=collection,
         keep_logs=keep_logs,
         workers=workers,
+        load_workers=load_workers,
     )
 
     runner.run()
 
 
+@migration.group()
+def dois():
+    """Migration CLI for the DOIs of migrated records."""
+    pass
+
+
+@dois.command()
+@click.option(
+    "--collection",
+    help="Collection name of which the queued DOIs will be updated.",
+    required=True,
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    help="Number of threads updating the DOIs concurrently.",
+)
+@click.option(
+    "--rate-limit",
+    type=float,
+    default=None,
+    help="Maximum number of DOI updates per second.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=100,
+)
+@with_appcontext
+def republish(collection, workers, rate_limit, batch_size):
+    """Update the DOI metadata of the records queued during the load."""
+    migration_logger = MigrationProgressLogger(
+        collection=collection,
+        keep_logs=True,
+        log_progress_filename="rdm_doi_republish_errors.csv",
+    )
+    migration_logger.start_log()
+    try:
+        failed = DOIRepublishQueue(collection).process(
+            workers=workers,
+            rate_limit=rate_limit,
+            batch_size=batch_size,
+            migration_logger=migration_logger,
+        )
+    finally:
+        migration_logger.finalise()
+    click.secho(
+        f"DOIs updated, {len(failed)} failed and kept in the queue.",
+        fg="red" if failed else "green",
+    )
+
+
+def _read_recids(filepath):
+    """Read the legacy recids of a file, one per line."""
+    if not filepath:
+        return None
+    with open(filepath) as recids_file:
+        return [line.strip() for line in recids_file if line.strip()]
+
+
 @migration.group()
 def stats():
     """Migration CLI for statistics."""
@@ -115,8 +204,38 @@ def stats():
     default=lambda: datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
     help="ISO string e.g 2024-12-13T20:00:00 to migrate events up to this date.",
 )
+@click.option(
+    "--replay-dir",
+    help="Directory of a snapshot of the legacy events, see `stats export`.",
+)
+@click.option(
+    "--checkpoint",
+    is_flag=True,
+    help="Save the progress of the run, to skip the migrated records when run again.",
+)
+@click.option(
+    "--reset-checkpoints",
+    is_flag=True,
+    help="Migrate all the records again, ignoring the progress of previous runs.",
+)
+@click.option(
+    "--recids-filepath",
+    help="Path to a file of legacy recids, one per line, to restrict the records to.",
+)
+@click.option("--from-recid", type=int, help="Lowest legacy recid, included.")
+@click.option("--to-recid", type=int, help="Highest legacy recid, included.")
 @with_appcontext
-def run(filepath, less_than_date, dry_run=False):
+def run(
+    filepath,
+    less_than_date,
+    replay_dir=None,
+    checkpoint=False,
+    reset_checkpoints=False,
+    recids_filepath=None,
+    from_recid=None,
+    to_recid=None,
+    dry_run=False,
+):
     """Migrate the legacy statistics for the records in `filepath`."""
     stream_config = current_app.config["CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG"]
     stream_config["DEST_SEARCH_INDEX_PREFIX"] = (
@@ -124,6 +243,20 @@ def run(filepath, less_than_date, dry_run=False):
     )
     stream_config["DEST_SEARCH_HOSTS"] = current_app.config["SEARCH_HOSTS"]
     log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "stats"
+    stream_config["VALIDATION_REPORT_FILEPATH"] = str(
+        log_dir / "validation_mismatches.csv"
+    )
+    stream_config["DEST_BULK_RETRY_FILEPATH"] = str(log_dir / "failed_events.ndjson")
+    stream_config["DRY_RUN_OUTPUT_FILEPATH"] = str(log_dir / "dry_run_events.ndjson")
+    stream_config["REPLAY_DIR"] = replay_dir
+    checkpoint_filepath = log_dir / "checkpoints.jsonl"
+    if reset_checkpoints and checkpoint_filepath.exists():
+        checkpoint_filepath.unlink()
+    if checkpoint:
+        stream_config["CHECKPOINT_FILEPATH"] = str(checkpoint_filepath)
+    stream_config["DEST_AGG_INDEX_PREFIX"] = (
+        f"{current_app.config['SEARCH_INDEX_PREFIX']}stats"
+    )
     runner = RecordStatsRunner(
         stream_definition=RecordStatsStreamDefinition,
         filepath=filepath,
@@ -131,10 +264,97 @@ def run(filepath, less_than_date, dry_run=False):
         less_than_date=less_than_date,
         log_dir=log_dir,
         dry_run=dry_run,
+        recids=_read_recids(recids_filepath),
+        from_recid=from_recid,
+        to_recid=to_recid,
     )
     runner.run()
 
 
+@stats.command()
+@click.option(
+    "--filepath",
+    help="Path to the list of records file whose legacy statistics are exported.",
+)
+@click.option(
+    "--output-dir",
+    required=True,
+    help="Directory of the exported gzipped NDJSON shards.",
+)
+@click.option("--shards", default=16, type=int, help="Number of shards.")
+@click.option(
+    "--less-than-date",
+    default=lambda: datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+    help="ISO string e.g 2024-12-13T20:00:00 to export events up to this date.",
+)
+@click.option(
+    "--recids-filepath",
+    help="Path to a file of legacy recids, one per line, to restrict the records to.",
+)
+@click.option("--from-recid", type=int, help="Lowest legacy recid, included.")
+@click.option("--to-recid", type=int, help="Highest legacy recid, included.")
+@with_appcontext
+def export(
+    filepath,
+    output_dir,
+    shards,
+    less_than_date,
+    recids_filepath=None,
+    from_recid=None,
+    to_recid=None,
+):
+    """Export the legacy statistics of the records in `filepath` to local files."""
+    stream_config = current_app.config["CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG"]
+    stream_config["DEST_SEARCH_INDEX_PREFIX"] = (
+        f"{current_app.config['SEARCH_INDEX_PREFIX']}events-stats"
+    )
+    stream_config["DEST_SEARCH_HOSTS"] = current_app.config["SEARCH_HOSTS"]
+    stream_config["EXPORT_DIR"] = output_dir
+    stream_config["EXPORT_SHARDS"] = shards
+    log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "stats"
+    runner = RecordStatsRunner(
+        stream_definition=RecordStatsExportStreamDefinition,
+        filepath=filepath,
+        config=stream_config,
+        less_than_date=less_than_date,
+        log_dir=log_dir,
+        dry_run=False,
+        recids=_read_recids(recids_filepath),
+        from_recid=from_recid,
+        to_recid=to_recid,
+    )
+    runner.run()
+
+
+@stats.command()
+@with_appcontext
+def retry():
+    """Index again the events that failed to index during the previous runs."""
+    stream_config = current_app.config["CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG"]
+    log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "stats"
+    filepath = log_dir / "failed_events.ndjson"
+    if not filepath.exists():
+        click.secho("No failed events to index.", fg="green")
+        return
+    # events failing again are written back to the original file
+    retry_filepath = filepath.with_suffix(".retry.ndjson")
+    os.replace(filepath, retry_filepath)
+
+    StatsLogger.initialize(log_dir)
+    indexer = BulkIndexer.from_config(
+        OpenSearch(hosts=current_app.config["SEARCH_HOSTS"]),
+        StatsLogger.get_logger(),
+        {**stream_config, "DEST_BULK_RETRY_FILEPATH": str(filepath)},
+    )
+    with open(retry_filepath) as retry_file, indexer:
+        indexer.index(json.loads(line) for line in retry_file if line.strip())
+    os.remove(retry_filepath)
+    click.secho(
+        f"Failed events indexed, {indexer.failed} failed again.",
+        fg="red" if indexer.failed else "green",
+    )
+
+
 @migration.group()
 def users():
     """Migration CLI for users by collection."""
@@ -211,8 +431,26 @@ def affiliations():
     "--filepath",
     help="Path to the list of records file that the legacy statistics will be migrated.",
 )
+@click.option(
+    "--ror-dump",
+    help="Path to a ROR data dump (JSON or zip) to match the affiliations offline.",
+)
+@click.option(
+    "--ror-concurrency",
+    default=8,
+    type=int,
+    help="Number of concurrent ROR API requests, 0 to send them one by one.",
+)
+@click.option(
+    "--ror-rate-limit",
+    default=6.0,
+    type=float,
+    help="Maximum number of ROR API requests per second.",
+)
 @with_appcontext
-def affiliations_run(filepath, dry_run=False):
+def affiliations_run(
+    filepath, ror_dump=None, ror_concurrency=8, ror_rate_limit=6.0, dry_run=False
+):
     """Migrate the legacy statistics for the records in `filepath`."""
     log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "affiliations"
     runner = RecordAffiliationsRunner(
@@ -220,6 +458,10 @@ def affiliations_run(filepath, dry_run=False):
         filepath=filepath,
         log_dir=log_dir,
         dry_run=dry_run,
+        ror_cache_filepath=log_dir / "ror_cache.sqlite",
+        ror_dump_filepath=ror_dump,
+        ror_concurrency=ror_concurrency,
+        ror_rate_limit=ror_rate_limit,
     )
     runner.run()
 
@@ -9,27 +9,25 @@
 
 import os
 from datetime import datetime, timezone
+from itertools import islice
 
-from cds_rdm.legacy.resolver import get_pid_by_legacy_recid
 from flask import current_app
 from invenio_access.permissions import system_identity
-from invenio_accounts.models import User
 from invenio_db.uow import UnitOfWork
 from invenio_rdm_migrator.load.base import Load
-from invenio_rdm_records.proxies import current_rdm_records_service
-from invenio_rdm_records.records.api import RDMParent
 from invenio_rdm_records.requests import CommunitySubmission
 from invenio_records_resources.services.uow import RecordCommitOp
 from invenio_requests.customizations.event_types import CommentEventType, LogEventType
 from invenio_requests.proxies import current_events_service, current_requests_service
 from invenio_requests.records.api import RequestEventFormat
-from invenio_requests.records.models import RequestEventModel, RequestMetadata
 from invenio_requests.resolvers.registry import ResolverRegistry
 from invenio_users_resources.proxies import current_users_service
 from invenio_users_resources.records.api import UserAggregate
-from sqlalchemy.exc import NoResultFound
 
 from cds_migrator_kit.errors import ManualImportRequired
+from cds_migrator_kit.rdm.comments.resolver import resolve_legacy_recids
+from cds_migrator_kit.rdm.comments.uow import RecordBulkCommitOp
+from cds_migrator_kit.users.directory import user_directory
 from cds_migrator_kit.users.load import CDSSubmitterLoad
 
 
@@ -46,52 +44,65 @@ class CDSCommentsLoad(Load):
         dry_run=False,
         collection=None,
         reviewers=None,
+        batch_size=500,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param batch_size: number of legacy recids resolved at once.
+        """
         self.dirpath = dirpath  # The directory path where the attached files are stored
         self.dry_run = dry_run
         self.collection = collection
         self.reviewers = reviewers or []
         self.logger = logger.get_logger()
         self.report_logger = logger
+        self.batch_size = batch_size
         self.all_record_versions = {}
+        # legacy recids of the current batch resolved to their RDM records
+        self._resolved_recids = {}
+        # user ids of the commenters of the current batch, by email
+        self._commenters = {}
+        # attached files by legacy recid and comment id, indexed on first use
+        self._attachments = None
+
+    def _index_attachments(self):
+        """Index the attached files of the comments, scanning the directory once.
+
+        The files of a comment are stored in ``<dirpath>/<recid>/<comment_id>/``.
+        """
+        self._attachments = {}
+        if not os.path.isdir(self.dirpath):
+            return
+        with os.scandir(self.dirpath) as recid_entries:
+            for recid_entry in recid_entries:
+                if not recid_entry.is_dir():
+                    continue
+                with os.scandir(recid_entry.path) as comment_entries:
+                    for comment_entry in comment_entries:
+                        if not comment_entry.is_dir():
+                            continue
+                        with os.scandir(comment_entry.path) as file_entries:
+                            self._attachments[
+                                (recid_entry.name, comment_entry.name)
+                            ] = [file_entry.path for file_entry in file_entries]
 
     def get_attached_files_for_comment(self, recid, comment_id):
         """Get the attached files for the comment."""
-        attached_files_directory = os.path.join(
-            self.dirpath, str(recid), str(comment_id)
-        )
-        if os.path.exists(attached_files_directory):
-            return [
-                os.path.join(attached_files_directory, file)
-                for file in os.listdir(attached_files_directory)
-            ]
-        return []
-
-    def get_oldest_record(self, parent_pid_value):
-        latest_record = current_rdm_records_service.read_latest(
-            identity=system_identity, id_=parent_pid_value
-        )
-        search_result = current_rdm_records_service.scan_versions(
-            system_identity,
-            latest_record["id"],
-        )
-        for hit in search_result.hits:
-            self.all_record_versions[hit["versions"]["index"]] = hit
-        oldest_version_index = min(self.all_record_versions.keys())
-        return self.all_record_versions[oldest_version_index]
+        if self._attachments is None:
+            self._index_attachments()
+        return list(self._attachments.get((str(recid), str(comment_id)), []))
 
     def create_event(
         self,
         request,
         data,
         community,
-        uow,
+        events_op,
         legacy_recid,
         count,
         parent_comment_id=None,
     ):
-        """Create a comment event."""
+        """Create a comment event, committed and indexed through ``events_op``."""
         legacy_comment_id = data.get("comment_id")
         self.logger.info(
             "Creating event for legacy recid ID<{}> request ID<{}> comment ID<{}>".format(
@@ -219,10 +230,10 @@ class CDSCommentsLoad(Load):
                 )
 
         user_email = data.get("user_email")
-        user = User.query.filter_by(email=user_email).one_or_none()
-        if user:
+        user_id = self._commenters.get(user_email)
+        if user_id:
             event.created_by = ResolverRegistry.resolve_entity_proxy(
-                {"user": str(user.id)}, raise_=True
+                {"user": str(user_id)}, raise_=True
             )
         else:
             raise ManualImportRequired(
@@ -240,8 +251,9 @@ class CDSCommentsLoad(Load):
         event.model.created = created_at
         event.model.version_id = 0
 
-        # Since we are not using the services to create the event, we need to register the commit operation manually for indexing
-        uow.register(RecordCommitOp(event, indexer=current_events_service.indexer))
+        # Since we are not using the services to create the event, we need to commit it
+        # manually, the events of the request are indexed at once
+        events_op.add(event)
 
         self.report_logger.add_comment_log(
             id=count
@@ -267,31 +279,6 @@ class CDSCommentsLoad(Load):
                 reviewers.append(reviewer)
         return reviewers
 
-    def _get_existing_request(self, legacy_recid):
-        """Return the request with number ``lrecid:{legacy_recid}``, if any."""
-        model = RequestMetadata.query.filter_by(
-            number=f"lrecid:{legacy_recid}"
-        ).one_or_none()
-        if model is None:
-            return None
-        return current_requests_service.record_cls.get_record(model.id)
-
-    def _request_has_migrated_comments(self, request):
-        """Return True if migrated comment events already exist on the request."""
-        if RequestEventModel.query.filter_by(
-            request_id=request.id, type=CommentEventType.type_id
-        ).first():
-            return True
-
-        # Deleted legacy comments are stored as log events
-        for row in RequestEventModel.query.filter_by(
-            request_id=request.id, type=LogEventType.type_id
-        ):
-            payload = (row.json or {}).get("payload") or {}
-            if payload.get("event") == "comment_deleted":
-                return True
-        return False
-
     def _apply_reviewers(self, request):
         """Add configured reviewers that are not already on the request."""
         configured = self._configured_reviewers()
@@ -324,10 +311,12 @@ class CDSCommentsLoad(Load):
         community = parent.communities.default
         self.LEGACY_REPLY_LINK_MAP = {}
         count = 0
+        events_op = RecordBulkCommitOp(indexer=current_events_service.indexer)
+        uow.register(events_op)
 
         for comment_data in comments:
             comment_event = self.create_event(
-                request, comment_data, community, uow, legacy_recid, count
+                request, comment_data, community, events_op, legacy_recid, count
             )
             count += 1
             for reply in comment_data.get("replies", []):
@@ -335,7 +324,7 @@ class CDSCommentsLoad(Load):
                     request,
                     reply,
                     community,
-                    uow,
+                    events_op,
                     legacy_recid,
                     count=count,
                     parent_comment_id=comment_event.id,
@@ -396,8 +385,7 @@ class CDSCommentsLoad(Load):
                 request = request_item._record
                 request.status = "accepted"
                 request.number = f"lrecid:{legacy_recid}"
-                created_at = datetime.fromisoformat(record["created"])
-                request.model.created = created_at
+                request.model.created = record.created
                 self.logger.info(
                     f"Created accepted community submission request<{request.id}> "
                     f"for record<{record['id']}>."
@@ -427,50 +415,28 @@ class CDSCommentsLoad(Load):
         )
         return request
 
-    def _resolve_record_and_parent(self, recid):
-        """Resolve the RDM parent and oldest record version for comments.
-
-        Legacy recid PIDs are minted on the public parent. For EP-approval
-        migrations, comments must instead target the restricted (internal)
-        parent, linked via ``permission_flags.committee_approval.source_internal_version``.
-        Non-EP records keep the legacy-recid → parent → oldest version path.
-        """
-        parent_pid = get_pid_by_legacy_recid(recid)
-        parent = RDMParent.pid.resolve(parent_pid.pid_value)
-        parent_pid_value = parent_pid.pid_value
-
-        internal_version = (
-            (parent.get("permission_flags") or {})
-            .get("committee_approval", {})
-            .get("source_internal_version")
-        )
-        if internal_version:
-            self.logger.info(
-                f"EP approval record detected for recid: {recid}. "
-                f"Resolving comments target via internal version: {internal_version}"
-            )
-            internal_record = current_rdm_records_service.read(
-                identity=system_identity, id_=internal_version
-            )
-            parent_pid_value = internal_record["parent"]["id"]
-            parent = RDMParent.pid.resolve(parent_pid_value)
-
-        self.all_record_versions = {}
-        oldest_record = self.get_oldest_record(parent_pid_value)
-        return oldest_record, parent
-
     def _process_legacy_comments_for_recid(self, recid, comments):
         """Process the legacy comments for the record."""
         self.logger.info(f"Processing legacy comments for recid: {recid}")
-        oldest_record, parent = self._resolve_record_and_parent(recid)
+        resolved = self._resolved_recids.get(str(recid))
+        if resolved is None:
+            raise ManualImportRequired(
+                message="Migrated record not found.",
+                field=None,
+                subfield="recid",
+                value=recid,
+                stage="load",
+                recid=recid,
+                priority="critical",
+            )
 
-        existing_request = self._get_existing_request(recid)
-        if existing_request and self._request_has_migrated_comments(existing_request):
+        if resolved["has_migrated_comments"]:
             self.logger.info(
                 f"Skipping recid: {recid} because the request comments are already migrated"
             )
             return None
 
+        existing_request = resolved["request"]
         if self.dry_run:
             target = (
                 f"existing request<{existing_request.id}>"
@@ -482,14 +448,46 @@ class CDSCommentsLoad(Load):
             )
             return None
 
+        self.all_record_versions = resolved["versions"]
+        oldest_record = self.all_record_versions[min(self.all_record_versions)]
         return self.migrate_comments(
             recid,
             oldest_record,
-            parent,
+            resolved["parent"],
             comments=comments,
             request=existing_request,
         )
 
+    @staticmethod
+    def _iter_comments(comments):
+        """Iterate over the comments and their replies."""
+        for comment in comments or []:
+            yield comment
+            yield from comment.get("replies", [])
+
+    def run(self, entries, cleanup=False):
+        """Load the entries, resolving their legacy recids by batch."""
+        entries = iter(entries)
+        while batch := list(islice(entries, self.batch_size)):
+            self._resolved_recids = resolve_legacy_recids(
+                [entry[0] for entry in batch if entry]
+            )
+            self._commenters = user_directory.get_ids_by_email(
+                comment.get("user_email")
+                for entry in batch
+                if entry
+                for comment in self._iter_comments(entry[1])
+            )
+            for entry in batch:
+                if self._validate(entry):
+                    self._prepare(entry)
+                    self._load(entry)
+        self._resolved_recids = {}
+        self._commenters = {}
+
+        if cleanup:
+            self._cleanup()
+
     def _load(self, entry):
         """Use the services to load the entries."""
         if entry:
@@ -528,19 +526,20 @@ class CDSCommentersLoad(CDSSubmitterLoad):
         email = json_entry.get("submitter")
         if not email:
             return
-        try:
-            user = User.query.filter_by(email=email).one()
-            self.logger.info(f"User commenter already exists: {user.id}")
-        except NoResultFound:
-            if self.dry_run:
-                self.logger.info(f"Dry running user commenter creation: {email}")
-                return
-            user_id = self._create_owner(email)
-            if not user_id:
-                self.logger.error(f"Failed to create user commenter: {email}")
-                return
-            user_record = UserAggregate.get_record(user_id)
+        user_id = user_directory.get_id_by_email(email)
+        if user_id:
+            self.logger.info(f"User commenter already exists: {user_id}")
+            return
+        if self.dry_run:
+            self.logger.info(f"Dry running user commenter creation: {email}")
+            return
+        self._create_owner(email)
+
+    def _after_create_users(self, users):
+        """Index the user commenters created."""
+        for user in users.values():
+            user_record = UserAggregate.get_record(user.id)
             current_users_service.indexer.index(user_record)
             self.logger.info(
-                f"Successfully created and indexed user commenter: {user_id}"
+                f"Successfully created and indexed user commenter: {user.id}"
             )
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration comments bulk resolver module."""
+
+from collections import defaultdict
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_rdm_records.records.api import RDMParent, RDMRecord
+from invenio_rdm_records.records.models import RDMRecordMetadata
+from invenio_requests.customizations.event_types import CommentEventType, LogEventType
+from invenio_requests.proxies import current_requests_service
+from invenio_requests.records.models import RequestEventModel, RequestMetadata
+
+
+def _request_number(legacy_recid):
+    """Return the number of the request of the comments of a legacy recid."""
+    return f"lrecid:{legacy_recid}"
+
+
+def _parents_by_legacy_recid(legacy_recids):
+    """Return the parent id of the ``lrecid`` PID of each legacy recid."""
+    pids = db.session.query(
+        PersistentIdentifier.pid_value, PersistentIdentifier.object_uuid
+    ).filter(
+        PersistentIdentifier.pid_type == "lrecid",
+        PersistentIdentifier.pid_value.in_(legacy_recids),
+        PersistentIdentifier.status == PIDStatus.REGISTERED,
+    )
+    return {pid_value: object_uuid for pid_value, object_uuid in pids}
+
+
+def _parents_by_record_pid(record_pids):
+    """Return the parent id of the records of each ``recid`` PID value."""
+    if not record_pids:
+        return {}
+    rows = (
+        db.session.query(PersistentIdentifier.pid_value, RDMRecordMetadata.parent_id)
+        .join(
+            RDMRecordMetadata,
+            RDMRecordMetadata.id == PersistentIdentifier.object_uuid,
+        )
+        .filter(
+            PersistentIdentifier.pid_type == "recid",
+            PersistentIdentifier.pid_value.in_(record_pids),
+        )
+    )
+    return {pid_value: parent_id for pid_value, parent_id in rows}
+
+
+def _internal_version(parent):
+    """Return the EP-approval internal version of a parent, if any."""
+    return (
+        (parent.get("permission_flags") or {})
+        .get("committee_approval", {})
+        .get("source_internal_version")
+    )
+
+
+def _versions_by_parent(parent_ids):
+    """Return the record versions of each parent, by version index."""
+    versions = defaultdict(dict)
+    models = RDMRecordMetadata.query.filter(
+        RDMRecordMetadata.parent_id.in_(parent_ids),
+        RDMRecordMetadata.is_deleted != True,  # noqa
+    )
+    for model in models:
+        versions[model.parent_id][model.index] = RDMRecord(model.data, model=model)
+    return versions
+
+
+def _requests_by_number(numbers):
+    """Return the requests of each number."""
+    request_cls = current_requests_service.record_cls
+    models = RequestMetadata.query.filter(RequestMetadata.number.in_(numbers))
+    return {model.number: request_cls(model.data, model=model) for model in models}
+
+
+def _requests_with_migrated_comments(request_ids):
+    """Return the ids of the requests having migrated comment events."""
+    if not request_ids:
+        return set()
+    rows = (
+        db.session.query(RequestEventModel.request_id)
+        .filter(
+            RequestEventModel.request_id.in_(request_ids),
+            db.or_(
+                RequestEventModel.type == CommentEventType.type_id,
+                # deleted legacy comments are stored as log events
+                db.and_(
+                    RequestEventModel.type == LogEventType.type_id,
+                    RequestEventModel.json["payload"]["event"].as_string()
+                    == "comment_deleted",
+                ),
+            ),
+        )
+        .distinct()
+    )
+    return {request_id for (request_id,) in rows}
+
+
+def resolve_legacy_recids(legacy_recids):
+    """Resolve the legacy recids of the comments to their RDM records in bulk.
+
+    Legacy recid PIDs are minted on the public parent. For EP-approval
+    migrations, comments must instead target the restricted (internal)
+    parent, linked via ``permission_flags.committee_approval.source_internal_version``.
+
+    :param legacy_recids: list of legacy recids.
+    :returns: dict of legacy recid to a dict with the ``parent`` the comments
+        target, its record ``versions`` by version index, the ``request``
+        numbered after the legacy recid or None, and whether the request
+        ``has_migrated_comments``. The legacy recids without migrated record
+        are left out.
+    """
+    legacy_recids = [str(legacy_recid) for legacy_recid in legacy_recids]
+    if not legacy_recids:
+        return {}
+
+    parent_ids = _parents_by_legacy_recid(legacy_recids)
+    parents = {
+        parent.id: parent for parent in RDMParent.get_records(set(parent_ids.values()))
+    }
+
+    internal_versions = {}
+    for parent in parents.values():
+        internal_version = _internal_version(parent)
+        if internal_version:
+            internal_versions[parent.id] = internal_version
+    internal_parent_ids = _parents_by_record_pid(set(internal_versions.values()))
+    missing_parent_ids = set(internal_parent_ids.values()) - set(parents)
+    if missing_parent_ids:
+        parents.update(
+            (parent.id, parent) for parent in RDMParent.get_records(missing_parent_ids)
+        )
+
+    # the parent each legacy recid comments target
+    targets = {}
+    for legacy_recid, parent_id in parent_ids.items():
+        if parent_id not in parents:
+            continue
+        if parent_id in internal_versions:
+            parent_id = internal_parent_ids.get(internal_versions[parent_id])
+            if parent_id not in parents:
+                continue
+        targets[legacy_recid] = parents[parent_id]
+
+    versions = _versions_by_parent({parent.id for parent in targets.values()})
+    requests = _requests_by_number(
+        [_request_number(legacy_recid) for legacy_recid in targets]
+    )
+    migrated = _requests_with_migrated_comments(
+        [request.id for request in requests.values()]
+    )
+
+    resolved = {}
+    for legacy_recid, parent in targets.items():
+        if not versions.get(parent.id):
+            continue
+        request = requests.get(_request_number(legacy_recid))
+        resolved[legacy_recid] = {
+            "parent": parent,
+            "versions": versions[parent.id],
+            "request": request,
+            "has_migrated_comments": request is not None and request.id in migrated,
+        }
+    return resolved
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration comments unit of work module."""
+
+from invenio_records_resources.services.uow import Operation
+from invenio_search.engine import search
+
+
+def _index_action(indexer, record):
+    """Return the bulk action indexing a record, as ``indexer.index`` does.
+
+    ``RecordIndexer`` only builds the bulk actions of the records queued on
+    the message queue (``bulk_index``), which reads each record back from the
+    DB. This mirrors its private ``_index_action`` for the records in memory,
+    hence the ``invenio-indexer`` version is pinned in ``setup.cfg``.
+    """
+    index = indexer.record_to_index(record)
+    return {
+        "_op_type": "index",
+        "_index": indexer._prepare_index(index),
+        "_id": str(record.id),
+        "_version": record.revision_id,
+        "_version_type": indexer._version_type,
+        "_source": indexer._prepare_record(record, index),
+    }
+
+
+class RecordBulkCommitOp(Operation):
+    """Commit records and index them with a single bulk request.
+
+    The records are committed when added to the operation and indexed once
+    the unit of work is committed, like ``RecordCommitOp`` does one by one.
+    """
+
+    def __init__(self, indexer):
+        """Constructor."""
+        self._indexer = indexer
+        self._records = []
+
+    def add(self, record):
+        """Commit a record (will flush to the database) to index it."""
+        record.commit()
+        self._records.append(record)
+
+    def on_commit(self, uow):
+        """Index the records."""
+        if not self._records:
+            return
+        search.helpers.bulk(
+            self._indexer.client,
+            (_index_action(self._indexer, record) for record in self._records),
+        )
@@ -466,6 +466,26 @@ CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG = dict(
     ),
     SRC_SEARCH_SIZE=5000,
     SRC_SEARCH_SCROLL="1h",
+    # number of records whose legacy events are fetched with a single scroll
+    SRC_SEARCH_BATCH_SIZE=1,
+    # records with more events than the threshold are scanned with a sliced
+    # scroll, each slice consumed by its own worker
+    SRC_SEARCH_SLICES=1,
+    SRC_SEARCH_SLICE_THRESHOLD=100000,
+    # number of records validated with a single aggregation after the load
+    VALIDATION_BATCH_SIZE=500,
+    ####### Destination bulk indexer ##############
+    DEST_BULK_THREADS=4,
+    DEST_BULK_CHUNK_SIZE=500,
+    DEST_BULK_MAX_CHUNK_BYTES=50 * 1024 * 1024,
+    # max number of events waiting to be indexed before the scans are paused
+    DEST_BULK_QUEUE_SIZE=10000,
+    # index the daily aggregations of the migrated events along with them,
+    # instead of running the aggregations over the migrated events afterwards
+    DEST_AGGREGATIONS=False,
+    DEST_AGG_UNIQUE_FIELD="unique_session_id",
+    # number of scroll pages between two checkpoints of a record scan
+    CHECKPOINT_EVERY=10,
 )
 """Config for record statistics migration."""
 
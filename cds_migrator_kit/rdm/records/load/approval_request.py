@@ -12,7 +12,6 @@ from datetime import datetime, timezone
 from cds_rdm.requests.committee_approval import APPRN_PID_TYPE, CommitteeApprovalRequest
 from flask import current_app
 from invenio_access.permissions import system_identity
-from invenio_accounts.models import User
 from invenio_db.uow import UnitOfWork
 from invenio_pidstore.errors import PIDAlreadyExists
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
@@ -26,6 +25,7 @@ from invenio_requests.proxies import current_events_service, current_requests_se
 from invenio_requests.resolvers.registry import ResolverRegistry
 
 from cds_migrator_kit.errors import ManualImportRequired, UnexpectedValue
+from cds_migrator_kit.users.directory import user_directory
 
 EP_APPROVAL_WAITING_STATUS = "waiting"
 EP_APPROVAL_APPROVED_STATUS = "approved"
@@ -229,14 +229,14 @@ class ApprovalRequest:
                 stage="load",
                 priority="critical",
             )
-        user = User.query.filter_by(email=email).one_or_none()
-        if not user:
+        user_id = user_directory.get_id_by_email(email)
+        if not user_id:
             raise UnexpectedValue(
                 message=f"EP approval {role} user not found: {email}",
                 stage="load",
                 priority="critical",
             )
-        return {"user": str(user.id)}
+        return {"user": str(user_id)}
 
     def _existing_request(self):
         """Check if the EP approval request already exists."""
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration batched CLC sync module."""
+
+from cds_rdm.clc_sync.models import CDSToCLCSyncModel
+from cds_rdm.clc_sync.proxies import current_clc_sync_service
+from invenio_access.permissions import system_identity
+from invenio_db import db
+from invenio_db.uow import UnitOfWork
+from invenio_pidstore.models import PersistentIdentifier
+from invenio_rdm_records.proxies import current_rdm_records_service
+from invenio_rdm_records.records.api import RDMRecord
+from invenio_rdm_records.records.models import RDMVersionsState
+from sqlalchemy.orm import aliased
+
+
+def pending_clc_syncs(legacy_recids, batch_size=1000):
+    """Return the parent PIDs of the migrated records pending the CLC sync.
+
+    The sync entries are created in the load transaction of each record with
+    ``auto_sync`` disabled, hence they survive an interrupted run. Only the
+    entries of the records of ``legacy_recids`` are returned, the ones of
+    other collections or disabled outside the migration are left as they are.
+    """
+    parent_pid = aliased(PersistentIdentifier)
+    legacy_pid = aliased(PersistentIdentifier)
+    legacy_recids = sorted({str(legacy_recid) for legacy_recid in legacy_recids})
+    parent_recids = set()
+    for start in range(0, len(legacy_recids), batch_size):
+        rows = (
+            db.session.query(CDSToCLCSyncModel.parent_record_pid)
+            .join(
+                parent_pid,
+                db.and_(
+                    parent_pid.pid_value == CDSToCLCSyncModel.parent_record_pid,
+                    parent_pid.pid_type == "recid",
+                ),
+            )
+            .join(
+                legacy_pid,
+                db.and_(
+                    legacy_pid.object_uuid == parent_pid.object_uuid,
+                    legacy_pid.pid_type == "lrecid",
+                ),
+            )
+            .filter(
+                CDSToCLCSyncModel.status == "P",
+                CDSToCLCSyncModel.auto_sync == False,  # noqa
+                legacy_pid.pid_value.in_(legacy_recids[start : start + batch_size]),
+            )
+        )
+        parent_recids.update(parent_recid for (parent_recid,) in rows)
+    return sorted(parent_recids)
+
+
+def _latest_versions(parent_recids):
+    """Return the latest version and a legacy recid of each parent PID."""
+    parent_pid = aliased(PersistentIdentifier)
+    record_pid = aliased(PersistentIdentifier)
+    legacy_pid = aliased(PersistentIdentifier)
+    rows = (
+        db.session.query(
+            parent_pid.pid_value, record_pid.pid_value, legacy_pid.pid_value
+        )
+        .join(RDMVersionsState, RDMVersionsState.parent_id == parent_pid.object_uuid)
+        .join(
+            record_pid,
+            db.and_(
+                record_pid.object_uuid == RDMVersionsState.latest_id,
+                record_pid.pid_type == "recid",
+            ),
+        )
+        .outerjoin(
+            legacy_pid,
+            db.and_(
+                legacy_pid.object_uuid == parent_pid.object_uuid,
+                legacy_pid.pid_type == "lrecid",
+            ),
+        )
+        .filter(
+            parent_pid.pid_type == "recid",
+            parent_pid.pid_value.in_(parent_recids),
+        )
+    )
+    latest_versions = {}
+    for parent_recid, latest_version, legacy_recid in rows:
+        latest_versions.setdefault(parent_recid, (latest_version, legacy_recid))
+    return latest_versions
+
+
+def run_clc_sync(legacy_recids, batch_size=100, migration_logger=None):
+    """Enable the CLC sync of the migrated records pending it, in batches.
+
+    The sync entries pending of the ``legacy_recids`` of the run are read
+    from the DB, so that a run interrupted before its cleanup is resumed by
+    the next one over the same records. The latest versions of a batch of
+    records are resolved with a single query and read with a single search,
+    and the sync entries are updated in one transaction per batch, with a
+    savepoint per entry so that a failing entry does not abort the batch.
+    The entries are updated through the CLC sync service, which pushes the
+    records to CLC, hence one by one.
+
+    :returns: the list of the parent PIDs that failed to sync.
+    """
+    failed = []
+    parent_recids = pending_clc_syncs(legacy_recids)
+    if not parent_recids:
+        return failed
+
+    def _fail(parent_recid, legacy_recid, error):
+        failed.append(parent_recid)
+        if migration_logger:
+            migration_logger.add_log(
+                f"Failed to sync {parent_recid} to CLC: {error}",
+                record={"recid": legacy_recid or parent_recid},
+            )
+
+    # the sync needs the records as they are indexed
+    RDMRecord.index.refresh()
+
+    for start in range(0, len(parent_recids), batch_size):
+        batch = parent_recids[start : start + batch_size]
+        latest_versions = _latest_versions(batch)
+        records = current_rdm_records_service.read_many(
+            system_identity,
+            [latest_version for latest_version, _ in latest_versions.values()],
+        ).to_dict()
+        records = {hit["id"]: hit for hit in records["hits"]["hits"]}
+
+        synced = []
+        try:
+            with UnitOfWork(db.session) as uow:
+                for parent_recid in batch:
+                    latest_version, legacy_recid = latest_versions.get(
+                        parent_recid, (None, None)
+                    )
+                    if latest_version not in records:
+                        _fail(parent_recid, legacy_recid, "record not found")
+                        continue
+                    try:
+                        with db.session.begin_nested():
+                            clc_sync_entry = current_clc_sync_service.read(
+                                system_identity, parent_recid
+                            ).to_dict()
+                            clc_sync_entry["record"] = records[latest_version]
+                            clc_sync_entry["auto_sync"] = True
+                            current_clc_sync_service.update(
+                                system_identity,
+                                clc_sync_entry["id"],
+                                clc_sync_entry,
+                                uow=uow,
+                            )
+                        synced.append((parent_recid, legacy_recid))
+                    except Exception as exc:
+                        _fail(parent_recid, legacy_recid, str(exc))
+                uow.commit()
+        except Exception as exc:
+            db.session.rollback()
+            for parent_recid, legacy_recid in synced:
+                _fail(parent_recid, legacy_recid, str(exc))
+    return failed
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration deferred DOI re-publication module."""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from invenio_access.permissions import system_identity
+from invenio_db import db
+from invenio_rdm_records.proxies import current_rdm_records_service
+
+
+def republish_doi(record_id):
+    """Push the metadata of the record to the DOI registration agency."""
+    current_rdm_records_service.pids.register_or_update(
+        system_identity, record_id, "doi"
+    )
+
+
+class RateLimiter:
+    """Thread-safe limiter allowing at most ``rate`` calls per second."""
+
+    def __init__(self, rate=None):
+        """Constructor."""
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_call = 0
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DOIRepublishQueue:
+    """Queue of migrated records whose legacy DOI metadata must be updated.
+
+    When a record carrying a DOI minted in legacy is published, DataCite
+    answers that the DOI is already taken and keeps the legacy metadata.
+    The records are collected here during the load and their DOI metadata
+    is pushed in a separate step, once the load is done.
+
+    The queue is persisted as one JSON object per line, so that it can be
+    processed from the load cleanup or from the CLI in a different process.
+    """
+
+    def __init__(self, collection, filename="rdm_doi_republish_queue.jsonl"):
+        """Constructor."""
+        logs_path = os.path.join(
+            current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"], collection
+        )
+        os.makedirs(logs_path, exist_ok=True)
+        self.filepath = os.path.join(logs_path, filename)
+        self._lock = threading.Lock()
+
+    def add(self, legacy_recid, record_id):
+        """Add a record to the queue."""
+        item = {"legacy_recid": legacy_recid, "record_id": record_id}
+        with self._lock:
+            with open(self.filepath, "a", encoding="utf-8") as fp:
+                fp.write(json.dumps(item) + "\n")
+
+    def read(self):
+        """Return the queued records, without duplicates."""
+        if not os.path.exists(self.filepath):
+            return []
+        items = {}
+        with open(self.filepath, encoding="utf-8") as fp:
+            for line in fp:
+                line = line.strip()
+                if line:
+                    item = json.loads(line)
+                    items[item["record_id"]] = item
+        return list(items.values())
+
+    def _write(self, items):
+        """Replace the content of the queue."""
+        with self._lock:
+            with open(self.filepath, "w", encoding="utf-8") as fp:
+                for item in items:
+                    fp.write(json.dumps(item) + "\n")
+
+    def process(
+        self,
+        workers=1,
+        rate_limit=None,
+        batch_size=100,
+        migration_logger=None,
+        republish_func=republish_doi,
+    ):
+        """Update the DOI metadata of the queued records.
+
+        The records are processed in batches of ``batch_size`` by ``workers``
+        threads, each one with its own application context and DB session,
+        issuing at most ``rate_limit`` requests per second overall.
+        Failed records are reported to the ``migration_logger`` and kept in
+        the queue, so that they can be retried.
+
+        :returns: the list of failed queue items.
+        """
+        items = self.read()
+        if not items:
+            return []
+
+        app = current_app._get_current_object()
+        limiter = RateLimiter(rate_limit)
+
+        def _republish(item):
+            limiter.wait()
+            try:
+                republish_func(item["record_id"])
+                db.session.commit()
+            except Exception as exc:
+                db.session.rollback()
+                return item, exc
+            return item, None
+
+        def _republish_in_app_context(item):
+            with app.app_context():
+                return _republish(item)
+
+        failed = []
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            if workers and workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_republish_in_app_context, batch))
+            else:
+                results = [_republish(item) for item in batch]
+
+            for item, exc in results:
+                if exc is None:
+                    continue
+                failed.append(item)
+                if migration_logger:
+                    migration_logger.add_log(
+                        f"Failed to update DOI of {item['record_id']}: {str(exc)}",
+                        record={"recid": item["legacy_recid"]},
+                    )
+
+        self._write(failed)
+        return failed
@@ -8,8 +8,6 @@
 """CDS-RDM migration load module for records with EP approval."""
 import json
 
-from cds_rdm.legacy.resolver import get_pid_by_legacy_recid
-from cds_rdm.minters import legacy_recid_minter
 from invenio_access.permissions import system_identity
 from invenio_db import db
 from invenio_db.uow import UnitOfWork
@@ -22,8 +20,11 @@ from invenio_rdm_records.records.api import RDMParent
 from cds_migrator_kit.errors import ManualImportRequired, UnexpectedValue
 
 from .approval_request import ApprovalRequest
+from .clc_sync import run_clc_sync
+from .dois import DOIRepublishQueue
 from .ep_approval_entry import PublicEntry, RestrictedEntry
 from .load import CDSRecordServiceLoad
+from .pids import mint_legacy_redirects
 
 
 class CDSEPApprovalRecordServiceLoad(Load):
@@ -46,6 +47,9 @@ class CDSEPApprovalRecordServiceLoad(Load):
         create_inclusion_request=False,
         migration_logger=None,
         record_state_logger=None,
+        doi_republish=None,
+        clc_sync_batch_size=100,
+        redirects_batch_size=500,
     ):
         self.dry_run = dry_run
         self.legacy_pids_to_redirect = {}
@@ -56,6 +60,12 @@ class CDSEPApprovalRecordServiceLoad(Load):
         self.migration_logger = migration_logger
         self.record_state_logger = record_state_logger
         self.approval_request = None
+        self.doi_republish = doi_republish or {}
+        self.doi_republish_queue = DOIRepublishQueue(collection) if collection else None
+        self.clc_sync_batch_size = clc_sync_batch_size
+        # legacy recids of the run, to sync the records pending it to CLC
+        self._legacy_recids = set()
+        self.redirects_batch_size = redirects_batch_size
         if legacy_pids_to_redirect is not None:
             with open(legacy_pids_to_redirect, "r") as fp:
                 self.legacy_pids_to_redirect = json.load(fp)
@@ -76,6 +86,7 @@ class CDSEPApprovalRecordServiceLoad(Load):
             return
         try:
             recid = entry.get("record", {}).get("recid")
+            self._track_legacy_recid(recid)
 
             # The same legacy recid can be cross-listed under multiple EP
             # collections (e.g. a joint ALEPH/DELPHI/L3/OPAL paper appears in
@@ -138,6 +149,7 @@ class CDSEPApprovalRecordServiceLoad(Load):
                 migration_logger=self.migration_logger,
                 record_state_logger=self.record_state_logger,
                 legacy_pids_to_redirect=self.legacy_pids_to_redirect,
+                doi_republish_queue=self.doi_republish_queue,
                 _is_final_record=True,
             )
 
@@ -328,20 +340,38 @@ class CDSEPApprovalRecordServiceLoad(Load):
         current_rdm_records_service.publish(system_identity, id_=draft.id, uow=uow)
         return True
 
+    def _track_legacy_recid(self, recid):
+        """Add a legacy recid to the records of the run, even if skipped."""
+        self._legacy_recids.add(str(recid))
+
+    def _run_clc_sync(self):
+        """Run the CLC sync of the records of the run pending it."""
+        if self.dry_run:
+            return
+        run_clc_sync(
+            self._legacy_recids,
+            batch_size=self.clc_sync_batch_size,
+            migration_logger=self.migration_logger,
+        )
+
     def _cleanup(self, *args, **kwargs):
         """Post migration process."""
-        for legacy_src_pid, legacy_dest_pid in self.legacy_pids_to_redirect.items():
-            if CDSRecordServiceLoad._have_migrated_recid(legacy_src_pid):
-                continue
-            try:
-                parent_dest_pid = get_pid_by_legacy_recid(str(legacy_dest_pid))
-                assert str(parent_dest_pid.status) == "R"
-                legacy_recid_minter(legacy_src_pid, parent_dest_pid.object_uuid)
-                db.session.commit()
-                self.migration_logger.finalise_record(legacy_src_pid)
-            except Exception as exc:
-                db.session.rollback()
-                self.migration_logger.add_log(
-                    f"Failed to redirect {legacy_src_pid} to {legacy_dest_pid}: {str(exc)}",
-                    record={"recid": legacy_src_pid},
-                )
+        mint_legacy_redirects(
+            self.legacy_pids_to_redirect,
+            batch_size=self.redirects_batch_size,
+            migration_logger=self.migration_logger,
+        )
+        self._run_clc_sync()
+        if self.doi_republish.get("on_cleanup", True):
+            self._republish_dois()
+
+    def _republish_dois(self):
+        """Update the DOI metadata of the records queued during the load."""
+        if self.dry_run or self.doi_republish_queue is None:
+            return
+        self.doi_republish_queue.process(
+            workers=self.doi_republish.get("workers", 1),
+            rate_limit=self.doi_republish.get("rate_limit"),
+            batch_size=self.doi_republish.get("batch_size", 100),
+            migration_logger=self.migration_logger,
+        )
@@ -15,18 +15,14 @@ from copy import deepcopy
 
 import arrow
 from cds_rdm.clc_sync.models import CDSToCLCSyncModel
-from cds_rdm.clc_sync.proxies import current_clc_sync_service
 from cds_rdm.legacy.models import CDSMigrationLegacyRecord
-from cds_rdm.legacy.resolver import get_pid_by_legacy_recid
 from cds_rdm.minters import legacy_recid_minter
 from flask import current_app
 from invenio_access.permissions import system_identity
-from invenio_accounts.models import User
 from invenio_db import db
 from invenio_db.uow import UnitOfWork
 from invenio_i18n import _
-from invenio_pidstore.errors import PIDAlreadyExists
-from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_pidstore.models import PersistentIdentifier
 from invenio_rdm_migrator.load.base import Load
 from invenio_rdm_records.proxies import current_rdm_records_service
 from invenio_rdm_records.requests import CommunitySubmission
@@ -48,6 +44,11 @@ from cds_migrator_kit.errors import (
     RecordFlaggedCuration,
     UnexpectedValue,
 )
+from cds_migrator_kit.users.directory import user_directory
+
+from .clc_sync import run_clc_sync
+from .dois import DOIRepublishQueue
+from .pids import mint_legacy_redirects, mint_report_numbers
 
 
 def import_legacy_files(filepath):
@@ -76,9 +77,23 @@ class CDSRecordServiceLoad(Load):
         create_inclusion_request=False,
         migration_logger=None,
         record_state_logger=None,
+        doi_republish=None,
+        doi_republish_queue=None,
+        clc_sync_batch_size=100,
+        redirects_batch_size=500,
         _is_final_record=True,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param doi_republish: configuration of the deferred DOI update step,
+            i.e. ``workers``, ``rate_limit``, ``batch_size`` and ``on_cleanup``
+            (set it to ``False`` to run it separately from the CLI).
+        :param doi_republish_queue: queue collecting the records of which the
+            DOI metadata should be updated after the load.
+        :param clc_sync_batch_size: number of records synced to CLC at once.
+        :param redirects_batch_size: number of legacy redirections minted in
+            one transaction on cleanup.
+        """
         self.dry_run = dry_run
         self.legacy_pids_to_redirect = {}
         self.clc_sync = False
@@ -87,6 +102,15 @@ class CDSRecordServiceLoad(Load):
         self.create_inclusion_request = create_inclusion_request
         self.migration_logger = migration_logger
         self.record_state_logger = record_state_logger
+        self.doi_republish = doi_republish or {}
+        self.doi_republish_queue = doi_republish_queue
+        if self.doi_republish_queue is None and collection:
+            self.doi_republish_queue = DOIRepublishQueue(collection)
+        self._dois_to_republish = []
+        # legacy recids of the run, to sync the records pending it to CLC
+        self._legacy_recids = set()
+        self.clc_sync_batch_size = clc_sync_batch_size
+        self.redirects_batch_size = redirects_batch_size
         self._is_final_record = _is_final_record
         if legacy_pids_to_redirect is not None:
             if isinstance(legacy_pids_to_redirect, dict):
@@ -196,40 +220,32 @@ class CDSRecordServiceLoad(Load):
         record.access = access_dict["access_obj"]
         record.commit()
 
-    def _after_commit_run_clc_sync(self, record_state):
-        """Run the CLC sync after UOW commit."""
+    def _after_publish_update_dois(self, record, entry):
+        """Collect migrated DOIs to update post load.
+
+        If a DOI was already minted from legacy then on publish the datacite
+        will return a warning that "This DOI has already been taken".
+        In that case, we need to force an update of the doi with the new
+        published metadata as in the new system we have more information
+        available. It is done after the load by ``DOIRepublishQueue``.
+        """
         if not self._is_final_record:
             return
-        if self.clc_sync:
-            clc_sync_entry = current_clc_sync_service.read(
-                system_identity, record_state["parent_recid"]
-            ).to_dict()
-            clc_sync_entry["record"] = current_rdm_records_service.read(
-                system_identity, record_state["latest_version"]
-            ).to_dict()
-            clc_sync_entry["auto_sync"] = True
-            current_clc_sync_service.update(
-                system_identity, clc_sync_entry["id"], clc_sync_entry
-            )
+        if "doi" not in entry["record"]["json"]["pids"]:
+            return
+        doi = record.data.get("pids", {}).get("doi", {})
+        if doi.get("provider") == "external":
+            # externally managed DOIs are not registered by us
+            return
+        self._dois_to_republish.append(record["id"])
 
-    def _after_publish_update_dois(self, identity, record, entry, uow):
-        """Update migrated DOIs post publish."""
-        if not self._is_final_record:
+    def _after_commit_queue_dois(self, recid):
+        """Add the collected DOIs to the re-publication queue after commit."""
+        dois_to_republish, self._dois_to_republish = self._dois_to_republish, []
+        if self.doi_republish_queue is None:
             return
-        migrated_pids = entry["record"]["json"]["pids"]
-        for pid_type, identifier in migrated_pids.items():
-            if pid_type == "doi":
-                # If a DOI was already minted from legacy then on publish the datacite
-                # will return a warning that "This DOI has already been taken"
-                # In that case, we edit and republish to force an update of the doi with
-                # the new published metadata as in the new system we have more information available
-                _draft = current_rdm_records_service.edit(
-                    identity, record["id"], uow=uow
-                )
-                record = current_rdm_records_service.publish(
-                    identity, _draft["id"], uow=uow
-                )
-                return record
+        for record_id in dois_to_republish:
+            self.doi_republish_queue.add(recid, record_id)
 
     def _after_publish_load_parent_access_grants(self, draft, version, entry):
         """Load access grants from metadata and record grants efficiently."""
@@ -381,8 +397,9 @@ class CDSRecordServiceLoad(Load):
 
         # Fetch existing users
         existing_users = {
-            user.email: user.id
-            for user in User.query.filter(User.email.in_(emails)).all()
+            email: user_id
+            for email in emails
+            if (user_id := user_directory.get_id_by_email(email))
         }
         # raise error for missing user
         missing_emails = emails - existing_users.keys()
@@ -531,9 +548,7 @@ class CDSRecordServiceLoad(Load):
 
     def _after_publish(self, identity, published_record, entry, version, uow):
         """Run fixes after record publish."""
-        record = self._after_publish_update_dois(identity, published_record, entry, uow)
-        if record:
-            published_record = record
+        self._after_publish_update_dois(published_record, entry)
         self._after_publish_update_created(published_record, entry, version)
         self._after_publish_mint_recid(published_record, entry, version)
         self._after_publish_update_files_created(published_record, entry, version)
@@ -567,25 +582,14 @@ class CDSRecordServiceLoad(Load):
             # If no mintable identifiers, return early
             return
 
-        for report_number, index in draft_report_nums.items():
-            try:
-                PersistentIdentifier.create(
-                    pid_type="cdsrn",
-                    pid_value=report_number,
-                    object_type="rec",
-                    object_uuid=draft._record.parent.id,
-                    status=PIDStatus.REGISTERED,
-                )
-            except PIDAlreadyExists as e:
-                pid = PersistentIdentifier.get(
-                    pid_type="cdsrn", pid_value=report_number
-                )
-                if pid.object_uuid != draft._record.parent.id:
-                    # raise only if different parent uuid found, meaning they are 2
-                    # different records and the repnum is duplicated
-                    raise ManualImportRequired(
-                        f"Report number {report_number} already exists."
-                    )
+        parent_id = draft._record.parent.id
+        duplicated = mint_report_numbers(
+            {report_number: parent_id for report_number in draft_report_nums}
+        )
+        if duplicated:
+            # raise only if different parent uuid found, meaning they are 2
+            # different records and the repnum is duplicated
+            raise ManualImportRequired(f"Report number {duplicated[0]} already exists.")
 
     def _pre_publish(self, identity, entry, version, draft, uow):
         """Create and process draft before publish."""
@@ -811,6 +815,7 @@ class CDSRecordServiceLoad(Load):
         """
         if entry:
             recid = entry.get("record", {}).get("recid", {})
+            self._track_legacy_recid(recid)
             if self._should_skip_recid(recid):
                 self.migration_logger.add_information(
                     recid, state={"message": "Record already migrated", "value": recid}
@@ -821,6 +826,7 @@ class CDSRecordServiceLoad(Load):
             self.clc_sync = deepcopy(entry.get("_clc_sync", False))
             if "_clc_sync" in entry:
                 del entry["_clc_sync"]
+            self._dois_to_republish = []
 
             try:
                 ep_approval = entry.get("record", {}).get("ep_approval")
@@ -853,8 +859,7 @@ class CDSRecordServiceLoad(Load):
                     # commit boundary and is responsible for finalising the
                     # record only after it actually commits.
                     self.migration_logger.finalise_record(recid)
-                # Run the CLC sync after UOW commit
-                self._after_commit_run_clc_sync(recid_state_after_load)
+                self._after_commit_queue_dois(recid)
                 return recid_state_after_load
             except (UnexpectedValue, ManualImportRequired) as e:
                 self.migration_logger.add_log(e, record=entry)
@@ -881,18 +886,36 @@ class CDSRecordServiceLoad(Load):
 
     def _cleanup(self, *args, **kwargs):
         """Post migration process."""
-        for legacy_src_pid, legacy_dest_pid in self.legacy_pids_to_redirect.items():
-            if self._have_migrated_recid(legacy_src_pid):
-                continue
-            try:
-                parent_dest_pid = get_pid_by_legacy_recid(str(legacy_dest_pid))
-                assert str(parent_dest_pid.status) == "R"
-                legacy_recid_minter(legacy_src_pid, parent_dest_pid.object_uuid)
-                db.session.commit()
-                self.migration_logger.finalise_record(legacy_src_pid)
-            except Exception as exc:
-                db.session.rollback()
-                self.migration_logger.add_log(
-                    f"Failed to redirect {legacy_src_pid} to {legacy_dest_pid}: {str(exc)}",
-                    record={"recid": legacy_src_pid},
-                )
+        mint_legacy_redirects(
+            self.legacy_pids_to_redirect,
+            batch_size=self.redirects_batch_size,
+            migration_logger=self.migration_logger,
+        )
+        self._run_clc_sync()
+        if self.doi_republish.get("on_cleanup", True):
+            self._republish_dois()
+
+    def _track_legacy_recid(self, recid):
+        """Add a legacy recid to the records of the run, even if skipped."""
+        self._legacy_recids.add(str(recid))
+
+    def _run_clc_sync(self):
+        """Run the CLC sync of the records of the run pending it."""
+        if self.dry_run:
+            return
+        run_clc_sync(
+            self._legacy_recids,
+            batch_size=self.clc_sync_batch_size,
+            migration_logger=self.migration_logger,
+        )
+
+    def _republish_dois(self):
+        """Update the DOI metadata of the records queued during the load."""
+        if self.dry_run or self.doi_republish_queue is None:
+            return
+        self.doi_republish_queue.process(
+            workers=self.doi_republish.get("workers", 1),
+            rate_limit=self.doi_republish.get("rate_limit"),
+            batch_size=self.doi_republish.get("batch_size", 100),
+            migration_logger=self.migration_logger,
+        )
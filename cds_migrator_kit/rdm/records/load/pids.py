@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration bulk PIDs module."""
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy.dialects.postgresql import insert
+
+
+def bulk_create_pids(pid_type, pids, object_type="rec", status=PIDStatus.REGISTERED):
+    """Create PIDs with a single statement, skipping the existing ones.
+
+    :param pids: dict of ``pid_value`` to the ``object_uuid`` it points to.
+    :returns: dict of ``pid_value`` to the ``object_uuid`` of the PIDs that
+        already existed and were not created, including the ones pointing to
+        the same object.
+    """
+    if not pids:
+        return {}
+
+    table = PersistentIdentifier.__table__
+    stmt = (
+        insert(table)
+        .values(
+            [
+                dict(
+                    pid_type=pid_type,
+                    pid_value=pid_value,
+                    object_type=object_type,
+                    object_uuid=object_uuid,
+                    status=status,
+                )
+                for pid_value, object_uuid in pids.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[table.c.pid_type, table.c.pid_value])
+        .returning(table.c.pid_value)
+    )
+    created = {row.pid_value for row in db.session.execute(stmt)}
+
+    existing = [pid_value for pid_value in pids if pid_value not in created]
+    if not existing:
+        return {}
+    return {
+        pid.pid_value: pid.object_uuid
+        for pid in PersistentIdentifier.query.filter(
+            PersistentIdentifier.pid_type == pid_type,
+            PersistentIdentifier.pid_value.in_(existing),
+        )
+    }
+
+
+def mint_report_numbers(report_numbers):
+    """Mint ``cdsrn`` PIDs of records in bulk.
+
+    :param report_numbers: dict of report number to the parent uuid.
+    :returns: list of report numbers already assigned to a different parent.
+    """
+    existing = bulk_create_pids("cdsrn", report_numbers)
+    # a report number already minted for the same parent is not a duplicate
+    return [
+        report_number
+        for report_number, object_uuid in existing.items()
+        if str(object_uuid) != str(report_numbers[report_number])
+    ]
+
+
+def mint_legacy_redirects(
+    legacy_pids_to_redirect, batch_size=500, migration_logger=None
+):
+    """Mint the ``lrecid`` PIDs of duplicated legacy records in batches.
+
+    Each legacy recid is redirected to the parent of the record migrated for
+    its destination legacy recid. The ``lrecid`` PIDs of all the recids are
+    resolved with one query per batch and the new ones are inserted with a
+    single statement in one transaction per batch.
+
+    :param legacy_pids_to_redirect: dict of legacy recid to the legacy recid
+        it should redirect to.
+    """
+
+    def _log_error(legacy_src_pid, legacy_dest_pid, message):
+        if migration_logger:
+            migration_logger.add_log(
+                f"Failed to redirect {legacy_src_pid} to {legacy_dest_pid}: {message}",
+                record={"recid": legacy_src_pid},
+            )
+
+    redirects = [
+        (str(legacy_src_pid), str(legacy_dest_pid))
+        for legacy_src_pid, legacy_dest_pid in legacy_pids_to_redirect.items()
+    ]
+    for start in range(0, len(redirects), batch_size):
+        batch = redirects[start : start + batch_size]
+        recids = {recid for redirect in batch for recid in redirect}
+        lrecids = {
+            pid.pid_value: pid
+            for pid in PersistentIdentifier.query.filter(
+                PersistentIdentifier.pid_type == "lrecid",
+                PersistentIdentifier.pid_value.in_(recids),
+            )
+        }
+
+        to_mint = {}
+        destinations = dict(batch)
+        for legacy_src_pid, legacy_dest_pid in batch:
+            if legacy_src_pid in lrecids or legacy_src_pid in to_mint:
+                # already migrated
+                continue
+            parent_dest_pid = lrecids.get(legacy_dest_pid)
+            if parent_dest_pid is None:
+                _log_error(
+                    legacy_src_pid,
+                    legacy_dest_pid,
+                    f"PID lrecid:{legacy_dest_pid} does not exist.",
+                )
+            elif parent_dest_pid.status != PIDStatus.REGISTERED:
+                _log_error(
+                    legacy_src_pid,
+                    legacy_dest_pid,
+                    f"PID lrecid:{legacy_dest_pid} is not registered.",
+                )
+            else:
+                to_mint[legacy_src_pid] = parent_dest_pid.object_uuid
+
+        if not to_mint:
+            continue
+        try:
+            bulk_create_pids("lrecid", to_mint)
+            db.session.commit()
+            minted = list(to_mint)
+        except Exception:
+            db.session.rollback()
+            # retry the batch one by one to report the failing recids only
+            minted = []
+            for legacy_src_pid, object_uuid in to_mint.items():
+                try:
+                    with db.session.begin_nested():
+                        bulk_create_pids("lrecid", {legacy_src_pid: object_uuid})
+                    minted.append(legacy_src_pid)
+                except Exception as exc:
+                    _log_error(legacy_src_pid, destinations[legacy_src_pid], str(exc))
+            db.session.commit()
+
+        if migration_logger:
+            for legacy_src_pid in minted:
+                migration_logger.finalise_record(legacy_src_pid)
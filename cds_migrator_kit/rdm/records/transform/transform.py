@@ -22,7 +22,6 @@ from flask import current_app
 from idutils import normalize_ror
 from idutils.validators import is_doi, is_ror
 from invenio_access.permissions import system_identity
-from invenio_accounts.models import User, UserIdentity
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_rdm_migrator.streams.records.transform import (
@@ -56,6 +55,7 @@ from cds_migrator_kit.rdm.records.transform.config import (
 )
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 from cds_migrator_kit.transform.errors import LossyConversion
+from cds_migrator_kit.users.directory import user_directory
 
 cli_logger = logging.getLogger("migrator")
 
@@ -255,10 +255,8 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         email = json_entry.get("submitter")
         if not email:
             return "system"
-        try:
-            user = User.query.filter_by(email=email).one()
-            return user.id
-        except NoResultFound:
+        user_id = user_directory.get_id_by_email(email)
+        if user_id is None:
             raise UnexpectedValue(
                 message=f"{email} not found - did you run user migration?",
                 stage="transform",
@@ -266,6 +264,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 value=email,
                 priority="critical",
             )
+        return user_id
 
     def _match_affiliation(self, affiliation_name, json_entry):
         """Match an affiliation against `CDSMigrationAffiliationMapping` db table."""
@@ -367,9 +366,8 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 {},
             ).get("identifier")
             if person_id:
-                ui = UserIdentity.query.filter_by(id=person_id).one_or_none()
-                if ui:
-                    user_id = ui.user.id
+                user_id = user_directory.get_id_by_person_id(person_id)
+                if user_id:
                     names = NamesMetadata.query.filter_by(
                         internal_id=str(user_id)
                     ).all()
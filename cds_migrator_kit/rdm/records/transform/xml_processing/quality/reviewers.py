@@ -7,10 +7,8 @@
 
 """Reviewer resolution utilities."""
 
-from invenio_accounts.models import User
-from invenio_db import db
-
 from cds_migrator_kit.errors import RecordFlaggedCuration
+from cds_migrator_kit.users.directory import user_directory
 
 
 def _is_email(value):
@@ -35,29 +33,28 @@ def _parse_reviewer_name(name):
 
 
 def find_reviewer(reviewer):
-    """Resolve a reviewer string (email or name) to a User.
+    """Resolve a reviewer string (email or name) to a user id.
 
     :param reviewer: email address, or a "Family, Given"/"Given Family" name.
-    :raises RecordFlaggedCuration: if no matching user is found, so the
-        record is flagged for manual curation instead of failing outright.
+    :raises RecordFlaggedCuration: if no single matching user is found, so
+        the record is flagged for manual curation instead of failing outright.
     """
     reviewer = reviewer.strip()
     if _is_email(reviewer):
-        user = User.query.filter_by(email=reviewer).one_or_none()
+        user_id = user_directory.get_id_by_email(reviewer)
     else:
         family_name, given_name = _parse_reviewer_name(reviewer)
-        query = User.query.filter(
-            db.func.lower(User._user_profile["family_name"].as_string())
-            == family_name.lower()
-        )
-        if given_name:
-            query = query.filter(
-                db.func.lower(User._user_profile["given_name"].as_string())
-                == given_name.lower()
+        user_ids = user_directory.get_ids_by_name(family_name, given_name)
+        if len(user_ids) > 1:
+            raise RecordFlaggedCuration(
+                message=f"Reviewer '{reviewer}' matches several accounts.",
+                field="request_reviewers",
+                stage="transform",
+                value=reviewer,
             )
-        user = query.one_or_none()
+        user_id = user_ids[0] if user_ids else None
 
-    if user is None:
+    if user_id is None:
         raise RecordFlaggedCuration(
             message=f"Reviewer '{reviewer}' could not be matched to an account.",
             field="request_reviewers",
@@ -65,4 +62,4 @@ def find_reviewer(reviewer):
             value=reviewer,
         )
 
-    return user
+    return user_id
@@ -478,8 +478,7 @@ def request_reviewers(self, key, value):
         reviewers = request_data.setdefault("reviewers", [])
 
         try:
-            user = find_reviewer(reviewer)
-            reviewer_entry = {"user": str(user.id)}
+            reviewer_entry = {"user": str(find_reviewer(reviewer))}
         except RecordFlaggedCuration as exc:
             reviewer_errors = request_data.setdefault("_reviewer_errors", [])
             reviewer_errors.append({"message": exc.message, "value": exc.value})
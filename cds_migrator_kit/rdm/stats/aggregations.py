@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration stats pre-aggregation module."""
+
+import threading
+from datetime import datetime, timezone
+
+# mirrors the ``STATS_AGGREGATIONS`` of invenio-app-rdm, with the yearly
+# ``index_interval`` of the migration config
+AGGREGATIONS = {
+    "file-download": {
+        "name": "file-download-agg",
+        "copy_fields": ["file_id", "file_key", "bucket_id", "recid", "parent_recid"],
+        "volume": True,
+    },
+    "record-view": {
+        "name": "record-view-agg",
+        "copy_fields": ["recid", "parent_recid", "via_api"],
+        "volume": False,
+    },
+}
+
+
+class StatsAggregator:
+    """Compute the daily aggregations of the migrated events.
+
+    The aggregations are the ones the ``StatAggregator`` of invenio-stats
+    would compute from the events: one document per ``unique_id`` and day,
+    with the count of events, the number of unique sessions, the downloaded
+    volume and the fields of the latest event. The legacy robot events are
+    not migrated, hence nothing is filtered out.
+    """
+
+    def __init__(self, index_prefix, unique_field="unique_session_id"):
+        """Constructor.
+
+        :param index_prefix: prefix of the aggregation indices, e.g.
+            ``cds-rdm-stats``.
+        """
+        self.index_prefix = index_prefix
+        self.unique_field = unique_field
+        self._buckets = {}
+        # index types of the events observed, flushed or not
+        self._observed = set()
+        self._lock = threading.Lock()
+
+    def observe(self, index_type, new_docs):
+        """Add the events of the bulk actions to the aggregations, yielding them."""
+        for new_doc in new_docs:
+            self.add(index_type, new_doc["_source"])
+            yield new_doc
+
+    def add(self, index_type, event):
+        """Add an event to its daily aggregation."""
+        day = event["timestamp"][:10]
+        key = (index_type, event["unique_id"], day)
+        with self._lock:
+            self._observed.add(index_type)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {
+                    "count": 0,
+                    "sessions": set(),
+                    "volume": 0.0,
+                    "latest": event,
+                }
+            bucket["count"] += 1
+            bucket["sessions"].add(event.get(self.unique_field))
+            if AGGREGATIONS[index_type]["volume"]:
+                bucket["volume"] += float(event.get("size") or 0)
+            if event["timestamp"] > bucket["latest"]["timestamp"]:
+                bucket["latest"] = event
+
+    def flush(self):
+        """Return the bulk actions of the aggregations and reset them."""
+        with self._lock:
+            buckets = self._buckets
+            self._buckets = {}
+        updated_timestamp = datetime.now(timezone.utc).isoformat()
+        actions = []
+        for (index_type, unique_id, day), bucket in buckets.items():
+            aggregation = AGGREGATIONS[index_type]
+            source = {
+                "timestamp": f"{day}T00:00:00",
+                "unique_id": unique_id,
+                "count": bucket["count"],
+                "updated_timestamp": updated_timestamp,
+                "unique_count": len(bucket["sessions"]),
+            }
+            if aggregation["volume"]:
+                source["volume"] = bucket["volume"]
+            for field in aggregation["copy_fields"]:
+                source[field] = bucket["latest"].get(field)
+            actions.append(
+                {
+                    "_op_type": "index",
+                    "_index": f"{self.index_prefix}-{index_type}-{day[:4]}",
+                    "_id": f"{unique_id}-{day}",
+                    "_source": source,
+                }
+            )
+        return actions
+
+    def bookmarks(self, date):
+        """Return the bookmarks, set to ``date``, of the aggregations observed.
+
+        An aggregation without any event is not bookmarked, not to have
+        invenio-stats skip the days before ``date``.
+        """
+        return [
+            {"date": date, "aggregation_type": aggregation["name"]}
+            for index_type, aggregation in AGGREGATIONS.items()
+            if index_type in self._observed
+        ]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration stats checkpoints module."""
+
+import json
+import os
+import threading
+
+
+class StatsCheckpoint:
+    """Progress of the stats migration per (recid, event type).
+
+    The checkpoints are appended to a JSON lines file, the last line of a
+    (recid, event type) pair being its current state: either done, or the
+    timestamp of the last legacy event indexed so far.
+    """
+
+    def __init__(self, filepath):
+        """Constructor."""
+        self.filepath = filepath
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+        if os.path.exists(filepath):
+            with open(filepath) as checkpoint_file:
+                for line in checkpoint_file:
+                    if not line.strip():
+                        continue
+                    try:
+                        checkpoint = json.loads(line)
+                    except ValueError:
+                        # last line of an interrupted run
+                        continue
+                    key = (checkpoint.pop("recid"), checkpoint.pop("event_type"))
+                    self._checkpoints[key] = checkpoint
+
+    def _write(self, recid, event_type, checkpoint):
+        with self._lock:
+            self._checkpoints[(str(recid), event_type)] = checkpoint
+            with open(self.filepath, "a") as checkpoint_file:
+                checkpoint_file.write(
+                    json.dumps(
+                        {"recid": str(recid), "event_type": event_type, **checkpoint}
+                    )
+                    + "\n"
+                )
+
+    def is_done(self, recid, event_type):
+        """Return whether all the events of the pair are migrated."""
+        checkpoint = self._checkpoints.get((str(recid), event_type))
+        return bool(checkpoint and checkpoint.get("done"))
+
+    def position(self, recid, event_type):
+        """Return the timestamp to resume the pair from, if any."""
+        checkpoint = self._checkpoints.get((str(recid), event_type))
+        return checkpoint.get("after") if checkpoint else None
+
+    def update(self, recid, event_type, after):
+        """Save the timestamp of the last event indexed for the pair."""
+        self._write(recid, event_type, {"done": False, "after": after})
+
+    def complete(self, recid, event_type):
+        """Mark all the events of the pair as migrated."""
+        self._write(recid, event_type, {"done": True})
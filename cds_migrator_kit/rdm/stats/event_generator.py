@@ -7,9 +7,41 @@
 
 """CDS-RDM migration stats events generator module."""
 import json
-from copy import deepcopy
 from datetime import datetime
 
+import numpy as np
+
+
+def compile_rec_context(rec_context):
+    """Add the version and file lookups of a record context.
+
+    The lookups are computed once per record instead of scanning the versions
+    and their files for every event. Compiling an already compiled context
+    returns it as is.
+    """
+    if "_versions" in rec_context:
+        return rec_context
+    versions = {}
+    files = {}
+    for version in rec_context.get("versions", []):
+        # the first match wins, as when scanning the versions
+        versions.setdefault(version["version"], version)
+        for _file in version.get("files", []):
+            files.setdefault((version["version"], str(_file["legacy_file_id"])), _file)
+    return {**rec_context, "_versions": versions, "_files": files}
+
+
+def format_timestamps(timestamps):
+    """Format a page of epoch milliseconds timestamps at once.
+
+    :returns: tuple of the timestamps in strict_date_hour_minute_second format
+        and of their years.
+    """
+    dates = np.asarray(timestamps, dtype="int64").astype("datetime64[ms]")
+    formatted = np.datetime_as_string(dates, unit="s")
+    years = dates.astype("datetime64[Y]").astype("int64") + 1970
+    return formatted.tolist(), years.tolist()
+
 
 def flag_robots_and_COUNTER(entry):
     """Return a tuple of booleans.
@@ -30,9 +62,11 @@ def flag_robots_and_COUNTER(entry):
     return is_bot, before_COUNTER
 
 
-def process_download_event(entry, rec_context, logger):
+def process_download_event(entry, rec_context, logger, timestamp=None):
     """Entry from legacy stat events format.
 
+    ``timestamp`` is the already formatted timestamp of the entry, if any.
+
     {
         "id_bibrec": 2884810,
         "event_type": "events.downloads",
@@ -73,30 +107,22 @@ def process_download_event(entry, rec_context, logger):
     is_bot, before_COUNTER = flag_robots_and_COUNTER(entry)
 
     # Convert timestamp to strict_date_hour_minute_second format
-    timestamp = entry["timestamp"]
-    timestamp = datetime.utcfromtimestamp(timestamp / 1000).strftime(
-        "%Y-%m-%dT%H:%M:%S"
-    )
+    if timestamp is None:
+        timestamp = datetime.utcfromtimestamp(entry["timestamp"] / 1000).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
     assert str(entry["id_bibrec"]) == str(rec_context["legacy_recid"])
+    rec_context = compile_rec_context(rec_context)
 
     # Find the file version and assume the record version in the new system. If 0 (old events) we force to first version
     _legacy_file_version = 1 if entry["file_version"] == 0 else entry["file_version"]
-    _record_version = [
-        rec for rec in rec_context["versions"] if rec["version"] == _legacy_file_version
-    ]
+    _record_version = rec_context["_versions"].get(_legacy_file_version)
     if not _record_version:
         logger.warning(f"No record version found for {rec_context['legacy_recid']}")
         return {}
 
-    _record_version = _record_version[0]
-
-    _file_context = list(
-        filter(
-            lambda x: (
-                x if str(x["legacy_file_id"]) == str(entry["id_bibdoc"]) else False
-            ),
-            _record_version["files"],
-        )
+    _file_context = rec_context["_files"].get(
+        (_legacy_file_version, str(entry["id_bibdoc"]))
     )
 
     if not _file_context:
@@ -104,8 +130,6 @@ def process_download_event(entry, rec_context, logger):
             f"No file version found for {rec_context['legacy_recid']} and bibdoc {entry['id_bibdoc']}"
         )
         return {}
-    else:
-        _file_context = _file_context[0]
 
     return {
         "timestamp": timestamp,
@@ -132,9 +156,11 @@ def process_download_event(entry, rec_context, logger):
     }
 
 
-def process_pageview_event(entry, rec_context, logger):
+def process_pageview_event(entry, rec_context, logger, timestamp=None):
     """Entry from legacy stat events format.
 
+    ``timestamp`` is the already formatted timestamp of the entry, if any.
+
     {
         "_index": "cds-2023",
         "_id": "AYy3LvO8Bd18JHv_G38-",
@@ -178,10 +204,10 @@ def process_pageview_event(entry, rec_context, logger):
     is_bot, before_COUNTER = flag_robots_and_COUNTER(entry)
 
     # Convert timestamp to strict_date_hour_minute_second format
-    timestamp = entry["timestamp"]
-    timestamp = datetime.utcfromtimestamp(timestamp / 1000).strftime(
-        "%Y-%m-%dT%H:%M:%S"
-    )
+    if timestamp is None:
+        timestamp = datetime.utcfromtimestamp(entry["timestamp"] / 1000).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
 
     assert str(entry["id_bibrec"]) == str(rec_context["legacy_recid"])
 
@@ -217,28 +243,40 @@ def prepare_new_doc(
     legacy_to_rdm_events_map,
     dest_search_index_prefix,
 ):
-    """Produce a new statistic event for the destination cluster."""
-    for doc in data["hits"]["hits"]:
+    """Produce a new statistic event for the destination cluster.
+
+    The legacy hits are only read, the new events are built from scratch.
+    The timestamps and years of the whole page are computed at once.
+    """
+    rec_context = compile_rec_context(rec_context)
+    hits = data["hits"]["hits"]
+    try:
+        timestamps, years = format_timestamps(
+            [doc["_source"]["timestamp"] for doc in hits]
+        )
+    except (KeyError, TypeError, ValueError, OverflowError):
+        # malformed page, the events are converted one by one
+        timestamps = years = None
+
+    for i, doc in enumerate(hits):
+        timestamp = timestamps[i] if timestamps else None
         try:
-            new_doc = deepcopy(doc)
             # remove to avoid reindexing
-            new_doc["_id"] = f"migrated_{new_doc['_id']}"
-
-            new_doc.pop("_score", None)
+            new_id = f"migrated_{doc['_id']}"
 
-            event_type = new_doc["_source"].pop("event_type", None)
+            event_type = doc["_source"].get("event_type")
 
             if event_type != doc_type:
                 raise Exception("Inconsistent doc type")
 
             if event_type == "events.downloads":
                 processed_doc = process_download_event(
-                    new_doc["_source"], rec_context, logger
+                    doc["_source"], rec_context, logger, timestamp=timestamp
                 )
                 index_type = legacy_to_rdm_events_map[event_type]["type"]
             elif event_type == "events.pageviews":
                 processed_doc = process_pageview_event(
-                    new_doc["_source"], rec_context, logger
+                    doc["_source"], rec_context, logger, timestamp=timestamp
                 )
                 index_type = legacy_to_rdm_events_map[event_type]["type"]
             else:
@@ -257,14 +295,17 @@ def prepare_new_doc(
             logger.info("Processed: {0}".format(doc["_id"]))
 
             # Retrieve year from timestamp
-            date_object = datetime.fromisoformat(processed_doc["timestamp"])
-            year = f"{date_object.year:4}"
+            if years:
+                year = f"{years[i]:4}"
+            else:
+                date_object = datetime.fromisoformat(processed_doc["timestamp"])
+                year = f"{date_object.year:4}"
 
             yield {
                 "_op_type": "create",
                 "_index": f"{dest_search_index_prefix}-{index_type}-{year}",
                 "_source": processed_doc,
-                "_id": new_doc["_id"],
+                "_id": new_id,
             }
         except Exception as ex:
             logger.error(
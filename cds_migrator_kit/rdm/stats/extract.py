@@ -8,28 +8,78 @@
 """CDS-RDM migration extract module."""
 
 import json
-from os import listdir
-from os.path import isfile, join
 from pathlib import Path
 
 import click
 from invenio_rdm_migrator.extract import Extract
 
 
+def read_record_states(filepath):
+    """Yield the record states of a ``rdm_records_state.json`` file.
+
+    ``RecordStateLogger.finalise`` writes one record state per line between
+    brackets, which is read line by line. Any other JSON array, e.g. an
+    indented one, is loaded at once.
+    """
+    with open(filepath, "r", encoding="utf-8") as dump_file:
+        first = True
+        for line in dump_file:
+            line = line.strip()
+            if not line or line == "[":
+                continue
+            if line == "]":
+                return
+            try:
+                state = json.loads(line.rstrip(","))
+            except ValueError:
+                if not first:
+                    raise
+                state = None
+            if first and not isinstance(state, dict):
+                # not one record state per line, e.g. a one-line array
+                dump_file.seek(0)
+                yield from json.load(dump_file)
+                return
+            first = False
+            yield state
+
+
 class LegacyRecordStatsExtract(Extract):
     """LegacyRecordStatsExtract."""
 
     EVENT_TYPES = ["events.pageviews", "events.downloads"]
 
-    def __init__(self, filepath, **kwargs):
-        """Constructor."""
+    def __init__(self, filepath, recids=None, from_recid=None, to_recid=None, **kwargs):
+        """Constructor.
+
+        :param recids: legacy recids to extract, all of them if not set.
+        :param from_recid: lowest legacy recid to extract, included.
+        :param to_recid: highest legacy recid to extract, included.
+        """
         self.filepath = Path(filepath).absolute()
+        self.recids = {str(recid) for recid in recids} if recids is not None else None
+        self.from_recid = from_recid
+        self.to_recid = to_recid
+
+    def _selected(self, record_state):
+        """Return whether the record is in the subset or range of recids."""
+        recid = str(record_state["legacy_recid"])
+        if self.recids is not None and recid not in self.recids:
+            return False
+        if self.from_recid is not None and int(recid) < self.from_recid:
+            return False
+        if self.to_recid is not None and int(recid) > self.to_recid:
+            return False
+        return True
 
     def run(self):
         """Run."""
-        with open(self.filepath, "r") as dump_file:
-            data = json.load(dump_file)
-            with click.progressbar(data) as records:
-                for dump_record in records:
-                    for t in self.EVENT_TYPES:
-                        yield (t, dump_record)
+        record_states = (
+            record_state
+            for record_state in read_record_states(self.filepath)
+            if self._selected(record_state)
+        )
+        with click.progressbar(record_states, label="Records") as records:
+            for dump_record in records:
+                for t in self.EVENT_TYPES:
+                    yield (t, dump_record)
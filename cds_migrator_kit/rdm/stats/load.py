@@ -6,21 +6,35 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM migration load module."""
+import csv
 import json
 import logging
 import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
 from invenio_rdm_migrator.load.base import Load
 
-from cds_migrator_kit.rdm.stats.event_generator import prepare_new_doc
+from cds_migrator_kit.rdm.stats.aggregations import StatsAggregator
+from cds_migrator_kit.rdm.stats.checkpoint import StatsCheckpoint
+from cds_migrator_kit.rdm.stats.event_generator import (
+    compile_rec_context,
+    prepare_new_doc,
+)
 from cds_migrator_kit.rdm.stats.log import StatsLogger
 from cds_migrator_kit.rdm.stats.search import (
-    bulk_index_documents,
+    BulkIndexer,
+    generate_batch_query,
     generate_query,
+    os_aggregate,
     os_count,
     os_scroll,
     os_search,
+    os_search_query,
 )
+from cds_migrator_kit.rdm.stats.snapshot import NDJSONShardWriter, read_ndjson_shards
 
 logger = StatsLogger.get_logger()
 
@@ -42,8 +56,49 @@ _QUERY_VIEWS = {
 }
 
 
+def _legacy_file_ids(rec_context):
+    """Return the legacy ids of the migrated files of a record."""
+    return [
+        f["legacy_file_id"]
+        for version in rec_context.get("versions", [])
+        for f in version.get("files", [])
+    ]
+
+
 class CDSRecordStatsLoad(Load):
-    """CDSRecordStatsLoad."""
+    """CDSRecordStatsLoad.
+
+    With ``SRC_SEARCH_BATCH_SIZE`` greater than 1 in the config, the records
+    are buffered per event type and the legacy events of a whole batch of
+    records are fetched with a single scroll, each hit being routed to its
+    record by ``id_bibrec``.
+
+    Records with more than ``SRC_SEARCH_SLICE_THRESHOLD`` legacy events of a
+    type are scanned with a sliced scroll of ``SRC_SEARCH_SLICES`` slices,
+    consumed in parallel.
+
+    The migrated counts are validated once all the records are loaded, for
+    ``VALIDATION_BATCH_SIZE`` records at a time, and the mismatches are
+    written to ``VALIDATION_REPORT_FILEPATH``.
+
+    The new events of all the records go through a single bulk indexer,
+    configured with the ``DEST_BULK_*`` settings.
+
+    With ``REPLAY_DIR`` in the config, the legacy events are read from the
+    snapshot written by ``CDSRecordStatsExportLoad`` instead of the source
+    cluster.
+
+    With ``DEST_AGGREGATIONS`` enabled, the daily aggregations of the new
+    events are computed while loading each record and indexed in the
+    ``DEST_AGG_INDEX_PREFIX`` indices, along with the bookmarks, set to
+    ``less_than_date``, of the aggregations having migrated events.
+
+    With ``CHECKPOINT_FILEPATH`` in the config, the progress of each (recid,
+    event type) is saved: completed pairs are skipped when the migration is
+    run again. Only the records scanned one by one (``SRC_SEARCH_BATCH_SIZE``
+    of 1, without aggregations) are resumed from the timestamp of their last
+    indexed event, the partially migrated ones of a batch are scanned again.
+    """
 
     LEGACY_TO_RDM_EVENTS_MAP = {
         "events.pageviews": {
@@ -66,43 +121,335 @@ class CDSRecordStatsLoad(Load):
         self.config = config
         self.less_than_date = less_than_date
         self.dry_run = dry_run
+        self.batch_size = config.get("SRC_SEARCH_BATCH_SIZE", 1)
+        self.slices = config.get("SRC_SEARCH_SLICES", 1)
+        self.slice_threshold = config.get("SRC_SEARCH_SLICE_THRESHOLD", 100000)
+        self._batches = {event_type: {} for event_type in self.LEGACY_TO_RDM_EVENTS_MAP}
+        self._to_validate = {
+            event_type: {} for event_type in self.LEGACY_TO_RDM_EVENTS_MAP
+        }
+        self.replay_dir = config.get("REPLAY_DIR")
+        self._replay_contexts = {
+            event_type: {} for event_type in self.LEGACY_TO_RDM_EVENTS_MAP
+        }
+        self._replayed_counts = {
+            event_type: defaultdict(int) for event_type in self.LEGACY_TO_RDM_EVENTS_MAP
+        }
+        self.dry_run_filepath = config.get("DRY_RUN_OUTPUT_FILEPATH")
+        self.checkpoint = None
+        self.checkpoint_every = config.get("CHECKPOINT_EVERY", 10)
+        if config.get("CHECKPOINT_FILEPATH") and not dry_run:
+            self.checkpoint = StatsCheckpoint(config["CHECKPOINT_FILEPATH"])
+        self.aggregator = self._init_aggregator(config)
+        self._dry_run_lock = threading.Lock()
         self._init_config(config)
 
+    def _init_aggregator(self, config):
+        if not config.get("DEST_AGGREGATIONS"):
+            return None
+        return StatsAggregator(
+            config["DEST_AGG_INDEX_PREFIX"],
+            unique_field=config.get("DEST_AGG_UNIQUE_FIELD", "unique_session_id"),
+        )
+
     def _init_config(self, config):
         self.src_os_client = OpenSearch(hosts=config["SRC_SEARCH_HOSTS"])
         self.dest_os_client = OpenSearch(hosts=config["DEST_SEARCH_HOSTS"])
+        self.indexer = BulkIndexer.from_config(self.dest_os_client, logger, config)
 
     def _prepare(self, entry):
         """Prepare the record."""
         pass
 
-    def _generate_new_events(self, data, rec_context, logger, doc_type):
+    def _index_new_events(self, new_docs_generated, doc_type=None):
+        if self.aggregator and doc_type:
+            new_docs_generated = self.aggregator.observe(
+                self.LEGACY_TO_RDM_EVENTS_MAP[doc_type]["type"], new_docs_generated
+            )
         try:
-            new_docs_generated = prepare_new_doc(
+            if self.dry_run and self.dry_run_filepath:
+                lines = [json.dumps(new_doc) + "\n" for new_doc in new_docs_generated]
+                with self._dry_run_lock, open(self.dry_run_filepath, "a") as f:
+                    f.writelines(lines)
+            elif self.dry_run:
+                for new_doc in new_docs_generated:
+                    logger.warning(json.dumps(new_doc))
+            else:
+                self.indexer.index(new_docs_generated)
+
+        except Exception as ex:
+            logger.error(str(ex))
+
+    def _generate_new_events(self, data, rec_context, logger, doc_type):
+        self._index_new_events(
+            prepare_new_doc(
                 data,
                 rec_context,
                 logger,
                 doc_type,
                 self.LEGACY_TO_RDM_EVENTS_MAP,
                 self.config["DEST_SEARCH_INDEX_PREFIX"],
+            ),
+            doc_type=doc_type,
+        )
+
+    def _flush_aggregations(self, discard=False):
+        """Index the aggregations of the records loaded so far.
+
+        The aggregations of a record are complete once all its events are
+        loaded, hence they are discarded when the load of a record failed.
+        """
+        if not self.aggregator:
+            return
+        actions = self.aggregator.flush()
+        if actions and not discard:
+            self._index_new_events(actions)
+
+    def _save_position(self, recid, event_type, data, page):
+        """Save the position of a record scan every ``CHECKPOINT_EVERY`` pages."""
+        if not self.checkpoint or not data["hits"]["hits"]:
+            return
+        if (page + 1) % self.checkpoint_every:
+            return
+        # the position is saved only once the events before it are indexed
+        self.indexer.flush()
+        self.checkpoint.update(
+            recid, event_type, data["hits"]["hits"][-1]["_source"]["timestamp"]
+        )
+
+    def _complete(self, recids, event_type):
+        """Mark the pairs as migrated, once all their events are indexed."""
+        if not self.checkpoint:
+            return
+        self.indexer.flush()
+        for recid in recids:
+            self.checkpoint.complete(recid, event_type)
+
+    def _write_bookmarks(self):
+        """Set the bookmarks of the aggregations of the migrated events."""
+        if not self.aggregator or self.dry_run:
+            return
+        for bookmark in self.aggregator.bookmarks(self.less_than_date):
+            self.dest_os_client.index(
+                index=f"{self.config['DEST_AGG_INDEX_PREFIX']}-bookmarks",
+                body=bookmark,
             )
-            if self.dry_run:
-                for new_doc in new_docs_generated:
-                    logger.warning(json.dumps(new_doc))
-            else:
-                bulk_index_documents(self.dest_os_client, new_docs_generated, logger)
 
-        except Exception as ex:
-            logger.error(str(ex))
+    def _generate_new_events_for_batch(self, data, rec_contexts, doc_type):
+        """Route the hits of a page to their record and index the new events."""
+        hits_by_recid = defaultdict(list)
+        for hit in data["hits"]["hits"]:
+            hits_by_recid[str(hit["_source"]["id_bibrec"])].append(hit)
 
-    def _process_legacy_events_for_recid(self, recid, rec_context, index, event_type):
+        new_docs = []
+        for recid, hits in hits_by_recid.items():
+            rec_context = rec_contexts.get(recid)
+            if rec_context is None:
+                logger.error(f"No record context for legacy recid {recid}")
+                continue
+            new_docs.append(
+                prepare_new_doc(
+                    {"hits": {"hits": hits}},
+                    rec_context,
+                    logger,
+                    doc_type,
+                    self.LEGACY_TO_RDM_EVENTS_MAP,
+                    self.config["DEST_SEARCH_INDEX_PREFIX"],
+                )
+            )
+        # one bulk request stream per page, whatever the number of records
+        self._index_new_events(chain.from_iterable(new_docs), doc_type=doc_type)
+
+    def _scroll_pages(self, data):
+        """Yield the pages of a scroll, starting from the search response."""
+        sid = data["_scroll_id"]
+        try:
+            while data["hits"]["hits"]:
+                yield data
+                data = os_scroll(
+                    self.src_os_client, sid, self.config["SRC_SEARCH_SCROLL"]
+                )
+                sid = data["_scroll_id"]
+        finally:
+            self.src_os_client.clear_scroll(scroll_id=sid)
+
+    def _process_legacy_events_for_batch(self, rec_contexts, index, event_type):
+        """Migrate the legacy events of several records with a single scroll.
+
+        :param rec_contexts: dict of legacy recid to its record context.
+        """
         file_ids = None
         if event_type == "events.downloads":
+            # records without migrated files have no downloads to migrate
+            rec_contexts = {
+                recid: rec_context
+                for recid, rec_context in rec_contexts.items()
+                if _legacy_file_ids(rec_context)
+            }
             file_ids = [
-                f["legacy_file_id"]
-                for version in rec_context.get("versions", [])
-                for f in version.get("files", [])
+                file_id
+                for rec_context in rec_contexts.values()
+                for file_id in _legacy_file_ids(rec_context)
             ]
+        if not rec_contexts:
+            return
+
+        q = generate_batch_query(
+            event_type,
+            list(rec_contexts),
+            self.LEGACY_TO_RDM_EVENTS_MAP,
+            self.less_than_date,
+            file_ids=file_ids,
+        )
+        data = os_search_query(
+            self.src_os_client,
+            index,
+            q,
+            self.config["SRC_SEARCH_SIZE"],
+            self.config["SRC_SEARCH_SCROLL"],
+        )
+        total = data["hits"]["total"]["value"]
+        logger.info(
+            f"Total number of results for {len(rec_contexts)} records: {total} <{event_type}>"
+        )
+        for page in self._scroll_pages(data):
+            self._generate_new_events_for_batch(page, rec_contexts, event_type)
+
+        logger.info("Done!")
+
+    def _flush_batch(self, event_type):
+        """Migrate the buffered records of an event type."""
+        rec_contexts = self._batches[event_type]
+        self._batches[event_type] = {}
+        if not rec_contexts:
+            return
+        try:
+            self._process_legacy_events_for_batch(rec_contexts, "cds-2*", event_type)
+        except Exception as ex:
+            logger.error(
+                f"Failed to migrate `{event_type}` of records {list(rec_contexts)}: {ex}"
+            )
+            self._flush_aggregations(discard=True)
+            return
+        self._flush_aggregations()
+        self._complete(rec_contexts, event_type)
+        self._add_to_validate(rec_contexts, event_type)
+
+    def _replay_page(self, hits, event_type, file_ids):
+        """Migrate a page of legacy events read from the snapshot."""
+        rec_contexts = self._replay_contexts[event_type]
+        counts = self._replayed_counts[event_type]
+        for hit in hits:
+            recid = str(hit["_source"]["id_bibrec"])
+            if file_ids is not None:
+                # only the events of the migrated files are counted in legacy
+                if str(hit["_source"].get("id_bibdoc")) not in file_ids[recid]:
+                    continue
+            counts[recid] += 1
+        self._generate_new_events_for_batch(
+            {"hits": {"hits": hits}}, rec_contexts, event_type
+        )
+
+    def _replay(self):
+        """Migrate the legacy events of the loaded records from the snapshot."""
+        logger.info(f"Replaying the legacy events of {self.replay_dir}")
+        file_ids = {
+            "events.downloads": {
+                recid: {str(file_id) for file_id in _legacy_file_ids(rec_context)}
+                for recid, rec_context in self._replay_contexts[
+                    "events.downloads"
+                ].items()
+            }
+        }
+        pages = {event_type: [] for event_type in self._replay_contexts}
+        for hit in read_ndjson_shards(self.replay_dir):
+            event_type = hit["_source"].get("event_type")
+            rec_contexts = self._replay_contexts.get(event_type)
+            if not rec_contexts or str(hit["_source"]["id_bibrec"]) not in rec_contexts:
+                continue
+            page = pages[event_type]
+            page.append(hit)
+            if len(page) >= self.config["SRC_SEARCH_SIZE"]:
+                self._replay_page(page, event_type, file_ids.get(event_type))
+                pages[event_type] = []
+        for event_type, page in pages.items():
+            if page:
+                self._replay_page(page, event_type, file_ids.get(event_type))
+        for event_type, rec_contexts in self._replay_contexts.items():
+            self._add_to_validate(rec_contexts, event_type)
+        logger.info("Done!")
+
+    def _process_slice(self, q, slice_id, rec_context, index, event_type):
+        """Migrate the legacy events of one slice of a sliced scroll."""
+        q = {**q, "slice": {"id": slice_id, "max": self.slices}}
+        data = os_search_query(
+            self.src_os_client,
+            index,
+            q,
+            self.config["SRC_SEARCH_SIZE"],
+            self.config["SRC_SEARCH_SCROLL"],
+        )
+        for page in self._scroll_pages(data):
+            self._generate_new_events(page, rec_context, logger, doc_type=event_type)
+
+    def _process_legacy_events_sliced(
+        self, recid, rec_context, index, event_type, file_ids=None, after=None
+    ):
+        """Migrate the legacy events of a record with parallel sliced scrolls."""
+        q = generate_query(
+            event_type,
+            recid,
+            self.LEGACY_TO_RDM_EVENTS_MAP,
+            self.less_than_date,
+            file_ids=file_ids,
+            after=after,
+        )
+        logger.info(f"Scanning {recid} <{event_type}> with {self.slices} slices")
+        with ThreadPoolExecutor(max_workers=self.slices) as executor:
+            futures = [
+                executor.submit(
+                    self._process_slice, q, slice_id, rec_context, index, event_type
+                )
+                for slice_id in range(self.slices)
+            ]
+            for future in futures:
+                # re-raise the errors of the slices
+                future.result()
+
+        logger.info("Done!")
+
+    def _process_legacy_events_for_recid(self, recid, rec_context, index, event_type):
+        file_ids = None
+        if event_type == "events.downloads":
+            file_ids = _legacy_file_ids(rec_context)
+
+        after = None
+        # the daily aggregations need all the events of the record
+        if self.checkpoint and not self.aggregator:
+            after = self.checkpoint.position(recid, event_type)
+            if after is not None:
+                logger.info(f"Resuming {recid} <{event_type}> from {after}")
+
+        if self.slices > 1:
+            # heavy records are scanned with a sliced scroll, counted first
+            q = generate_query(
+                event_type,
+                recid,
+                self.LEGACY_TO_RDM_EVENTS_MAP,
+                self.less_than_date,
+                file_ids=file_ids,
+                after=after,
+            )
+            if os_count(self.src_os_client, index, q)["count"] > self.slice_threshold:
+                self._process_legacy_events_sliced(
+                    recid,
+                    rec_context,
+                    index,
+                    event_type,
+                    file_ids=file_ids,
+                    after=after,
+                )
+                return
 
         data = os_search(
             self.src_os_client,
@@ -114,6 +461,9 @@ class CDSRecordStatsLoad(Load):
             self.LEGACY_TO_RDM_EVENTS_MAP,
             self.less_than_date,
             file_ids=file_ids,
+            after=after,
+            # the position of a checkpointed scan is its last event
+            sort=[{"timestamp": "asc"}] if self.checkpoint else None,
         )
         # Get the scroll ID
         sid = data["_scroll_id"]
@@ -122,6 +472,7 @@ class CDSRecordStatsLoad(Load):
         logger.info("Total number of results for id: {0} <{1}>".format(total, recid))
 
         self._generate_new_events(data, rec_context, logger, doc_type=event_type)
+        self._save_position(recid, event_type, data, 0)
 
         tot_chunks = total // self.config["SRC_SEARCH_SIZE"]
         if total % self.config["SRC_SEARCH_SIZE"] > 0:
@@ -144,82 +495,289 @@ class CDSRecordStatsLoad(Load):
                 continue
 
             self._generate_new_events(data, rec_context, logger, doc_type=event_type)
+            self._save_position(recid, event_type, data, i)
 
         self.src_os_client.clear_scroll(scroll_id=sid)
 
         logger.info("Done!")
 
-    def validate_stats_for_recid(self, recid, record, event_type):
-        """Validate that stats in legacy and new RDM."""
-        # For downloads, only count legacy events for files that were actually migrated
+    def _add_to_validate(self, rec_contexts, event_type):
+        """Keep what the validation needs of the migrated records.
+
+        Only the parent and, for the downloads, the legacy ids of the migrated
+        files are kept, not the compiled record contexts.
+        """
+        to_validate = self._to_validate[event_type]
+        for recid, rec_context in rec_contexts.items():
+            to_validate[recid] = {
+                "parent_recid": rec_context["parent_recid"],
+                "file_ids": (
+                    _legacy_file_ids(rec_context)
+                    if event_type == "events.downloads"
+                    else None
+                ),
+            }
+
+    def _legacy_counts(self, records, event_type):
+        """Count the legacy events of several records with one aggregation.
+
+        :param records: the parent and migrated file ids of each legacy recid,
+            see ``_add_to_validate``.
+        """
         file_ids = None
         if event_type == "events.downloads":
             file_ids = [
-                f["legacy_file_id"]
-                for version in record.get("versions", [])
-                for f in version.get("files", [])
+                file_id for record in records.values() for file_id in record["file_ids"]
             ]
-
-        legacy_total = os_count(
-            self.src_os_client,
-            "cds-2*",
-            q=generate_query(
-                event_type,
-                recid,
-                self.LEGACY_TO_RDM_EVENTS_MAP,
-                self.less_than_date,
-                file_ids=file_ids,
-            ),
-        )
-        logger.info(
-            f"Total amount of records of type `{event_type}` in legacy: {legacy_total['count']}"
+        q = generate_batch_query(
+            event_type,
+            list(records),
+            self.LEGACY_TO_RDM_EVENTS_MAP,
+            self.less_than_date,
+            file_ids=file_ids,
         )
+        q["aggs"] = {"recids": {"terms": {"field": "id_bibrec", "size": len(records)}}}
+        if file_ids is not None:
+            # only the events of the files migrated with the record are counted
+            q["aggs"]["recids"]["aggs"] = {
+                "files": {"terms": {"field": "id_bibdoc", "size": len(file_ids) or 1}}
+            }
+
+        data = os_aggregate(self.src_os_client, "cds-2*", q)
+        counts = {recid: 0 for recid in records}
+        for bucket in data["aggregations"]["recids"]["buckets"]:
+            recid = str(bucket["key"])
+            if recid not in counts:
+                continue
+            if file_ids is None:
+                counts[recid] = bucket["doc_count"]
+            else:
+                record_file_ids = {
+                    str(file_id) for file_id in records[recid]["file_ids"]
+                }
+                counts[recid] = sum(
+                    file_bucket["doc_count"]
+                    for file_bucket in bucket["files"]["buckets"]
+                    if str(file_bucket["key"]) in record_file_ids
+                )
+        return counts
+
+    def _rdm_counts(self, records, event_type):
+        """Count the migrated events of several records with one aggregation."""
+        parent_recids = list({record["parent_recid"] for record in records.values()})
         _index = f"{self.config['DEST_SEARCH_INDEX_PREFIX']}-{self.LEGACY_TO_RDM_EVENTS_MAP[event_type]['type']}*"
-        # refresh index
-        self.dest_os_client.indices.refresh(index=_index)
-        new_total = os_count(
+        data = os_aggregate(
             self.dest_os_client,
             _index,
-            q={
+            {
                 "query": {
                     "bool": {
                         "must": [
-                            {"match": {"parent_recid": record["parent_recid"]}},
+                            {"terms": {"parent_recid": parent_recids}},
                             {"match": {"is_lcds": True}},
                         ]
                     }
-                }
+                },
+                "aggs": {
+                    "parents": {
+                        "terms": {
+                            "field": "parent_recid",
+                            "size": len(parent_recids),
+                        }
+                    }
+                },
             },
         )
-        logger.info(
-            f"Total amount of records of type `{event_type}` in RDM: {new_total['count']}"
-        )
+        return {
+            bucket["key"]: bucket["doc_count"]
+            for bucket in data["aggregations"]["parents"]["buckets"]
+        }
+
+    def validate_stats(self):
+        """Validate the stats of all the loaded records in RDM.
 
+        The destination indices are refreshed once and the legacy and RDM
+        counts are compared for many records at once. Mismatches are logged
+        and written to the validation report.
+        """
+        if self.dry_run or not any(self._to_validate.values()):
+            return
+        self.dest_os_client.indices.refresh(
+            index=f"{self.config['DEST_SEARCH_INDEX_PREFIX']}-*"
+        )
+        batch_size = self.config.get("VALIDATION_BATCH_SIZE", 500)
+        report_filepath = self.config.get("VALIDATION_REPORT_FILEPATH")
+        report_file = (
+            open(report_filepath, "w", newline="") if report_filepath else None
+        )
         try:
-            assert legacy_total["count"] == new_total["count"]
-            file_ids_msg = f" - Legacy file_ids: {file_ids}" if file_ids is not None else ""
-            logger.warning(
-                f"Successfully migrated statistics for {recid} `{event_type}` in RDM: {new_total['count']}{file_ids_msg}"
-            )
-        except AssertionError as e:
-            file_ids_msg = f" file_ids: {file_ids}" if file_ids is not None else ""
-            logger.warning(
-                f"Not all events of type {event_type} were migrated for record: {recid}. Legacy count: {legacy_total['count']} - RDM count: {new_total['count']} -{file_ids_msg}"
-            )
+            if report_file:
+                report = csv.writer(report_file)
+                report.writerow(
+                    [
+                        "legacy_recid",
+                        "parent_recid",
+                        "event_type",
+                        "legacy_count",
+                        "rdm_count",
+                    ]
+                )
+            for event_type, records in self._to_validate.items():
+                recids = list(records)
+                for start in range(0, len(recids), batch_size):
+                    batch = {
+                        recid: records[recid]
+                        for recid in recids[start : start + batch_size]
+                    }
+                    try:
+                        if self.replay_dir:
+                            # the snapshot is the legacy side of the comparison
+                            legacy_counts = {
+                                recid: self._replayed_counts[event_type][recid]
+                                for recid in batch
+                            }
+                        else:
+                            legacy_counts = self._legacy_counts(batch, event_type)
+                        rdm_counts = self._rdm_counts(batch, event_type)
+                    except Exception as ex:
+                        logger.error(
+                            f"Failed to validate `{event_type}` of records {list(batch)}: {ex}"
+                        )
+                        continue
+                    for recid, record in batch.items():
+                        legacy_count = legacy_counts[recid]
+                        rdm_count = rdm_counts.get(record["parent_recid"], 0)
+                        if legacy_count == rdm_count:
+                            logger.warning(
+                                f"Successfully migrated statistics for {recid} `{event_type}` in RDM: {rdm_count}"
+                            )
+                            continue
+                        logger.warning(
+                            f"Not all events of type {event_type} were migrated for record: {recid}. Legacy count: {legacy_count} - RDM count: {rdm_count}"
+                        )
+                        if report_file:
+                            report.writerow(
+                                [
+                                    recid,
+                                    record["parent_recid"],
+                                    event_type,
+                                    legacy_count,
+                                    rdm_count,
+                                ]
+                            )
+        finally:
+            if report_file:
+                report_file.close()
+        self._to_validate = {event_type: {} for event_type in self._to_validate}
 
     def _load(self, entry):
         """Use the services to load the entries."""
         if entry:
             event_type, record = entry
             recid = record["legacy_recid"]
+            if self.checkpoint and self.checkpoint.is_done(recid, event_type):
+                logger.info(f"Skipping {recid} <{event_type}>, already migrated")
+                return
+            # compiled once for all the pages of the record
+            record = compile_rec_context(record)
+            if self.replay_dir:
+                self._replay_contexts[event_type][str(recid)] = record
+                return
+            if self.batch_size > 1:
+                batch = self._batches[event_type]
+                batch[str(recid)] = record
+                if len(batch) >= self.batch_size:
+                    self._flush_batch(event_type)
+                return
             try:
                 self._process_legacy_events_for_recid(
                     recid, record, "cds-2*", event_type
                 )
-                self.validate_stats_for_recid(recid, record, event_type)
+                self._flush_aggregations()
+                self._complete([recid], event_type)
+                self._add_to_validate({str(recid): record}, event_type)
             except Exception as ex:
                 logger.error(ex)
+                self._flush_aggregations(discard=True)
+
+    def run(self, entries, cleanup=False):
+        """Load the entries, then the records left in the batches.
+
+        The stats are validated once all the records are loaded and indexed.
+        """
+        if self.dry_run and self.dry_run_filepath:
+            # new events of the previous dry run
+            open(self.dry_run_filepath, "w").close()
+        with self.indexer:
+            super().run(entries, cleanup=False)
+            for event_type in self._batches:
+                self._flush_batch(event_type)
+            if self.replay_dir:
+                self._replay()
+                self._flush_aggregations()
+                for event_type, rec_contexts in self._replay_contexts.items():
+                    self._complete(rec_contexts, event_type)
+        self._write_bookmarks()
+        if self.indexer.failed:
+            logger.error(
+                f"{self.indexer.failed} events failed to index, see "
+                f"{self.config.get('DEST_BULK_RETRY_FILEPATH')}"
+            )
+        self.validate_stats()
+        if cleanup:
+            self._cleanup()
 
     def _cleanup(self, *args, **kwargs):
         """Cleanup the entries."""
         pass
+
+
+class CDSRecordStatsExportLoad(CDSRecordStatsLoad):
+    """Export the legacy events of the records to a local snapshot.
+
+    The legacy events are scanned as for a migration and written, as they
+    are, to gzipped NDJSON shards in ``EXPORT_DIR``, to be replayed later
+    with ``REPLAY_DIR``.
+    """
+
+    def __init__(self, config, less_than_date, dry_run=False):
+        """Constructor."""
+        super().__init__(config, less_than_date, dry_run=dry_run)
+        self.writer = NDJSONShardWriter(
+            config["EXPORT_DIR"], shards=config.get("EXPORT_SHARDS", 16)
+        )
+        # the snapshot is built from the source cluster
+        self.replay_dir = None
+        self.checkpoint = None
+
+    def _export(self, hits):
+        for hit in hits:
+            self.writer.write(
+                hit["_source"]["id_bibrec"],
+                {"_index": hit["_index"], "_id": hit["_id"], "_source": hit["_source"]},
+            )
+
+    def _init_aggregator(self, config):
+        """Nothing is aggregated on export."""
+        return None
+
+    def _generate_new_events(self, data, rec_context, logger, doc_type):
+        self._export(data["hits"]["hits"])
+
+    def _generate_new_events_for_batch(self, data, rec_contexts, doc_type):
+        self._export(data["hits"]["hits"])
+
+    def validate_stats(self):
+        """Nothing is migrated on export."""
+        pass
+
+    def _write_bookmarks(self):
+        """Nothing is aggregated on export."""
+        pass
+
+    def run(self, entries, cleanup=False):
+        """Export the legacy events of the entries."""
+        try:
+            super().run(entries, cleanup=cleanup)
+        finally:
+            self.writer.close()
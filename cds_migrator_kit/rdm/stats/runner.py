@@ -21,7 +21,16 @@ class RecordStatsRunner:
     """ETL streams runner."""
 
     def __init__(
-        self, stream_definition, filepath, config, less_than_date, log_dir, dry_run
+        self,
+        stream_definition,
+        filepath,
+        config,
+        less_than_date,
+        log_dir,
+        dry_run,
+        recids=None,
+        from_recid=None,
+        to_recid=None,
     ):
         """Constructor."""
         self.config = config
@@ -33,7 +42,9 @@ class RecordStatsRunner:
 
         self.stream = Stream(
             stream_definition.name,
-            extract=stream_definition.extract_cls(filepath),
+            extract=stream_definition.extract_cls(
+                filepath, recids=recids, from_recid=from_recid, to_recid=to_recid
+            ),
             transform=stream_definition.transform_cls(),
             load=stream_definition.load_cls(
                 dry_run=dry_run, config=config, less_than_date=less_than_date
@@ -8,18 +8,29 @@
 """CDS-RDM migration stats search module."""
 
 import json
+import queue
+import threading
 import time
+from collections import deque
 from copy import deepcopy
 from datetime import datetime
 
 from opensearchpy.exceptions import OpenSearchException
-from opensearchpy.helpers import BulkIndexError, parallel_bulk
+from opensearchpy.helpers import BulkIndexError, parallel_bulk, streaming_bulk
 
 
 def generate_query(
-    doc_type, identifier, legacy_to_rdm_events_map, less_than_date, file_ids=None
+    doc_type,
+    identifier,
+    legacy_to_rdm_events_map,
+    less_than_date,
+    file_ids=None,
+    after=None,
 ):
-    """Generate legacy query based on event type."""
+    """Generate legacy query based on event type.
+
+    ``after`` is the epoch-ms timestamp from which the events are resumed.
+    """
     q = deepcopy(legacy_to_rdm_events_map[doc_type]["query"])
     q["query"]["bool"]["must"][0]["match"]["id_bibrec"] = identifier
     q["query"]["bool"]["must"][1]["match"]["event_type"] = doc_type
@@ -32,6 +43,20 @@ def generate_query(
     if file_ids is not None:
         q["query"]["bool"]["filter"].append({"terms": {"id_bibdoc": file_ids}})
 
+    if after is not None:
+        q["query"]["bool"]["filter"].append({"range": {"timestamp": {"gte": after}}})
+
+    return q
+
+
+def generate_batch_query(
+    doc_type, identifiers, legacy_to_rdm_events_map, less_than_date, file_ids=None
+):
+    """Generate legacy query for the events of several records at once."""
+    q = generate_query(
+        doc_type, None, legacy_to_rdm_events_map, less_than_date, file_ids=file_ids
+    )
+    q["query"]["bool"]["must"][0] = {"terms": {"id_bibrec": list(identifiers)}}
     return q
 
 
@@ -45,13 +70,27 @@ def os_search(
     legacy_to_rdm_events_map,
     less_than_date,
     file_ids=None,
+    after=None,
+    sort=None,
 ):
     """Sear utility."""
-    ex = None
-    i = 0
     q = generate_query(
-        doc_type, identifier, legacy_to_rdm_events_map, less_than_date, file_ids=file_ids
+        doc_type,
+        identifier,
+        legacy_to_rdm_events_map,
+        less_than_date,
+        file_ids=file_ids,
+        after=after,
     )
+    if sort:
+        q["sort"] = sort
+    return os_search_query(src_os_client, index, q, search_size, search_scroll)
+
+
+def os_search_query(src_os_client, index, q, search_size, search_scroll):
+    """Search utility for a prebuilt query."""
+    ex = None
+    i = 0
     while i < 10:
         try:
             return src_os_client.search(
@@ -81,6 +120,24 @@ def os_scroll(src_os_client, scroll_id, scroll_size):
     raise ex
 
 
+def os_aggregate(src_os_client, index, q):
+    """Aggregation utility, returning no hits."""
+    ex = None
+    i = 0
+    while i < 10:
+        try:
+            return src_os_client.search(
+                index=index,
+                size=0,
+                body=q,
+            )
+        except OpenSearchException as _ex:
+            i += 1
+            ex = _ex
+            time.sleep(10)
+    raise ex
+
+
 def os_count(src_os_client, index, q):
     """Count utility."""
     ex = None
@@ -131,3 +188,165 @@ def bulk_index_documents(
                 "_id": error["create"]["_id"],
             }
             logger.error(f"Failed to index: {json.dumps(_failed_doc)}")
+
+
+class BulkIndexer:
+    """Long-lived bulk indexer shared by all the records of a run.
+
+    The actions are sent to a bounded queue consumed by ``threads`` workers,
+    each one streaming them to the cluster in chunks. Producers block when
+    the queue is full, so the scroll readers go at the pace of the indexing.
+    Failed actions are logged and appended to ``retry_filepath``, as
+    NDJSON, to be indexed again later.
+    """
+
+    _STOP = object()
+    _FLUSH = object()
+
+    def __init__(
+        self,
+        client,
+        logger,
+        threads=4,
+        chunk_size=500,
+        max_chunk_bytes=50 * 1024 * 1024,
+        queue_size=10000,
+        retry_filepath=None,
+    ):
+        """Constructor."""
+        self.client = client
+        self.logger = logger
+        self.threads = threads
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.retry_filepath = retry_filepath
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = []
+        self._barrier = threading.Barrier(threads)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, client, logger, config, **kwargs):
+        """Create an indexer from the ``DEST_BULK_*`` settings of the config."""
+        return cls(
+            client,
+            logger,
+            threads=config.get("DEST_BULK_THREADS", 4),
+            chunk_size=config.get("DEST_BULK_CHUNK_SIZE", 500),
+            max_chunk_bytes=config.get("DEST_BULK_MAX_CHUNK_BYTES", 50 * 1024 * 1024),
+            queue_size=config.get("DEST_BULK_QUEUE_SIZE", 10000),
+            retry_filepath=config.get("DEST_BULK_RETRY_FILEPATH"),
+            **kwargs,
+        )
+
+    def __enter__(self):
+        """Start the workers."""
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        """Flush the queued actions and stop the workers."""
+        self.close()
+
+    def start(self):
+        """Start the workers, if not running yet."""
+        if self._workers:
+            return
+        self._workers = [
+            threading.Thread(target=self._work, name=f"bulk-indexer-{i}", daemon=True)
+            for i in range(self.threads)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def index(self, actions):
+        """Queue actions, blocking while the queue is full."""
+        self.start()
+        for action in actions:
+            self._queue.put(action)
+
+    def flush(self):
+        """Wait for the queued actions to be indexed."""
+        if not self._workers:
+            return
+        for _ in self._workers:
+            self._queue.put(self._FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Wait for the queued actions to be indexed and stop the workers."""
+        for _ in self._workers:
+            self._queue.put(self._STOP)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _fail(self, action, error):
+        """Log a failed action and keep it for a retry."""
+        self.logger.error(f"Failed to index: {json.dumps(action)} error: {error}")
+        with self._lock:
+            self.failed += 1
+            if self.retry_filepath:
+                with open(self.retry_filepath, "a") as retry_file:
+                    retry_file.write(json.dumps(action) + "\n")
+
+    def _consume(self):
+        """Index the queued actions until a marker is received.
+
+        :returns: the received marker, or ``None`` if the indexing failed
+            before receiving it.
+        """
+        marker = None
+        # actions sent and waiting for their result, in order
+        pending = deque()
+
+        def actions():
+            nonlocal marker
+            while True:
+                action = self._queue.get()
+                if action is self._STOP or action is self._FLUSH:
+                    marker = action
+                    return
+                pending.append(action)
+                yield action
+
+        try:
+            for ok, item in streaming_bulk(
+                self.client,
+                actions(),
+                chunk_size=self.chunk_size,
+                max_chunk_bytes=self.max_chunk_bytes,
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                action = pending.popleft()
+                try:
+                    if ok:
+                        continue
+                    result = next(iter(item.values()))
+                    # 409 Conflict, the event was already migrated
+                    if result.get("status") == 409:
+                        continue
+                    self._fail(action, result.get("error"))
+                finally:
+                    self._queue.task_done()
+        except Exception as ex:
+            # keep consuming the queue, the producers would block forever
+            for action in pending:
+                self._fail(action, str(ex))
+                self._queue.task_done()
+        return marker
+
+    def _work(self):
+        """Index the queued actions until stopped."""
+        while True:
+            marker = self._consume()
+            if marker is None:
+                continue
+            self._queue.task_done()
+            if marker is self._STOP:
+                return
+            # wait for the other workers to flush, so that each one of them
+            # gets one of the flush markers
+            self._barrier.wait()
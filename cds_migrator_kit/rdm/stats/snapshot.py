@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration stats legacy events snapshot module."""
+
+import gzip
+import json
+import threading
+import zlib
+from pathlib import Path
+
+
+class NDJSONShardWriter:
+    """Write JSON documents to gzipped NDJSON shards, by key."""
+
+    def __init__(self, directory, shards=16, prefix="events"):
+        """Constructor."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shards = shards
+        self.prefix = prefix
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _shard_of(self, key):
+        try:
+            return int(key) % self.shards
+        except (TypeError, ValueError):
+            return zlib.crc32(str(key).encode("utf-8")) % self.shards
+
+    def write(self, key, document):
+        """Append a document to the shard of its key."""
+        shard = self._shard_of(key)
+        line = json.dumps(document) + "\n"
+        with self._lock:
+            shard_file = self._files.get(shard)
+            if shard_file is None:
+                shard_file = gzip.open(
+                    self.directory / f"{self.prefix}-{shard:04d}.ndjson.gz", "at"
+                )
+                self._files[shard] = shard_file
+            shard_file.write(line)
+
+    def close(self):
+        """Close the shards."""
+        with self._lock:
+            for shard_file in self._files.values():
+                shard_file.close()
+            self._files = {}
+
+
+def read_ndjson_shards(directory, prefix="events"):
+    """Yield the documents of the gzipped NDJSON shards of a directory."""
+    for filepath in sorted(Path(directory).glob(f"{prefix}-*.ndjson.gz")):
+        with gzip.open(filepath, "rt") as shard_file:
+            for line in shard_file:
+                if line.strip():
+                    yield json.loads(line)
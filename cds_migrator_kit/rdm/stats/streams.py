@@ -10,7 +10,7 @@ from invenio_rdm_migrator.streams import StreamDefinition
 from invenio_rdm_migrator.transform import IdentityTransform
 
 from .extract import LegacyRecordStatsExtract
-from .load import CDSRecordStatsLoad
+from .load import CDSRecordStatsExportLoad, CDSRecordStatsLoad
 
 RecordStatsStreamDefinition = StreamDefinition(
     name="stats",
@@ -19,3 +19,11 @@ RecordStatsStreamDefinition = StreamDefinition(
     load_cls=CDSRecordStatsLoad,
 )
 """ETL stream for CDS to RDM records statistics."""
+
+RecordStatsExportStreamDefinition = StreamDefinition(
+    name="stats-export",
+    extract_cls=LegacyRecordStatsExtract,
+    transform_cls=IdentityTransform,
+    load_cls=CDSRecordStatsExportLoad,
+)
+"""ETL stream exporting the CDS legacy statistics events of records."""
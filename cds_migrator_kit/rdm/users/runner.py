@@ -15,6 +15,7 @@ from invenio_rdm_migrator.streams import Stream
 from cds_migrator_kit.rdm.affiliations.log import AffiliationsLogger
 from cds_migrator_kit.rdm.users.api import CDSMigrationUserAPI
 from cds_migrator_kit.rdm.users.log import SubmitterLogger
+from cds_migrator_kit.users.transform import SUBMITTER_MARC_TAGS
 
 from .transform import people_marc21, users_migrator_marc21
 
@@ -63,7 +64,7 @@ class SubmitterRunner:
             stream_definition.name,
             extract=stream_definition.extract_cls(dirpath),
             transform=stream_definition.transform_cls(
-                dojson_model=users_migrator_marc21
+                dojson_model=users_migrator_marc21, marc_tags=SUBMITTER_MARC_TAGS
             ),
             load=stream_definition.load_cls(
                 dry_run=dry_run,
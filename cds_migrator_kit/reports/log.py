@@ -118,6 +118,14 @@ class MigrationProgressLogger:
         """Finalise logging files."""
         self.error_file.close()
 
+    def merge_log(self, filepath):
+        """Append the rows of another progress log file, e.g. of a load worker."""
+        csv.field_size_limit(10 * 1024 * 1024)  # 10 MB
+        with open(filepath, "r", newline="") as f:
+            for row in csv.DictReader(f):
+                self.log_writer.writerow(row)
+        self.error_file.flush()
+
     def add_log(self, exc, record=None, key=None, value=None):
         """Add exception log."""
         logger_migrator = logging.getLogger("migrator-rules")
@@ -223,6 +231,11 @@ class RecordStateLogger:
         """Add record state."""
         self._record_states.append(record_state)
 
+    def merge_record_states(self, filepath):
+        """Add the record states of another state file, e.g. of a load worker."""
+        with open(filepath, encoding="utf-8") as f:
+            self._record_states.extend(json.load(f))
+
     def finalise(self):
         """Finalise logging files."""
         # Write records
@@ -17,6 +17,7 @@ from cds_migrator_kit.reports.log import (
     RecordStateLogger,
     StandardLogger,
 )
+from cds_migrator_kit.runner.sharded import ShardedLoad
 
 
 # local version of the invenio-rdm-migrator Runner class
@@ -38,6 +39,7 @@ class Runner:
         collection,
         keep_logs,
         workers=None,
+        load_workers=None,
     ):
         """Constructor."""
         config = self._read_config(config_filepath)
@@ -98,24 +100,33 @@ class Runner:
                         record_state_logger=self.record_state_logger,
                     )
 
-                self.streams.append(
-                    Stream(
-                        definition.name,
-                        extract,
-                        transform,
-                        definition.load_cls(
-                            db_uri=self.db_uri,
-                            data_dir=data_dir,
-                            dry_run=dry_run,
-                            collection=collection,
-                            update_new_version_publication_date=self.update_new_version_publication_date,
-                            create_inclusion_request=self.create_inclusion_request,
-                            migration_logger=self.migration_logger,
-                            record_state_logger=self.record_state_logger,
-                            **stream_config[collection].get("load", {}),
-                        ),
-                    )
+                load_config = dict(stream_config[collection].get("load", {}))
+                # CLI --load-workers takes precedence over streams.yaml workers
+                config_load_workers = load_config.pop("workers", None)
+                effective_load_workers = load_workers or config_load_workers
+                load_kwargs = dict(
+                    db_uri=self.db_uri,
+                    data_dir=data_dir,
+                    dry_run=dry_run,
+                    collection=collection,
+                    update_new_version_publication_date=self.update_new_version_publication_date,
+                    create_inclusion_request=self.create_inclusion_request,
+                    **load_config,
+                )
+                load = definition.load_cls(
+                    migration_logger=self.migration_logger,
+                    record_state_logger=self.record_state_logger,
+                    **load_kwargs,
                 )
+                if effective_load_workers and effective_load_workers > 1:
+                    load = ShardedLoad(
+                        load,
+                        load_cls=definition.load_cls,
+                        load_kwargs=load_kwargs,
+                        workers=effective_load_workers,
+                    )
+
+                self.streams.append(Stream(definition.name, extract, transform, load))
 
     def run(self):
         """Run ETL streams."""
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Sharded multi-process load."""
+
+import multiprocessing
+import os
+import queue
+import zlib
+
+from invenio_rdm_migrator.load.base import Load
+
+from cds_migrator_kit.reports.log import MigrationProgressLogger, RecordStateLogger
+
+
+def default_app_factory():
+    """Create a new application for a load worker."""
+    from invenio_app.factory import create_app
+
+    return create_app()
+
+
+def shard_of(recid, shards):
+    """Return the shard of a legacy recid."""
+    try:
+        return int(recid) % shards
+    except (TypeError, ValueError):
+        return zlib.crc32(str(recid).encode("utf-8")) % shards
+
+
+def _shard_filenames(shard):
+    """Log filenames of a load worker."""
+    return {
+        "log_progress_filename": f"rdm_migration_errors.shard{shard}.csv",
+        "records_dump_filename": f"rdm_records_dump.shard{shard}.json",
+        "records_state_filename": f"rdm_records_state.shard{shard}.json",
+    }
+
+
+def _load_shard(shard, entries_queue, load_cls, load_kwargs, app_factory):
+    """Load the entries of one shard in a worker process.
+
+    The worker has its own application, hence its own DB connection, and
+    writes its own log files, merged by the parent process once done.
+    """
+    app = app_factory()
+    with app.app_context():
+        collection = load_kwargs["collection"]
+        filenames = _shard_filenames(shard)
+        migration_logger = MigrationProgressLogger(
+            collection=collection,
+            log_progress_filename=filenames["log_progress_filename"],
+        )
+        record_state_logger = RecordStateLogger(
+            collection=collection,
+            records_dump_filename=filenames["records_dump_filename"],
+            records_state_filename=filenames["records_state_filename"],
+        )
+        migration_logger.start_log()
+        record_state_logger.start_log()
+        load = load_cls(
+            migration_logger=migration_logger,
+            record_state_logger=record_state_logger,
+            **load_kwargs,
+        )
+        try:
+            load.run(iter(entries_queue.get, None), cleanup=False)
+        finally:
+            migration_logger.finalise()
+            record_state_logger.finalise()
+
+
+class ShardedLoad(Load):
+    """Load entries with several processes, sharded by legacy recid.
+
+    The entries are partitioned by legacy recid, so that all the entries of
+    a recid are loaded by the same worker, and sent to the workers through
+    bounded queues. The cleanup of the wrapped load (e.g. legacy redirects)
+    runs once in the parent process, after all the workers are done, and not
+    at all if a worker died: the entries left in its queue are logged as not
+    loaded and the run fails.
+    """
+
+    def __init__(
+        self,
+        load,
+        load_cls,
+        load_kwargs,
+        workers,
+        app_factory=default_app_factory,
+        queue_size=100,
+    ):
+        """Constructor.
+
+        :param load: load instance of the parent process, used for cleanup.
+        :param load_cls: load class instantiated in each worker.
+        :param load_kwargs: constructor arguments of ``load_cls``, except the
+            loggers which are created per worker.
+        """
+        self.load = load
+        self.load_cls = load_cls
+        self.load_kwargs = load_kwargs
+        self.workers = workers
+        self.app_factory = app_factory
+        self.queue_size = queue_size
+        self.migration_logger = load.migration_logger
+        self.record_state_logger = load.record_state_logger
+
+    def _load(self, entry):
+        """Entries are sent to the workers by ``run`` and loaded there."""
+        pass
+
+    def _put(self, process, entries_queue, entry):
+        """Send an entry to a worker, failing if the worker died."""
+        while True:
+            try:
+                entries_queue.put(entry, timeout=5)
+                return
+            except queue.Full:
+                if not process.is_alive():
+                    raise RuntimeError(
+                        f"Load worker {process.name} exited with code {process.exitcode}."
+                    )
+
+    def _merge_logs(self, shard):
+        """Merge the log files of a worker into the ones of the run."""
+        filenames = _shard_filenames(shard)
+        logs_path = os.path.dirname(self.migration_logger.PROGRESS_LOG_FILEPATH)
+        progress_log = os.path.join(logs_path, filenames["log_progress_filename"])
+        if os.path.exists(progress_log):
+            self.migration_logger.merge_log(progress_log)
+            os.remove(progress_log)
+        for filename in ("records_state_filename", "records_dump_filename"):
+            filepath = os.path.join(logs_path, filenames[filename])
+            if not os.path.exists(filepath):
+                continue
+            if filename == "records_state_filename":
+                self.record_state_logger.merge_record_states(filepath)
+            os.remove(filepath)
+
+    def run(self, entries, cleanup=False):
+        """Load entries."""
+        ctx = multiprocessing.get_context("spawn")
+        queues = [ctx.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        processes = [
+            ctx.Process(
+                target=_load_shard,
+                name=f"load-shard-{shard}",
+                args=(
+                    shard,
+                    queues[shard],
+                    self.load_cls,
+                    self.load_kwargs,
+                    self.app_factory,
+                ),
+            )
+            for shard in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        # the cleanup of the wrapped load concerns the records of all the shards
+        track_legacy_recid = getattr(self.load, "_track_legacy_recid", None)
+        try:
+            for entry in entries:
+                if not entry:
+                    continue
+                recid = entry["record"]["recid"]
+                if track_legacy_recid:
+                    track_legacy_recid(recid)
+                shard = shard_of(recid, self.workers)
+                self._put(processes[shard], queues[shard], entry)
+        finally:
+            for shard, process in enumerate(processes):
+                if not process.is_alive():
+                    continue
+                try:
+                    self._put(process, queues[shard], None)
+                except RuntimeError:
+                    # the worker died meanwhile, its exit code is logged below
+                    pass
+            for process in processes:
+                process.join()
+            # the logs of the workers are merged even if the load failed
+            for shard, process in enumerate(processes):
+                self._merge_logs(shard)
+                if process.exitcode:
+                    self._drop_entries(process, queues[shard])
+
+        dead = [process for process in processes if process.exitcode]
+        if dead:
+            # the cleanup must not run over a partial load
+            raise RuntimeError(
+                ", ".join(
+                    f"Load worker {process.name} exited with code {process.exitcode}."
+                    for process in dead
+                )
+            )
+        if cleanup:
+            self._cleanup()
+
+    def _drop_entries(self, process, entries_queue):
+        """Log the dead worker and each entry left in its queue, not loaded."""
+        self.migration_logger.add_log(
+            f"Load worker {process.name} exited with code {process.exitcode}."
+        )
+        while True:
+            try:
+                entry = entries_queue.get(timeout=1)
+            except queue.Empty:
+                break
+            if entry:
+                self.migration_logger.add_log(
+                    f"Not loaded, load worker {process.name} exited.",
+                    record={"recid": entry["record"]["recid"]},
+                )
+        entries_queue.cancel_join_thread()
+
+    def _cleanup(self, *args, **kwargs):
+        """Run the cleanup of the wrapped load."""
+        self.load._cleanup(*args, **kwargs)
@@ -7,6 +7,8 @@
 
 """CDS-RDM MARC XML dumper module."""
 import logging
+import re
+from functools import lru_cache
 
 import arrow
 from cds_dojson.exceptions import ModelMissingException, MultipleModelsException
@@ -19,6 +21,30 @@ from cds_migrator_kit.transform.errors import LossyConversion
 cli_logger = logging.getLogger("migrator")
 
 
+# non-empty control or data field of one of the tags
+MARC_FIELDS_PATTERN = (
+    r"<(controlfield|datafield)\b[^>]*?\btag=[\"'](?:{tags})[\"'][^>]*?(?<!/)>.*?</\1>"
+)
+
+
+@lru_cache(maxsize=None)
+def _marc_fields_regex(tags):
+    """Regex of the control and data fields of the MARC tags."""
+    tags = "|".join(re.escape(tag) for tag in sorted(tags))
+    return re.compile(MARC_FIELDS_PATTERN.format(tags=tags), re.DOTALL)
+
+
+def project_marcxml(marcxml, tags):
+    """Return a MARC XML record with only the fields of ``tags``.
+
+    The fields are picked from the XML text, the other ones are not parsed.
+    """
+    if isinstance(marcxml, bytes):
+        marcxml = marcxml.decode("utf-8")
+    fields = _marc_fields_regex(frozenset(tags)).finditer(marcxml)
+    return "<record>{0}</record>".format("".join(field.group() for field in fields))
+
+
 class CDSRecordDump:
     """CDS record dump class."""
 
@@ -29,8 +55,13 @@ class CDSRecordDump:
         latest_only=True,
         dojson_model=migrator_marc21,
         raise_on_missing_rules=True,
+        marc_tags=None,
     ):
-        """Initialize."""
+        """Initialize.
+
+        :param marc_tags: MARC tags, e.g. ``("100", "700")``, to parse only the
+            fields of, for the streams which need a few of them.
+        """
         self.data = data
         self.source_type = source_type
         self.latest_only = latest_only
@@ -38,6 +69,7 @@ class CDSRecordDump:
         self.latest_revision = None
         self.files = None
         self.raise_on_missing_rules = raise_on_missing_rules
+        self.marc_tags = marc_tags
 
     @property
     def first_created(self):
@@ -72,7 +104,10 @@ class CDSRecordDump:
     def _prepare_revision(self, data):
         timestamp = arrow.get(data["modification_datetime"]).datetime
 
-        marc_record = create_record(data["marcxml"])
+        marcxml = data["marcxml"]
+        if self.marc_tags:
+            marcxml = project_marcxml(marcxml, self.marc_tags)
+        marc_record = create_record(marcxml)
 
         # exception handlers are passed in this way to avoid overriding
         # .do method implementation
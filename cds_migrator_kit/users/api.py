@@ -41,18 +41,23 @@ class MigrationUserAPI(ABC):
             return user
         except IntegrityError as e:
             db.session.rollback()
-            email_username, domain = email.split("@")
-            email_username = re.sub(r"\W+", "", email_username)
-            domain = re.sub(r"\W+", "", domain)
             user = User(
                 email=email,
-                username=f"duplicated_{username}_{email_username}at{domain}",
+                username=self._duplicated_username(email, username),
                 active=False,
             )
             db.session.add(user)
             db.session.commit()
             return user
 
+    @staticmethod
+    def _duplicated_username(email, username):
+        """Return the username of a user whose username is already taken."""
+        email_username, domain = email.split("@")
+        email_username = re.sub(r"\W+", "", email_username)
+        domain = re.sub(r"\W+", "", domain)
+        return f"duplicated_{username}_{email_username}at{domain}"
+
     @abstractmethod
     def create_invenio_user_identity(self, user_id, person_id):
         """Return new user identity entry.
@@ -74,14 +79,10 @@ class MigrationUserAPI(ABC):
             client_id=self.client_id, user_id=user_id, extra_data=extra_data
         )
 
-    def create_user(self, email, name, person_id, username, extra_data=None):
-        """Create an invenio user."""
-        user = self.create_invenio_user(email, username)
-        user_id = user.id
+    def _profile_data(self, email, name, person_id, extra_data):
+        """Return the profile data of a new user."""
         profile_data = {}
         if person_id:
-            identity = self.create_invenio_user_identity(user_id, person_id)
-            db.session.add(identity)
             profile_data = {
                 "person_id": person_id,
             }
@@ -94,6 +95,16 @@ class MigrationUserAPI(ABC):
             profile_data.update(
                 {"full_name": email.split("@")[0].replace(".", " ").title()}
             )
+        return profile_data
+
+    def create_user(self, email, name, person_id, username, extra_data=None):
+        """Create an invenio user."""
+        user = self.create_invenio_user(email, username)
+        user_id = user.id
+        if person_id:
+            identity = self.create_invenio_user_identity(user_id, person_id)
+            db.session.add(identity)
+        profile_data = self._profile_data(email, name, person_id, extra_data)
 
         profile = deepcopy(user.user_profile)
         profile.update(profile_data)
@@ -104,3 +115,92 @@ class MigrationUserAPI(ABC):
         db.session.add(remote_account)
         db.session.commit()
         return user
+
+    def _usernames(self, users):
+        """Return the usernames of the new users, renaming the ones taken."""
+        usernames = {user["email"]: user["username"] for user in users}
+        taken = {
+            username
+            for (username,) in db.session.query(User._username).filter(
+                User._username.in_(
+                    [username.lower() for username in usernames.values() if username]
+                )
+            )
+        }
+        for email, username in usernames.items():
+            if not username:
+                continue
+            if username.lower() in taken:
+                username = usernames[email] = self._duplicated_username(email, username)
+            taken.add(username.lower())
+        return usernames
+
+    def create_users(self, users):
+        """Create many invenio users at once.
+
+        The usernames already taken are renamed in memory, then the users,
+        their identities and remote accounts are inserted in a few bulk
+        statements, in a single transaction. If it fails, the users are
+        created one by one, to report the errors of each of them.
+
+        :param users: the arguments of :meth:`create_user` of each user, with
+            an optional ``profile`` to add to the profile of the user.
+        :returns: the created users by email, and the errors by email.
+        """
+        created = {}
+        errors = {}
+        usernames = self._usernames(users)
+        new_users = []
+        for user_data in users:
+            email = user_data["email"]
+            try:
+                user = User(email=email, username=usernames[email], active=False)
+                profile = deepcopy(user.user_profile)
+                profile.update(
+                    self._profile_data(
+                        email,
+                        user_data.get("name"),
+                        user_data.get("person_id"),
+                        user_data.get("extra_data"),
+                    )
+                )
+                profile.update(user_data.get("profile") or {})
+                user.user_profile = profile
+            except Exception as exc:
+                errors[email] = exc
+                continue
+            new_users.append((user, user_data))
+
+        try:
+            db.session.add_all([user for user, _ in new_users])
+            db.session.flush()
+            accounts = []
+            for user, user_data in new_users:
+                if user_data.get("person_id"):
+                    accounts.append(
+                        self.create_invenio_user_identity(
+                            user.id, user_data["person_id"]
+                        )
+                    )
+                accounts.append(
+                    RemoteAccount(
+                        client_id=self.client_id,
+                        user_id=user.id,
+                        extra_data=user_data.get("extra_data") or {},
+                    )
+                )
+            db.session.add_all(accounts)
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            if len(new_users) == 1:
+                errors[new_users[0][1]["email"]] = exc
+                return created, errors
+            for _, user_data in new_users:
+                user_created, user_errors = self.create_users([user_data])
+                created.update(user_created)
+                errors.update(user_errors)
+            return created, errors
+
+        created.update((user_data["email"], user) for user, user_data in new_users)
+        return created, errors
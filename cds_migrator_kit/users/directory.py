@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""cds-migrator-kit user directory."""
+
+import unicodedata
+from collections import defaultdict
+
+from invenio_accounts.models import User, UserIdentity
+from invenio_db import db
+
+
+def normalize_person_name(name):
+    """Normalize a person name to match it: no accents, case or extra spaces."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(name.casefold().split())
+
+
+class UserDirectory:
+    """Ids of the user accounts by email, person id and name.
+
+    All the accounts are loaded in bulk on the first lookup, so that
+    resolving the owner, the reviewers or the grants of a record does not
+    query the DB. A lookup missing from the directory is read through to the
+    DB, for the accounts created since. The migrator invalidates the
+    accounts it creates or updates.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._reset()
+
+    def _reset(self):
+        self._loaded = False
+        self._by_email = {}
+        self._by_person_id = {}
+        self._by_name = defaultdict(set)
+        self._by_family_name = defaultdict(set)
+        # entries of each account, to invalidate them
+        self._entries = {}
+        self._person_ids = defaultdict(set)
+
+    def _add(self, user_id, email, profile):
+        profile = profile or {}
+        family_name = normalize_person_name(profile.get("family_name"))
+        given_name = normalize_person_name(profile.get("given_name"))
+        if email:
+            self._by_email[email] = user_id
+        if family_name:
+            self._by_name[(family_name, given_name)].add(user_id)
+            self._by_family_name[family_name].add(user_id)
+        self._entries[user_id] = (email, family_name, given_name)
+
+    def _add_user(self, user):
+        self._forget(user.id)
+        self._add(user.id, user.email, user.user_profile)
+        return user.id
+
+    def _add_identity(self, person_id, user_id):
+        self._by_person_id[person_id] = user_id
+        self._person_ids[user_id].add(person_id)
+        return user_id
+
+    def _forget(self, user_id):
+        email, family_name, given_name = self._entries.pop(user_id, (None,) * 3)
+        if email and self._by_email.get(email) == user_id:
+            del self._by_email[email]
+        if family_name:
+            self._by_name[(family_name, given_name)].discard(user_id)
+            self._by_family_name[family_name].discard(user_id)
+
+    def load(self):
+        """Load all the accounts, if not loaded yet."""
+        if self._loaded:
+            return
+        users = db.session.query(User.id, User.email, User._user_profile)
+        for user_id, email, profile in users:
+            self._add(user_id, email, profile)
+        identities = db.session.query(UserIdentity.id, UserIdentity.id_user)
+        for person_id, user_id in identities:
+            self._add_identity(person_id, user_id)
+        self._loaded = True
+
+    def invalidate(self, *users):
+        """Invalidate the accounts after creating or updating them, or all."""
+        if not users:
+            self._reset()
+            return
+        if not self._loaded:
+            return
+        user_ids = [user.id for user in users]
+        for user in users:
+            self._add_user(user)
+            for person_id in self._person_ids.pop(user.id, ()):
+                self._by_person_id.pop(person_id, None)
+        identities = db.session.query(UserIdentity.id, UserIdentity.id_user).filter(
+            UserIdentity.id_user.in_(user_ids)
+        )
+        for person_id, user_id in identities:
+            self._add_identity(person_id, user_id)
+
+    def get_id_by_email(self, email):
+        """Return the id of the account of an email, or None."""
+        if not email:
+            return None
+        self.load()
+        user_id = self._by_email.get(email)
+        if user_id is None:
+            user = User.query.filter_by(email=email).one_or_none()
+            if user:
+                user_id = self._add_user(user)
+        return user_id
+
+    def get_ids_by_email(self, emails):
+        """Return the ids of the accounts of emails, by email.
+
+        The emails missing from the directory are read through at once.
+        """
+        self.load()
+        emails = {email for email in emails if email}
+        missing = [email for email in emails if email not in self._by_email]
+        if missing:
+            for user in User.query.filter(User.email.in_(missing)):
+                self._add_user(user)
+        return {
+            email: self._by_email[email] for email in emails if email in self._by_email
+        }
+
+    def get_id_by_person_id(self, person_id):
+        """Return the id of the account of a CERN person id, or None."""
+        if not person_id:
+            return None
+        self.load()
+        user_id = self._by_person_id.get(person_id)
+        if user_id is None:
+            identity = UserIdentity.query.filter_by(id=person_id).one_or_none()
+            if identity:
+                user_id = self._add_identity(person_id, identity.id_user)
+        return user_id
+
+    def get_ids_by_name(self, family_name, given_name=None):
+        """Return the ids of the accounts of a name, by the profile names.
+
+        Any given name matches when ``given_name`` is not set. The accounts
+        missing from the directory are read through by the family name as
+        given or normalized, the accents being compared once loaded.
+        """
+        self.load()
+        lowered_family_name = " ".join((family_name or "").lower().split())
+        family_name = normalize_person_name(family_name)
+        given_name = normalize_person_name(given_name)
+        if given_name:
+            user_ids = self._by_name.get((family_name, given_name))
+        else:
+            user_ids = self._by_family_name.get(family_name)
+        if user_ids:
+            return sorted(user_ids)
+
+        query = User.query.filter(
+            db.func.lower(User._user_profile["family_name"].as_string()).in_(
+                {lowered_family_name, family_name}
+            )
+        )
+        user_ids = []
+        for user in query:
+            user_id = self._add_user(user)
+            _, user_family_name, user_given_name = self._entries[user_id]
+            if user_family_name != family_name:
+                continue
+            if given_name and user_given_name != given_name:
+                continue
+            user_ids.append(user_id)
+        return sorted(user_ids)
+
+
+# directory of the user accounts of the migration run
+user_directory = UserDirectory()
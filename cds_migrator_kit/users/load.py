@@ -16,7 +16,8 @@ from flask import current_app
 from invenio_accounts.models import User
 from invenio_db import db
 from invenio_rdm_migrator.load.base import Load
-from sqlalchemy.exc import NoResultFound
+
+from cds_migrator_kit.users.directory import normalize_person_name, user_directory
 
 cli_logger = logging.getLogger("migrator")
 
@@ -32,8 +33,12 @@ class CDSSubmitterLoad(Load):
         logger=logging.getLogger("users"),
         user_api_cls=None,
         missing_ldap_users_filename="missing_users.json",
+        batch_size=100,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param batch_size: number of missing users created at once.
+        """
         self.dry_run = dry_run
         self.missing_users_dir = missing_users_dir
         self.missing_users_filename = missing_users_filename
@@ -41,6 +46,58 @@ class CDSSubmitterLoad(Load):
         self.dry_run = dry_run
         self.logger = logger
         self.user_api_cls = user_api_cls
+        # indexes of the missing users files, see _index_missing_users
+        self._people_by_email = None
+        self._people_by_name = None
+        self._people_by_family_name = None
+        self._legacy_people_by_email = None
+        self.batch_size = batch_size
+        # users to create, by email and by person id
+        self._pending = {}
+        self._pending_person_ids = {}
+
+    def _index_missing_users(self):
+        """Index the people collection and the legacy DB users by email and name.
+
+        The files are read once, when the load starts, instead of once per user.
+        """
+        if self._people_by_email is not None:
+            return
+        self._people_by_email = {}
+        self._people_by_name = {}
+        self._people_by_family_name = {}
+        self._legacy_people_by_email = {}
+        if not self.missing_users_dir:
+            return
+
+        missing_users_dump = os.path.join(
+            self.missing_users_dir, self.missing_users_filename
+        )
+        with open(missing_users_dump) as csv_file:
+            for row in csv.reader(csv_file):
+                if not row:
+                    continue
+                self._people_by_email.setdefault(row[0].lower(), row)
+                if len(row) < 4:
+                    continue
+                family_name = normalize_person_name(row[2])
+                given_name = normalize_person_name(row[3])
+                self._people_by_name.setdefault((family_name, given_name), row)
+                self._people_by_family_name.setdefault(family_name, row)
+
+        missing_ldap_users_dump = os.path.join(
+            self.missing_users_dir, self.missing_ldap_users_filename
+        )
+        with open(missing_ldap_users_dump) as json_file:
+            for person in json.load(json_file):
+                self._legacy_people_by_email.setdefault(person["email"], person)
+
+    def run(self, entries, cleanup=False):
+        """Load entries."""
+        if not self.dry_run:
+            self._index_missing_users()
+        super().run(entries, cleanup=cleanup)
+        self._create_pending_users()
 
     def _load(self, entry):
         """Load users."""
@@ -78,13 +135,10 @@ class CDSSubmitterLoad(Load):
         """Fetch or create a user account by email."""
         if not email:
             return
-        try:
-            user = User.query.filter_by(email=email).one()
-            return user.id
-        except NoResultFound:
-            if not self.dry_run:
-                user_id = self._create_owner(email)
-                return user_id
+        user_id = user_directory.get_id_by_email(email)
+        if user_id is None and not self.dry_run:
+            user_id = self._create_owner(email)
+        return user_id
 
     def _parse_reviewer_name(self, name):
         """Split a "Family name, Given name" or "Given name Family name"
@@ -98,17 +152,8 @@ class CDSSubmitterLoad(Load):
         return family_name, given_name
 
     def _find_reviewer_by_name(self, family_name, given_name):
-        """Match a reviewer name to an existing account via their profile."""
-        query = User.query.filter(
-            db.func.lower(User._user_profile["family_name"].as_string())
-            == family_name.lower()
-        )
-        if given_name:
-            query = query.filter(
-                db.func.lower(User._user_profile["given_name"].as_string())
-                == given_name.lower()
-            )
-        return query.one_or_none()
+        """Match a reviewer name to the existing accounts via their profile."""
+        return user_directory.get_ids_by_name(family_name, given_name)
 
     def _find_person_email_by_name(self, family_name, given_name):
         """Look up a reviewer's email in the people collection dump by name.
@@ -116,18 +161,14 @@ class CDSSubmitterLoad(Load):
         Same source as _create_owner's `get_person`, but keyed by name
         since a name-only reviewer (906__p) has no email to search by.
         """
-        missing_users_dump = os.path.join(
-            self.missing_users_dir, self.missing_users_filename
-        )
-        with open(missing_users_dump) as csv_file:
-            for row in csv.reader(csv_file):
-                surname, given_names = row[2].strip().lower(), row[3].strip().lower()
-                if surname != family_name.lower():
-                    continue
-                if given_name and given_names != given_name.lower():
-                    continue
-                return row[0]
-        return None
+        self._index_missing_users()
+        family_name = normalize_person_name(family_name)
+        given_name = normalize_person_name(given_name)
+        if given_name:
+            row = self._people_by_name.get((family_name, given_name))
+        else:
+            row = self._people_by_family_name.get(family_name)
+        return row[0] if row else None
 
     def _fabricate_email(self, family_name, given_name):
         """Make up a plausible CERN email when none can be found anywhere,
@@ -148,9 +189,14 @@ class CDSSubmitterLoad(Load):
         """
         family_name, given_name = self._parse_reviewer_name(name)
 
-        user = self._find_reviewer_by_name(family_name, given_name)
-        if user is not None:
-            return user.id
+        user_ids = self._find_reviewer_by_name(family_name, given_name)
+        if len(user_ids) == 1:
+            return user_ids[0]
+        if user_ids:
+            self.logger.warning(
+                f"Reviewer '{name}' matches several accounts: {user_ids}"
+            )
+            return None
 
         if self.dry_run:
             return None
@@ -164,10 +210,14 @@ class CDSSubmitterLoad(Load):
                 f"{email}"
             )
 
-        user_id = self._find_or_create_by_email(email)
+        user_id = user_directory.get_id_by_email(email)
         if user_id:
             self._ensure_reviewer_profile_name(user_id, family_name, given_name)
-        return user_id
+            return user_id
+        profile = {"family_name": family_name}
+        if given_name:
+            profile["given_name"] = given_name
+        return self._create_owner(email, profile=profile)
 
     def _ensure_reviewer_profile_name(self, user_id, family_name, given_name):
         """Make sure family_name/given_name are set on the profile.
@@ -194,37 +244,28 @@ class CDSSubmitterLoad(Load):
             user.user_profile = profile
             db.session.add(user)
             db.session.commit()
+            user_directory.invalidate(user)
 
-    def _create_owner(self, email_addr):
+    def _create_owner(self, email_addr, profile=None):
         """Create owner from legacy data.
 
         Every record needs an owner assigned in parent.access.owned_by
-        therefore we need to create dummy accounts
+        therefore we need to create dummy accounts. The accounts are created
+        by batches: the id is only returned when the batch is created.
+
+        :param profile: profile data of the user, e.g. its names.
         """
         logger_users = self.logger
+        if email_addr in self._pending:
+            pending_profile = self._pending[email_addr]["profile"]
+            for key, value in (profile or {}).items():
+                pending_profile.setdefault(key, value)
+            return None
 
-        def get_person(email):
-            missing_users_dump = os.path.join(
-                self.missing_users_dir, self.missing_users_filename
-            )
-            with open(missing_users_dump) as csv_file:
-                for row in csv.reader(csv_file):
-                    if email == row[0].lower():
-                        return row
-
-        def get_person_old_db(email):
-            missing_users_dump = os.path.join(
-                self.missing_users_dir, self.missing_ldap_users_filename
-            )
-            with open(missing_users_dump) as json_file:
-                missing = json.load(json_file)
-            person = next((item for item in missing if item["email"] == email), None)
-
-            return person
-
+        self._index_missing_users()
         user_api = self.user_api_cls()
-        person = get_person(email_addr)
-        person_old_db = get_person_old_db(email_addr)
+        person = self._people_by_email.get(email_addr)
+        person_old_db = self._legacy_people_by_email.get(email_addr)
 
         person_id = None
         displayname = None
@@ -288,23 +329,55 @@ class CDSSubmitterLoad(Load):
                 )
                 return existing_identity.id_user
 
-        try:
+        if person_id in self._pending_person_ids:
             logger_users.info(
-                f"Creating user {email_addr}, {displayname}, {username}, {person_id}, {json.dumps(extra_data)}"
-            )
-            user = user_api.create_user(
-                email_addr,
-                name=displayname,
-                username=username,
-                person_id=person_id,
-                extra_data=extra_data,
+                f"User {email_addr} already being created with person ID {person_id}"
             )
-        except Exception as exc:
-            logger_users.error(
-                f"User failed to be migrated: {email_addr}, {displayname}, {username}, {person_id}, {json.dumps(extra_data)} \n {exc}"
-            )
-            return -1
-        return user.id
+            return None
+
+        logger_users.info(
+            f"Creating user {email_addr}, {displayname}, {username}, {person_id}, {json.dumps(extra_data)}"
+        )
+        self._pending[email_addr] = {
+            "email": email_addr,
+            "name": displayname,
+            "username": username,
+            "person_id": person_id,
+            "extra_data": extra_data,
+            "profile": dict(profile or {}),
+        }
+        if person_id:
+            self._pending_person_ids[person_id] = email_addr
+        if len(self._pending) >= self.batch_size:
+            return self._create_pending_users().get(email_addr)
+        return None
+
+    def _create_pending_users(self):
+        """Create the pending users at once.
+
+        :returns: the ids of the created users by email.
+        """
+        if not self._pending:
+            return {}
+        users = list(self._pending.values())
+        self._pending = {}
+        self._pending_person_ids = {}
+
+        created, errors = self.user_api_cls().create_users(users)
+        for user in users:
+            exc = errors.get(user["email"])
+            if exc is not None:
+                self.logger.error(
+                    f"User failed to be migrated: {user['email']}, {user['name']}, {user['username']}, {user['person_id']}, {json.dumps(user['extra_data'])} \n {exc}"
+                )
+        if created:
+            user_directory.invalidate(*created.values())
+            self._after_create_users(created)
+        return {email: user.id for email, user in created.items()}
+
+    def _after_create_users(self, users):
+        """Hook called with the users created by email."""
+        pass
 
     def _cleanup(self):  # pragma: no cover
         """Cleanup data after loading."""
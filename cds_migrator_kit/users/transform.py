@@ -16,14 +16,18 @@ from cds_migrator_kit.transform.dumper import CDSRecordDump
 
 cli_logger = logging.getLogger("migrator")
 
+# submitter and reviewers
+SUBMITTER_MARC_TAGS = ("859", "906")
+
 
 class SubmitterTransform(RDMRecordTransform):
     """CDSToRDMAffiliationTransform."""
 
-    def __init__(self, dry_run=False, dojson_model=None):
+    def __init__(self, dry_run=False, dojson_model=None, marc_tags=None):
         """Constructor."""
         self.dry_run = dry_run
         self.dojson_model = dojson_model
+        self.marc_tags = marc_tags
         super().__init__()
 
     def _transform(self, entry):
@@ -31,7 +35,10 @@ class SubmitterTransform(RDMRecordTransform):
         # creates the output structure for load step
         try:
             record_dump = CDSRecordDump(
-                entry, dojson_model=self.dojson_model, raise_on_missing_rules=False
+                entry,
+                dojson_model=self.dojson_model,
+                raise_on_missing_rules=False,
+                marc_tags=self.marc_tags,
             )
             record_dump.prepare_revisions()
 
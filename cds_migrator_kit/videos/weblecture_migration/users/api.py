@@ -57,6 +57,12 @@ class CDSVideosMigrationUserAPI(MigrationUserAPI):
             )
             raise
 
+    def _profile_data(self, email, name, person_id, extra_data):
+        """Return the profile data of a new user."""
+        if name and person_id:
+            return {"person_id": person_id}
+        return {}
+
     def create_user(self, email, name, person_id, username, extra_data=None):
         """Create an invenio user."""
         user = self.create_invenio_user(email, username)
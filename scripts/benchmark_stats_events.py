@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Micro-benchmark of the stats events generation on synthetic pages.
+
+Usage: python scripts/benchmark_stats_events.py --pages 20 --page-size 5000
+"""
+
+import argparse
+import logging
+import random
+import time
+from datetime import datetime
+
+from cds_migrator_kit.rdm.stats.event_generator import (
+    format_timestamps,
+    prepare_new_doc,
+)
+from cds_migrator_kit.rdm.stats.load import CDSRecordStatsLoad
+
+
+def synthetic_record(versions, files_per_version):
+    """Record context with several versions and files."""
+    return {
+        "legacy_recid": "2884810",
+        "parent_recid": "zts3q-6ef46",
+        "latest_version": f"v{versions:04d}-recid",
+        "versions": [
+            {
+                "new_recid": f"v{version:04d}-recid",
+                "version": version,
+                "files": [
+                    {
+                        "legacy_file_id": version * 1000 + i,
+                        "bucket_id": f"bucket-{version}",
+                        "file_key": f"file-{i}.pdf",
+                        "file_id": f"file-{version}-{i}",
+                        "size": "1690854",
+                    }
+                    for i in range(files_per_version)
+                ],
+            }
+            for version in range(1, versions + 1)
+        ],
+    }
+
+
+def synthetic_page(event_type, page_size, versions, files_per_version, rng):
+    """Page of legacy events, as returned by a search or a scroll."""
+    hits = []
+    for i in range(page_size):
+        version = rng.randint(1, versions)
+        source = {
+            "id_bibrec": 2884810,
+            "event_type": event_type,
+            "country": "CH",
+            "bot": rng.random() < 0.1,
+            "unique_session_id": "d871bbbe43affd349103397a14badf1a",
+            "visitor_id": "d871bbbe43affd349103397a14badf1a",
+            "timestamp": rng.randint(1_200_000_000_000, 1_730_000_000_000),
+        }
+        if event_type == "events.downloads":
+            source["file_version"] = version
+            source["id_bibdoc"] = version * 1000 + rng.randrange(files_per_version)
+            source["file_format"] = "PDF"
+        hits.append(
+            {"_index": "cds-2023", "_id": f"hit-{i}", "_score": 1.0, "_source": source}
+        )
+    return {"hits": {"hits": hits}}
+
+
+def per_event_timestamps(timestamps):
+    """Format the timestamps and get their years one event at a time."""
+    formatted = []
+    years = []
+    for timestamp in timestamps:
+        value = datetime.utcfromtimestamp(timestamp / 1000).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
+        formatted.append(value)
+        years.append(datetime.fromisoformat(value).year)
+    return formatted, years
+
+
+def benchmark_timestamps(pages):
+    """Compare the per-event and the page-level timestamps conversions."""
+    pages = [
+        [hit["_source"]["timestamp"] for hit in page["hits"]["hits"]] for page in pages
+    ]
+    total = sum(len(page) for page in pages)
+    for name, convert in (
+        ("per-event", per_event_timestamps),
+        ("page-level", format_timestamps),
+    ):
+        start = time.perf_counter()
+        results = [convert(page) for page in pages]
+        elapsed = time.perf_counter() - start
+        print(
+            f"timestamps {name}: {total} events in {elapsed:.2f}s "
+            f"({total / elapsed:,.0f} events/s)"
+        )
+    assert results == [per_event_timestamps(page) for page in pages]
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--versions", type=int, default=20)
+    parser.add_argument("--files-per-version", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    logger = logging.getLogger("stats-benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    rec_context = synthetic_record(args.versions, args.files_per_version)
+
+    for event_type in ("events.pageviews", "events.downloads"):
+        pages = [
+            synthetic_page(
+                event_type, args.page_size, args.versions, args.files_per_version, rng
+            )
+            for _ in range(args.pages)
+        ]
+        if event_type == "events.pageviews":
+            benchmark_timestamps(pages)
+        start = time.perf_counter()
+        count = 0
+        for page in pages:
+            for _ in prepare_new_doc(
+                page,
+                rec_context,
+                logger,
+                event_type,
+                CDSRecordStatsLoad.LEGACY_TO_RDM_EVENTS_MAP,
+                "events-stats",
+            ):
+                count += 1
+        elapsed = time.perf_counter() - start
+        total = args.pages * args.page_size
+        print(
+            f"{event_type}: {total} events, {count} docs in {elapsed:.2f}s "
+            f"({total / elapsed:,.0f} events/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -52,6 +52,8 @@ from invenio_vocabularies.contrib.funders.api import Funder
 from invenio_vocabularies.proxies import current_service as vocabulary_service
 from invenio_vocabularies.records.api import Vocabulary
 
+from cds_migrator_kit.users.directory import user_directory
+
 
 class MockJinjaManifest(JinjaManifest):
     """Mock manifest."""
@@ -177,6 +179,14 @@ def app_config(app_config):
     return app_config
 
 
+@pytest.fixture(autouse=True)
+def clear_user_directory():
+    """Forget the user accounts of the previous tests."""
+    user_directory.invalidate()
+    yield
+    user_directory.invalidate()
+
+
 @pytest.fixture(scope="function")
 def db_session_options():
     """Database session options."""
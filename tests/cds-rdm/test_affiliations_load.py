@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the batched load of the affiliations mapping."""
+
+from unittest.mock import patch
+
+from cds_rdm.legacy.models import CDSMigrationAffiliationMapping
+
+from cds_migrator_kit.rdm.affiliations.load import CDSAffiliationsLoad
+
+MATCH_INFO = {
+    "chosen": True,
+    "score": 1.0,
+    "organization": {"id": "https://ror.org/01ggx4157", "name": "CERN"},
+}
+
+
+def _entry(creators, contributors=()):
+    return {
+        "creators_affiliations": [dict(affiliation) for affiliation in creators],
+        "contributors_affiliations": [
+            dict(affiliation) for affiliation in contributors
+        ],
+    }
+
+
+def test_affiliations_load_batches(app, db):
+    cern = {
+        "original_input": "CERN",
+        "ror_exact_match": "https://ror.org/01ggx4157",
+        "ror_match_info": MATCH_INFO,
+    }
+    fuzzy = {
+        "original_input": "CERN Geneva",
+        "ror_not_exact_match": "https://ror.org/01ggx4157",
+        "ror_match_info": {**MATCH_INFO, "chosen": False, "score": 0.92},
+    }
+    unknown = {"original_input": "Unknown lab"}
+    db.session.add(CDSMigrationAffiliationMapping(legacy_affiliation_input="Existing"))
+    db.session.commit()
+
+    load = CDSAffiliationsLoad(batch_size=2)
+    with patch.object(load, "_flush", wraps=load._flush) as flush:
+        load.run(
+            [
+                _entry([cern, fuzzy], [cern]),
+                _entry([cern, unknown]),
+                _entry(
+                    [{"original_input": "Existing"}],
+                    [unknown, {"original_input": "Other"}],
+                ),
+            ]
+        )
+
+    # 2 full batches and the remaining one, duplicates dropped in memory
+    assert flush.call_count == 3
+    mappings = {
+        mapping.legacy_affiliation_input: mapping
+        for mapping in CDSMigrationAffiliationMapping.query.all()
+    }
+    assert sorted(mappings) == [
+        "CERN",
+        "CERN Geneva",
+        "Existing",
+        "Other",
+        "Unknown lab",
+    ]
+    assert mappings["CERN"].ror_exact_match == "https://ror.org/01ggx4157"
+    assert mappings["CERN"].ror_match_info == MATCH_INFO
+    assert mappings["CERN Geneva"].ror_exact_match is None
+    assert mappings["CERN Geneva"].ror_not_exact_match == "https://ror.org/01ggx4157"
+    assert mappings["Unknown lab"].ror_match_info is None
+
+    # a new run skips the affiliations already loaded
+    load = CDSAffiliationsLoad(batch_size=2)
+    load.run([_entry([cern, {"original_input": "New"}])])
+    assert CDSMigrationAffiliationMapping.query.count() == 6
+
+
+def test_affiliations_load_failing_batch(app, db):
+    broken = {
+        "original_input": "Broken",
+        "ror_exact_match": "https://ror.org/01ggx4157",
+        # not serializable, fails the insert of its batch
+        "ror_match_info": {"score": object()},
+    }
+
+    load = CDSAffiliationsLoad(batch_size=3)
+    with patch("cds_migrator_kit.rdm.affiliations.load.logger") as logger:
+        load.run(
+            [_entry([{"original_input": "CERN"}, broken, {"original_input": "EPFL"}])]
+        )
+
+    # the other affiliations of the batch are inserted one by one
+    assert sorted(
+        mapping.legacy_affiliation_input
+        for mapping in CDSMigrationAffiliationMapping.query.all()
+    ) == ["CERN", "EPFL"]
+    logger.error.assert_called_once()
+    assert "'Broken'" in logger.error.call_args.args[0]
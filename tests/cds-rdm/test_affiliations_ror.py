@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the ROR affiliation lookups of the affiliations migration."""
+
+import asyncio
+import json
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from cds_migrator_kit.rdm.affiliations.ror import (
+    AsyncRORResolver,
+    RORAffiliationCache,
+    TokenBucket,
+    affiliations_search,
+    normalize_affiliation,
+    ror_session,
+)
+from cds_migrator_kit.rdm.affiliations.ror_dump import (
+    RORDumpMatcher,
+    normalize_name,
+)
+from cds_migrator_kit.rdm.affiliations.transform import CDSToRDMAffiliationTransform
+
+CERN = {
+    "chosen": True,
+    "score": 1.0,
+    "matching_type": "EXACT",
+    "organization": {"id": "https://ror.org/01ggx4157", "name": "CERN"},
+}
+CANDIDATES = [
+    {
+        "chosen": False,
+        "score": 0.95,
+        "matching_type": "FUZZY",
+        "organization": {"id": "https://ror.org/00f54p054", "name": "Stanford"},
+    },
+    {
+        "chosen": False,
+        "score": 0.5,
+        "matching_type": "PARTIAL",
+        "organization": {"id": "https://ror.org/02jbv0t02", "name": "LBNL"},
+    },
+]
+
+
+class RequestLog(list):
+    """Affiliations requested to the ROR stand-in, in order."""
+
+    def __init__(self):
+        """Constructor."""
+        super().__init__()
+        self.in_flight = {"now": 0, "max": 0}
+
+
+@pytest.fixture()
+def ror_server():
+    """Local ROR API stand-in recording the looked up affiliations."""
+    requested = RequestLog()
+    lock = threading.Lock()
+    in_flight = requested.in_flight
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            affiliation = parse_qs(urlparse(self.path).query)["affiliation"][0]
+            with lock:
+                retried = affiliation in requested
+                requested.append(affiliation)
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            try:
+                self._respond(affiliation, retried)
+            finally:
+                with lock:
+                    in_flight["now"] -= 1
+
+        def _respond(self, affiliation, retried):
+            if affiliation.startswith("slow"):
+                time.sleep(0.1)
+            if affiliation == "fail" or (affiliation == "flaky" and not retried):
+                self.send_response(400 if affiliation == "fail" else 503)
+                self.end_headers()
+                return
+            items = [CERN] if normalize_affiliation(affiliation) == "cern" else []
+            if affiliation == "Stanford Univ":
+                items = CANDIDATES
+            body = json.dumps({"number_of_results": len(items), "items": items})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/organizations", requested
+    server.shutdown()
+
+
+def test_normalize_affiliation():
+    assert normalize_affiliation("  CERN\tGeneva ") == "cern geneva"
+
+
+def test_affiliations_search(ror_server):
+    url, requested = ror_server
+    session = ror_session()
+
+    assert affiliations_search("CERN", session=session, url=url) == (True, CERN)
+    assert affiliations_search("Stanford Univ", session=session, url=url) == (
+        False,
+        CANDIDATES,
+    )
+    assert affiliations_search("Unknown", session=session, url=url) == (False, [])
+    assert affiliations_search("fail", session=session, url=url) is None
+    assert requested == ["CERN", "Stanford Univ", "Unknown", "fail"]
+
+
+def test_affiliations_search_cache(ror_server, tmp_path):
+    url, requested = ror_server
+    filepath = tmp_path / "ror_cache.sqlite"
+    cache = RORAffiliationCache(filepath)
+
+    assert affiliations_search("CERN", cache=cache, url=url) == (True, CERN)
+    assert affiliations_search(" cern ", cache=cache, url=url) == (True, CERN)
+    assert affiliations_search("Stanford Univ", cache=cache, url=url) == (
+        False,
+        CANDIDATES,
+    )
+    # failed lookups are not cached
+    assert affiliations_search("fail", cache=cache, url=url) is None
+    assert requested == ["CERN", "Stanford Univ", "fail"]
+    cache.close()
+
+    # a new run does not query the ROR API again
+    requested.clear()
+    cache = RORAffiliationCache(filepath)
+    assert len(cache) == 2
+    assert affiliations_search("CERN", cache=cache, url=url) == (True, CERN)
+    assert affiliations_search("Stanford Univ", cache=cache, url=url) == (
+        False,
+        CANDIDATES,
+    )
+    assert requested == []
+
+
+def test_transform_looks_up_each_affiliation_once(ror_server, tmp_path):
+    url, requested = ror_server
+    transform = CDSToRDMAffiliationTransform(
+        ror_cache_filepath=tmp_path / "ror_cache.sqlite", ror_url=url, ror_concurrency=0
+    )
+    json_entry = {
+        "creators": [
+            {"affiliations": ["CERN", "Stanford Univ"]},
+            None,
+            {"affiliations": ["CERN ", ""]},
+        ],
+        "contributors": [{"affiliations": ["cern", "Unknown"]}],
+    }
+
+    creators = transform._affiliations(json_entry, "creators")
+    contributors = transform._affiliations(json_entry, "contributors")
+
+    assert creators == [
+        {
+            "original_input": "CERN",
+            "ror_exact_match": "https://ror.org/01ggx4157",
+            "ror_match_info": CERN,
+        },
+        {
+            "original_input": "Stanford Univ",
+            "ror_not_exact_match": "https://ror.org/00f54p054",
+            "ror_match_info": CANDIDATES[0],
+        },
+        {
+            "original_input": "CERN ",
+            "ror_exact_match": "https://ror.org/01ggx4157",
+            "ror_match_info": CERN,
+        },
+    ]
+    assert contributors == [
+        {
+            "original_input": "cern",
+            "ror_exact_match": "https://ror.org/01ggx4157",
+            "ror_match_info": CERN,
+        },
+        {"original_input": "Unknown"},
+    ]
+    assert requested == ["CERN", "Stanford Univ", "Unknown"]
+
+
+ROR_DUMP_V2 = [
+    {
+        "id": "https://ror.org/01ggx4157",
+        "status": "active",
+        "names": [
+            {
+                "value": "European Organization for Nuclear Research",
+                "types": ["ror_display", "label"],
+            },
+            {"value": "CERN", "types": ["acronym"]},
+            {
+                "value": "Organisation européenne pour la recherche nucléaire",
+                "types": ["label"],
+            },
+        ],
+    },
+    {
+        "id": "https://ror.org/01swzsf04",
+        "status": "active",
+        "names": [
+            {"value": "University of Geneva", "types": ["ror_display"]},
+            {"value": "Université de Genève", "types": ["label"]},
+            {"value": "UNIGE", "types": ["acronym"]},
+        ],
+    },
+    {
+        "id": "https://ror.org/02s376052",
+        "status": "active",
+        "names": [
+            {
+                "value": "École Polytechnique Fédérale de Lausanne",
+                "types": ["ror_display"],
+            },
+            {"value": "EPFL", "types": ["acronym"]},
+        ],
+    },
+    {
+        "id": "https://ror.org/00000000x",
+        "status": "withdrawn",
+        "names": [{"value": "University of Genova", "types": ["ror_display"]}],
+    },
+]
+
+ROR_DUMP_V1 = [
+    {
+        "id": "https://ror.org/01ggx4157",
+        "name": "European Organization for Nuclear Research",
+        "status": "active",
+        "aliases": [],
+        "acronyms": ["CERN"],
+        "labels": [{"label": "Organisation européenne pour la recherche nucléaire"}],
+    },
+]
+
+
+def test_normalize_name():
+    assert (
+        normalize_name("Université de Genève, (Geneva)")
+        == "universite de geneve geneva"
+    )
+
+
+def test_ror_dump_matcher():
+    matcher = RORDumpMatcher(ROR_DUMP_V2)
+
+    chosen, match = matcher.search("Universite de Geneve")
+    assert chosen is True
+    assert match["score"] == 1.0
+    assert match["matching_type"] == "EXACT"
+    assert match["organization"] == {
+        "id": "https://ror.org/01swzsf04",
+        "name": "University of Geneva",
+    }
+
+    # acronyms are not chosen, as with the ROR API
+    chosen, candidates = matcher.search("CERN")
+    assert chosen is False
+    assert candidates[0]["matching_type"] == "ACRONYM"
+    assert candidates[0]["organization"]["id"] == "https://ror.org/01ggx4157"
+
+    # abbreviations are expanded
+    assert matcher.search("Univ. of Geneva")[0] is True
+
+    chosen, candidates = matcher.search("Universty of Geneva")
+    assert chosen is False
+    assert candidates[0]["organization"]["id"] == "https://ror.org/01swzsf04"
+    assert candidates[0]["matching_type"] == "FUZZY"
+    assert 0.9 <= candidates[0]["score"] < 1
+    # withdrawn organizations are not matched
+    assert [c["organization"]["id"] for c in candidates] == [
+        "https://ror.org/01swzsf04"
+    ]
+
+    assert matcher.search("Fermilab") == (False, [])
+
+
+def test_ror_dump_matcher_from_dump(tmp_path):
+    filepath = tmp_path / "v1.0-ror-data.zip"
+    with zipfile.ZipFile(filepath, "w") as dump_zip:
+        dump_zip.writestr("v1.0-ror-data.json", json.dumps(ROR_DUMP_V1))
+        dump_zip.writestr("v1.0-ror-data_schema_v2.json", json.dumps(ROR_DUMP_V2))
+    matcher = RORDumpMatcher.from_dump(filepath)
+    assert matcher.search("Université de Genève")[0] is True
+
+    filepath = tmp_path / "v1.0-ror-data.json"
+    filepath.write_text(json.dumps(ROR_DUMP_V1))
+    matcher = RORDumpMatcher.from_dump(filepath)
+    chosen, match = matcher.search(
+        "organisation europeenne pour la recherche nucleaire"
+    )
+    assert chosen is True
+    assert match["organization"] == {
+        "id": "https://ror.org/01ggx4157",
+        "name": "European Organization for Nuclear Research",
+    }
+
+
+def test_transform_matches_offline(tmp_path):
+    filepath = tmp_path / "ror-data.json"
+    filepath.write_text(json.dumps(ROR_DUMP_V2))
+    transform = CDSToRDMAffiliationTransform(ror_dump_filepath=filepath)
+
+    affiliations = transform._affiliations(
+        {
+            "creators": [
+                {"affiliations": ["University of Geneva", "Universty of Geneva"]}
+            ]
+        },
+        "creators",
+    )
+
+    assert affiliations[0]["ror_exact_match"] == "https://ror.org/01swzsf04"
+    assert affiliations[1]["ror_not_exact_match"] == "https://ror.org/01swzsf04"
+
+
+def test_token_bucket():
+    async def acquire(bucket, count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    start = time.monotonic()
+    asyncio.run(acquire(TokenBucket(rate=20, capacity=1), 5))
+    # the first token is available, the 4 next ones are 50ms apart
+    assert time.monotonic() - start >= 0.19
+
+    start = time.monotonic()
+    asyncio.run(acquire(TokenBucket(rate=20, capacity=5), 5))
+    assert time.monotonic() - start < 0.1
+
+
+def test_async_resolver(ror_server, tmp_path):
+    url, requested = ror_server
+    cache = RORAffiliationCache(tmp_path / "ror_cache.sqlite")
+    cache.set("Cached", (False, []))
+    resolver = AsyncRORResolver(
+        cache=cache, url=url, concurrency=4, rate=1000, retries=2, backoff=0.01
+    )
+    names = [f"slow {i}" for i in range(8)] + [
+        "CERN",
+        "cern",
+        "flaky",
+        "fail",
+        "Cached",
+    ]
+
+    start = time.monotonic()
+    results = resolver.resolve(names)
+
+    # 8 slow lookups of 100ms, 4 at a time
+    assert time.monotonic() - start < 0.5
+    assert requested.in_flight["max"] == 4
+    assert sorted(requested) == sorted(
+        [f"slow {i}" for i in range(8)] + ["CERN", "flaky", "flaky", "fail"]
+    )
+    assert results["cern"] == (True, CERN)
+    # retried after the 503 response
+    assert results["flaky"] == (False, [])
+    assert results["fail"] is None
+    assert results["cached"] == (False, [])
+    assert len(results) == 12
+    # failed lookups are not cached
+    assert cache.get("flaky") == (False, [])
+    assert cache.get("fail") is None
+
+
+def test_transform_resolves_batches_in_record_order(ror_server, tmp_path):
+    url, requested = ror_server
+    transform = CDSToRDMAffiliationTransform(
+        ror_url=url, ror_concurrency=4, ror_rate_limit=1000, batch_size=2
+    )
+    records = [
+        {"creators": [{"affiliations": ["slow 1", "CERN"]}]},
+        {"creators": [{"affiliations": ["slow 2"]}], "contributors": [None]},
+        {"contributors": [{"affiliations": ["cern", "slow 1", "fail"]}]},
+    ]
+
+    with patch.object(transform, "_record_json", side_effect=lambda entry: entry):
+        results = list(transform.run(records))
+
+    assert [
+        [a["original_input"] for a in result["creators_affiliations"]]
+        for result in results[:2]
+    ] == [["slow 1", "CERN"], ["slow 2"]]
+    assert results[0]["creators_affiliations"][1]["ror_exact_match"] == (
+        "https://ror.org/01ggx4157"
+    )
+    # the record with a failed lookup is not transformed
+    assert results[2] is None
+    assert sorted(requested) == ["CERN", "fail", "slow 1", "slow 2"]
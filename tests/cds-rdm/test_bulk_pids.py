@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the bulk PIDs minting."""
+
+import uuid
+from unittest.mock import MagicMock
+
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+
+from cds_migrator_kit.rdm.records.load.pids import (
+    mint_legacy_redirects,
+    mint_report_numbers,
+)
+
+
+def test_mint_report_numbers(app, db):
+    parent_id = uuid.uuid4()
+    other_parent_id = uuid.uuid4()
+
+    duplicated = mint_report_numbers(
+        {"CERN-THESIS-2021-001": parent_id, "CERN-THESIS-2021-002": parent_id}
+    )
+    assert duplicated == []
+    pid = PersistentIdentifier.get("cdsrn", "CERN-THESIS-2021-001")
+    assert pid.object_uuid == parent_id
+    assert pid.status == PIDStatus.REGISTERED
+
+    # minting again for the same parent is not a duplicate
+    assert mint_report_numbers({"CERN-THESIS-2021-001": parent_id}) == []
+
+    duplicated = mint_report_numbers(
+        {
+            "CERN-THESIS-2021-002": other_parent_id,
+            "CERN-THESIS-2021-003": other_parent_id,
+        }
+    )
+    assert duplicated == ["CERN-THESIS-2021-002"]
+    assert (
+        PersistentIdentifier.get("cdsrn", "CERN-THESIS-2021-002").object_uuid
+        == parent_id
+    )
+    assert (
+        PersistentIdentifier.get("cdsrn", "CERN-THESIS-2021-003").object_uuid
+        == other_parent_id
+    )
+
+
+def test_mint_legacy_redirects(app, db):
+    parent_id = uuid.uuid4()
+    PersistentIdentifier.create(
+        pid_type="lrecid",
+        pid_value="1001",
+        object_type="rec",
+        object_uuid=parent_id,
+        status=PIDStatus.REGISTERED,
+    )
+    PersistentIdentifier.create(
+        pid_type="lrecid",
+        pid_value="1002",
+        object_type="rec",
+        object_uuid=uuid.uuid4(),
+        status=PIDStatus.REGISTERED,
+    )
+    migration_logger = MagicMock()
+
+    mint_legacy_redirects(
+        {"2001": "1001", 2002: 1001, "1002": "1001", "2003": "9999"},
+        batch_size=2,
+        migration_logger=migration_logger,
+    )
+
+    for recid in ("2001", "2002"):
+        assert PersistentIdentifier.get("lrecid", recid).object_uuid == parent_id
+    # already migrated recids are not redirected
+    assert PersistentIdentifier.get("lrecid", "1002").object_uuid != parent_id
+    assert sorted(
+        c.args[0] for c in migration_logger.finalise_record.call_args_list
+    ) == ["2001", "2002"]
+    # missing destination is reported
+    migration_logger.add_log.assert_called_once()
+    assert migration_logger.add_log.call_args.kwargs["record"] == {"recid": "2003"}
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the batched CLC sync."""
+
+import uuid
+from unittest.mock import MagicMock
+
+from cds_rdm.clc_sync.models import CDSToCLCSyncModel
+from cds_rdm.clc_sync.proxies import current_clc_sync_service
+from invenio_access.permissions import system_identity
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_rdm_records.proxies import current_rdm_records_service
+
+from cds_migrator_kit.rdm.records.load.clc_sync import pending_clc_syncs, run_clc_sync
+
+
+def _legacy_pid(legacy_recid, parent_id):
+    """Mint the legacy recid PID of a parent, as the load does."""
+    PersistentIdentifier.create(
+        pid_type="lrecid",
+        pid_value=legacy_recid,
+        object_type="rec",
+        object_uuid=parent_id,
+        status=PIDStatus.REGISTERED,
+    )
+
+
+def _publish_pending_sync(db, legacy_recid):
+    """Publish a record with a sync entry pending, as the load does."""
+    draft = current_rdm_records_service.create(
+        system_identity,
+        {
+            "metadata": {
+                "title": f"Record {legacy_recid}",
+                "publication_date": "2026-01-01",
+                "resource_type": {"id": "publication-article"},
+                "creators": [
+                    {
+                        "person_or_org": {
+                            "type": "personal",
+                            "given_name": "Test",
+                            "family_name": "Author",
+                        }
+                    }
+                ],
+            },
+            "access": {"record": "public", "files": "public"},
+            "files": {"enabled": False},
+        },
+    )
+    record = current_rdm_records_service.publish(system_identity, draft.id)
+    parent_recid = record["parent"]["id"]
+    _legacy_pid(legacy_recid, record._record.parent.id)
+    db.session.add(
+        CDSToCLCSyncModel(parent_record_pid=parent_recid, status="P", auto_sync=False)
+    )
+    db.session.commit()
+    return parent_recid
+
+
+def test_run_clc_sync(test_app, db, uploader, mocker):
+    synced_recid = _publish_pending_sync(db, "1001")
+    failing_recid = _publish_pending_sync(db, "1002")
+    # record of another collection, or disabled outside the migration
+    other_recid = _publish_pending_sync(db, "2001")
+    # sync entry left by a load whose record versions are gone
+    parent_id = uuid.uuid4()
+    PersistentIdentifier.create(
+        pid_type="recid",
+        pid_value="missing",
+        object_type="rec",
+        object_uuid=parent_id,
+        status=PIDStatus.REGISTERED,
+    )
+    _legacy_pid("1003", parent_id)
+    db.session.add(
+        CDSToCLCSyncModel(parent_record_pid="missing", status="P", auto_sync=False)
+    )
+    db.session.commit()
+    legacy_recids = ["1001", 1002, "1003", "1004"]
+    assert pending_clc_syncs(legacy_recids, batch_size=2) == sorted(
+        [synced_recid, failing_recid, "missing"]
+    )
+
+    failing_id = (
+        CDSToCLCSyncModel.query.filter_by(parent_record_pid=failing_recid).one().id
+    )
+    update = current_clc_sync_service.update
+
+    def _update(identity, id_, data, **kwargs):
+        if str(id_) == str(failing_id):
+            raise ValueError("CLC is down")
+        return update(identity, id_, data, **kwargs)
+
+    mocker.patch.object(current_clc_sync_service, "update", side_effect=_update)
+    migration_logger = MagicMock()
+
+    # one record per batch, the failures do not abort the other batches
+    failed = run_clc_sync(
+        legacy_recids, batch_size=1, migration_logger=migration_logger
+    )
+
+    assert sorted(failed) == sorted([failing_recid, "missing"])
+    assert pending_clc_syncs(legacy_recids) == sorted([failing_recid, "missing"])
+    assert (
+        CDSToCLCSyncModel.query.filter_by(parent_record_pid=synced_recid)
+        .one()
+        .auto_sync
+    )
+    logged = [c.args[0] for c in migration_logger.add_log.call_args_list]
+    assert len(logged) == 2
+    assert any("CLC is down" in log for log in logged)
+    assert any("record not found" in log for log in logged)
+    # the entries of the other records are left as they are
+    assert pending_clc_syncs(["2001"]) == [other_recid]
+
+    # the entries left pending are synced by the next run
+    mocker.stopall()
+    assert run_clc_sync(["1002"], batch_size=1) == []
+    assert pending_clc_syncs(legacy_recids) == ["missing"]
@@ -10,6 +10,7 @@
 import json
 import os
 import tempfile
+from unittest.mock import Mock, patch
 
 import pytest
 import yaml
@@ -21,10 +22,14 @@ from invenio_rdm_records.proxies import current_rdm_records_service
 from invenio_rdm_records.requests import CommunitySubmission
 from invenio_records_resources.services.uow import RecordCommitOp
 from invenio_requests.proxies import current_events_service, current_requests_service
+from invenio_requests.records.models import RequestEventModel
 from invenio_search import current_search, current_search_client
+from invenio_search.utils import build_alias_name
 from invenio_users_resources.records.api import UserAggregate
 
 from cds_migrator_kit.base_minter import legacy as legacy_minter
+from cds_migrator_kit.rdm.comments.load import CDSCommentsLoad
+from cds_migrator_kit.rdm.comments.resolver import resolve_legacy_recids
 from cds_migrator_kit.rdm.comments.runner import CommenterRunner, CommentsRunner
 from cds_migrator_kit.rdm.comments.streams import (
     CommenterStreamDefinition,
@@ -582,3 +587,87 @@ def test_migrate_comments_ep_targets_internal_version(
         ).total
         == 0
     )
+
+
+def test_resolve_legacy_recids(
+    temp_dir, migrated_records_with_comments, community, groups, db
+):
+    """The legacy recids of the comments are resolved in bulk from the DB."""
+    db.session.add(User(email="submitter13@cern.ch", active=True))
+    db.session.commit()
+
+    resolved = resolve_legacy_recids([12345, "23456", 99999])
+
+    assert sorted(resolved) == ["12345", "23456"]
+    record = migrated_records_with_comments[12345]
+    assert resolved["12345"]["parent"].pid.pid_value == record["parent"]["id"]
+    assert list(resolved["12345"]["versions"]) == [1]
+    assert resolved["12345"]["versions"][1]["id"] == record["id"]
+    assert resolved["12345"]["request"] is None
+    assert resolved["12345"]["has_migrated_comments"] is False
+
+    CommentsRunner(
+        stream_definition=CommentsStreamDefinition,
+        config_filepath=write_comments_stream_config(temp_dir, "test-comments"),
+        collection="test-comments",
+        log_dir=os.path.join(temp_dir, "logs"),
+        dry_run=False,
+    ).run()
+
+    resolved = resolve_legacy_recids(["12345", "34567"])
+    assert resolved["12345"]["request"]["number"] == "lrecid:12345"
+    assert resolved["12345"]["has_migrated_comments"] is True
+    # the comments of an unknown user were not migrated
+    assert resolved["34567"]["request"] is None
+    assert resolved["34567"]["has_migrated_comments"] is False
+
+
+def test_attached_files_indexed_once(test_app):
+    """The attachments directory is scanned once for all the comments."""
+    load = CDSCommentsLoad(dirpath=COMMENTS_DATA_DIR, logger=Mock())
+    with patch("os.scandir", wraps=os.scandir) as scandir:
+        assert load.get_attached_files_for_comment(23456, 4) == [
+            os.path.join(COMMENTS_DATA_DIR, "23456", "4", "content.pdf")
+        ]
+        assert load.get_attached_files_for_comment("23456", "5") == []
+        assert load.get_attached_files_for_comment(12345, 1) == []
+        calls = scandir.call_count
+        assert load.get_attached_files_for_comment(45678, 1) == []
+    assert scandir.call_count == calls
+
+
+def test_comment_events_bulk_indexed(
+    temp_dir, migrated_records_with_comments, community, groups, db
+):
+    """The events are indexed in bulk as the events indexer does."""
+    db.session.add(User(email="submitter13@cern.ch", active=True))
+    db.session.add(User(email="submitter10@gmail.com", active=True))
+    db.session.commit()
+    os.makedirs(COMMENTS_DATA_DIR, exist_ok=True)
+    runner = CommentsRunner(
+        stream_definition=CommentsStreamDefinition,
+        config_filepath=write_comments_stream_config(temp_dir, "test-comments"),
+        collection="test-comments",
+        log_dir=os.path.join(temp_dir, "logs"),
+        dry_run=False,
+    )
+    runner.run()
+
+    request = resolve_legacy_recids([12345])["12345"]["request"]
+    event_cls = current_events_service.record_cls
+    events = [
+        event_cls(model.data, model=model)
+        for model in RequestEventModel.query.filter_by(request_id=request.id)
+    ]
+    assert events
+    index = build_alias_name(event_cls.index._name)
+
+    def _indexed(event):
+        return current_search_client.get(index=index, id=str(event.id))
+
+    bulk_indexed = {str(event.id): _indexed(event) for event in events}
+    for event in events:
+        current_events_service.indexer.index(event)
+        indexed = _indexed(event)
+        assert bulk_indexed[str(event.id)]["_source"] == indexed["_source"]
+        assert bulk_indexed[str(event.id)]["_version"] == event.revision_id
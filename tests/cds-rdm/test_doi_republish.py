@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the deferred DOI re-publication queue."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from invenio_access.permissions import system_identity
+
+from cds_migrator_kit.rdm.records.load.dois import (
+    DOIRepublishQueue,
+    RateLimiter,
+    republish_doi,
+)
+from cds_migrator_kit.rdm.records.load.load import CDSRecordServiceLoad
+
+
+@pytest.fixture()
+def datacite_server():
+    """Local DataCite stand-in recording the updated DOIs."""
+    updated = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_PUT(self):
+            record_id = self.path.rsplit("/", 1)[-1]
+            status = 422 if record_id.startswith("fail") else 200
+            if status == 200:
+                updated.append(record_id)
+            self.send_response(status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", updated
+    server.shutdown()
+
+
+def _republish_func(url):
+    def _republish(record_id):
+        requests.put(f"{url}/dois/{record_id}", timeout=5).raise_for_status()
+
+    return _republish
+
+
+def test_doi_republish_queue(app, db, datacite_server):
+    url, updated = datacite_server
+    queue = DOIRepublishQueue("test_dois")
+    queue._write([])
+    queue.add("1", "abcde-00001")
+    queue.add("2", "abcde-00002")
+    queue.add("2", "abcde-00002")
+    queue.add("3", "fail0-00003")
+
+    assert len(queue.read()) == 3
+
+    migration_logger = MagicMock()
+    failed = queue.process(
+        workers=2,
+        rate_limit=50,
+        batch_size=2,
+        migration_logger=migration_logger,
+        republish_func=_republish_func(url),
+    )
+
+    assert sorted(updated) == ["abcde-00001", "abcde-00002"]
+    assert [item["record_id"] for item in failed] == ["fail0-00003"]
+    migration_logger.add_log.assert_called_once()
+    # failed items are kept in the queue to be retried
+    assert queue.read() == failed
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=1000)
+    for _ in range(5):
+        limiter.wait()
+    assert limiter._next_call > 0
+
+    unlimited = RateLimiter()
+    unlimited.wait()
+    assert unlimited._next_call == 0
+
+
+def test_republish_doi(app, mocker):
+    service = mocker.patch(
+        "cds_migrator_kit.rdm.records.load.dois.current_rdm_records_service"
+    )
+
+    republish_doi("abcde-00001")
+
+    service.pids.register_or_update.assert_called_once_with(
+        system_identity, "abcde-00001", "doi"
+    )
+
+
+class _RecordItem(dict):
+    """Published record, as returned by the records service."""
+
+    @property
+    def data(self):
+        return self
+
+
+def _entry(recid, doi=True):
+    pids = {"doi": {"identifier": f"10.17181/CERN.{recid}"}} if doi else {}
+    return {"record": {"recid": recid, "json": {"pids": pids}}}
+
+
+def test_load_queues_dois_after_commit(app, db, mocker):
+    published = {
+        "1": [_RecordItem(id="abcde-00001", pids={"doi": {"provider": "datacite"}})],
+        # externally managed DOIs are not registered by us
+        "2": [_RecordItem(id="abcde-00002", pids={"doi": {"provider": "external"}})],
+        "3": [_RecordItem(id="abcde-00003", pids={})],
+        # not committed, the DOIs are not queued
+        "4": [_RecordItem(id="abcde-00004", pids={"doi": {"provider": "datacite"}})],
+    }
+    load = CDSRecordServiceLoad(
+        collection="test_dois_load", migration_logger=MagicMock()
+    )
+    load.doi_republish_queue._write([])
+
+    def _load_versions(entry, uow):
+        recid = entry["record"]["recid"]
+        for record in published[recid]:
+            load._after_publish_update_dois(record, entry)
+        # nothing is queued before the commit
+        assert load.doi_republish_queue.read() == []
+        if recid == "4":
+            raise ValueError("Failed to publish")
+        return {"recid": recid}
+
+    mocker.patch.object(load, "_load_versions", side_effect=_load_versions)
+    mocker.patch.object(load, "_save_original_dumped_record")
+
+    load._load(_entry("1"))
+    load._load(_entry("2"))
+    load._load(_entry("3", doi=False))
+    load._load(_entry("4"))
+
+    assert load.doi_republish_queue.read() == [
+        {"legacy_recid": "1", "record_id": "abcde-00001"}
+    ]
+
+
+@pytest.mark.parametrize("on_cleanup", [True, False])
+def test_load_republishes_dois_on_cleanup(app, db, mocker, on_cleanup):
+    mocker.patch("cds_migrator_kit.rdm.records.load.load.mint_legacy_redirects")
+    mocker.patch("cds_migrator_kit.rdm.records.load.load.run_clc_sync")
+    migration_logger = MagicMock()
+    load = CDSRecordServiceLoad(
+        collection="test_dois_load",
+        migration_logger=migration_logger,
+        doi_republish={"workers": 4, "rate_limit": 10, "on_cleanup": on_cleanup},
+    )
+    process = mocker.patch.object(load.doi_republish_queue, "process")
+
+    load._cleanup()
+
+    if on_cleanup:
+        process.assert_called_once_with(
+            workers=4,
+            rate_limit=10,
+            batch_size=100,
+            migration_logger=migration_logger,
+        )
+    else:
+        process.assert_not_called()
@@ -64,7 +64,7 @@ class TestFindReviewer:
         db.session.commit()
 
         found = find_reviewer("jane.smith@cern.ch")
-        assert found.id == user.id
+        assert found == user.id
 
     def test_find_reviewer_by_profile_name_family_given(self, app, db):
         """Test that a 'Family, Given' reviewer is resolved via profile JSON."""
@@ -75,7 +75,7 @@ class TestFindReviewer:
         db.session.commit()
 
         found = find_reviewer("Doe, John")
-        assert found.id == user.id
+        assert found == user.id
 
     def test_find_reviewer_by_profile_name_given_family(self, app, db):
         """Test that a 'Given Family' reviewer (no comma) is resolved via profile JSON."""
@@ -86,7 +86,7 @@ class TestFindReviewer:
         db.session.commit()
 
         found = find_reviewer("Mary Jones")
-        assert found.id == user.id
+        assert found == user.id
 
     def test_find_reviewer_name_match_is_case_insensitive(self, app, db):
         """Test that profile name matching ignores case."""
@@ -97,7 +97,7 @@ class TestFindReviewer:
         db.session.commit()
 
         found = find_reviewer("lee, ANNA")
-        assert found.id == user.id
+        assert found == user.id
 
     def test_find_reviewer_family_name_only(self, app, db):
         """Test that a family-name-only reviewer resolves when unambiguous."""
@@ -108,7 +108,7 @@ class TestFindReviewer:
         db.session.commit()
 
         found = find_reviewer("Solo")
-        assert found.id == user.id
+        assert found == user.id
 
     def test_find_reviewer_by_email_not_found_raises(self, app, db):
         """Test that an unmatched email raises RecordFlaggedCuration."""
@@ -130,3 +130,18 @@ class TestFindReviewer:
 
         with pytest.raises(RecordFlaggedCuration):
             find_reviewer("Doe, Someone Else")
+
+    def test_find_reviewer_ambiguous_name_raises(self, app, db):
+        """Test that a name matching several accounts raises."""
+        create_test_user(
+            email="john.doe@cern.ch",
+            user_profile={"family_name": "Doe", "given_name": "John"},
+        )
+        create_test_user(
+            email="john.doe2@cern.ch",
+            user_profile={"family_name": "Doe", "given_name": "John"},
+        )
+        db.session.commit()
+
+        with pytest.raises(RecordFlaggedCuration):
+            find_reviewer("Doe, John")
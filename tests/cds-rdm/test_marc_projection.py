@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the MARC XML projection of the tag-specific streams."""
+
+import json
+from os.path import join
+
+from cds_dojson.marc21.utils import create_record
+
+from cds_migrator_kit.transform.dumper import project_marcxml
+
+MARCXML = """<collection xmlns="http://www.loc.gov/MARC21/slim">
+<record>
+  <controlfield tag="001">2684743</controlfield>
+  <datafield tag="100" ind1=" " ind2=" ">
+    <subfield code="a">Doe, John</subfield>
+    <subfield code="u">CERN</subfield>
+  </datafield>
+  <datafield tag="245" ind1=" " ind2=" ">
+    <subfield code="a">A title with a &lt;tag&gt;</subfield>
+  </datafield>
+  <datafield tag='700' ind1=" " ind2=" ">
+    <subfield code="a">Smith, Jane</subfield>
+    <subfield code="u">Université de Genève</subfield>
+  </datafield>
+  <datafield tag="700" ind1=" " ind2=" "/>
+  <datafield tag="7001" ind1=" " ind2=" ">
+    <subfield code="a">Not an author</subfield>
+  </datafield>
+  <datafield tag="859" ind1=" " ind2=" ">
+    <subfield code="f">john.doe@cern.ch</subfield>
+  </datafield>
+</record>
+</collection>
+"""
+
+
+def _restrict(record, tags):
+    return {key: value for key, value in record.items() if key[:3] in tags}
+
+
+def test_project_marcxml():
+    """Only the fields of the tags are kept."""
+    tags = ("100", "700")
+    projected = create_record(project_marcxml(MARCXML, tags))
+
+    assert projected == {
+        "100__": [{"a": "Doe, John", "u": "CERN"}],
+        "700__": [{"a": "Smith, Jane", "u": "Université de Genève"}],
+    }
+    assert projected == _restrict(create_record(MARCXML), tags)
+
+    # bytes, control fields
+    projected = create_record(project_marcxml(MARCXML.encode("utf-8"), ("001",)))
+    assert projected == {"001": "2684743"}
+
+    assert create_record(project_marcxml(MARCXML, ("999",))) == {}
+
+
+def test_project_marcxml_dumps(datadir):
+    """The projection of the dumped records matches their full parsing."""
+    with open(join(datadir, "sspn", "dumps", "test_records.json")) as dump_file:
+        dump = json.load(dump_file)
+    tags = ("100", "700", "859", "906")
+    for record in dump:
+        for revision in record["record"]:
+            marcxml = revision["marcxml"]
+            assert create_record(project_marcxml(marcxml, tags)) == _restrict(
+                create_record(marcxml), tags
+            )
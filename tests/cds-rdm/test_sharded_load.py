@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the sharded multi-process load."""
+
+import json
+import os
+import signal
+from functools import partial
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+from invenio_rdm_migrator.load.base import Load
+
+from cds_migrator_kit.reports.log import MigrationProgressLogger, RecordStateLogger
+from cds_migrator_kit.runner.sharded import ShardedLoad, shard_of
+
+
+def test_shard_of():
+    assert shard_of("2742366", 4) == 2742366 % 4
+    assert shard_of(2742366, 4) == shard_of("2742366", 4)
+    # non numeric recids are hashed
+    assert shard_of("abc", 4) == shard_of("abc", 4)
+    assert 0 <= shard_of("abc", 4) < 4
+
+
+def test_sharded_load_merge_logs(app):
+    migration_logger = MigrationProgressLogger(collection="sharded")
+    record_state_logger = RecordStateLogger(collection="sharded")
+    migration_logger.start_log()
+    record_state_logger.start_log()
+    load = MagicMock(
+        migration_logger=migration_logger, record_state_logger=record_state_logger
+    )
+    sharded_load = ShardedLoad(load, load_cls=MagicMock, load_kwargs={}, workers=2)
+
+    shard_migration_logger = MigrationProgressLogger(
+        collection="sharded", log_progress_filename="rdm_migration_errors.shard1.csv"
+    )
+    shard_migration_logger.start_log()
+    shard_migration_logger.finalise_record("1001")
+    shard_migration_logger.finalise()
+    shard_record_state_logger = RecordStateLogger(
+        collection="sharded", records_state_filename="rdm_records_state.shard1.json"
+    )
+    shard_record_state_logger.add_record_state({"legacy_recid": "1001"})
+    shard_record_state_logger.finalise()
+
+    sharded_load._merge_logs(0)
+    sharded_load._merge_logs(1)
+    migration_logger.finalise()
+    record_state_logger.finalise()
+
+    assert [row["recid"] for row in migration_logger.read_log()] == ["1001"]
+    assert not os.path.exists(shard_migration_logger.PROGRESS_LOG_FILEPATH)
+    with open(record_state_logger.RECORD_STATE_FILEPATH) as fp:
+        assert json.load(fp) == [{"legacy_recid": "1001"}]
+
+
+def _create_app(logs_path):
+    """Create a lightweight application for the load workers."""
+    app = Flask("sharded")
+    app.config["CDS_MIGRATOR_KIT_LOGS_PATH"] = logs_path
+    return app
+
+
+class RecordStatesLoad(Load):
+    """Load writing the state of each record, failing on ``fail_on``."""
+
+    def __init__(
+        self,
+        migration_logger,
+        record_state_logger,
+        collection,
+        fail_on=None,
+        kill_on=None,
+    ):
+        """Constructor."""
+        self.migration_logger = migration_logger
+        self.record_state_logger = record_state_logger
+        self.fail_on = fail_on
+        self.kill_on = kill_on
+
+    def _load(self, entry):
+        recid = entry["record"]["recid"]
+        if recid == self.fail_on:
+            raise ValueError(f"Failed to load {recid}")
+        if recid == self.kill_on:
+            # e.g. killed by the OOM killer
+            os.kill(os.getpid(), signal.SIGKILL)
+        self.record_state_logger.add_record_state(
+            {"legacy_recid": recid, "pid": os.getpid()}
+        )
+        self.migration_logger.finalise_record(recid)
+
+    def _cleanup(self):
+        pass
+
+
+def _sharded_load(app, queue_size=100, **load_kwargs):
+    migration_logger = MigrationProgressLogger(collection="sharded")
+    record_state_logger = RecordStateLogger(collection="sharded")
+    migration_logger.start_log()
+    record_state_logger.start_log()
+    load = MagicMock(
+        migration_logger=migration_logger, record_state_logger=record_state_logger
+    )
+    sharded_load = ShardedLoad(
+        load,
+        load_cls=RecordStatesLoad,
+        load_kwargs={"collection": "sharded", **load_kwargs},
+        workers=2,
+        app_factory=partial(_create_app, app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]),
+        queue_size=queue_size,
+    )
+    return sharded_load, load
+
+
+def _record_states(sharded_load):
+    sharded_load.migration_logger.finalise()
+    sharded_load.record_state_logger.finalise()
+    with open(sharded_load.record_state_logger.RECORD_STATE_FILEPATH) as fp:
+        return json.load(fp)
+
+
+def test_sharded_load_run(app):
+    """The entries are loaded by the workers of their shard."""
+    sharded_load, load = _sharded_load(app)
+    recids = [str(recid) for recid in range(1000, 1010)]
+
+    sharded_load.run(
+        [{"record": {"recid": recid}} for recid in recids] + [None], cleanup=True
+    )
+
+    states = _record_states(sharded_load)
+    assert sorted(state["legacy_recid"] for state in states) == recids
+    pids = {}
+    for state in states:
+        pids.setdefault(shard_of(state["legacy_recid"], 2), set()).add(state["pid"])
+    # one worker process per shard, other than the parent
+    assert len(pids) == 2
+    assert all(len(shard_pids) == 1 for shard_pids in pids.values())
+    assert os.getpid() not in set.union(*pids.values())
+    assert (
+        sorted(row["recid"] for row in sharded_load.migration_logger.read_log())
+        == recids
+    )
+    # the cleanup runs once, in the parent
+    load._cleanup.assert_called_once_with()
+    assert not [
+        filename
+        for filename in os.listdir(
+            os.path.dirname(sharded_load.record_state_logger.RECORD_STATE_FILEPATH)
+        )
+        if ".shard" in filename
+    ]
+
+
+def test_sharded_load_worker_dies(app):
+    """A dead worker stops the run, the logs of the workers are merged."""
+    sharded_load, load = _sharded_load(app, queue_size=1, fail_on="1000")
+    # the even recids go to the failing worker
+    recids = [str(recid) for recid in range(1000, 1200)]
+
+    with pytest.raises(RuntimeError, match="load-shard-0"):
+        sharded_load.run([{"record": {"recid": recid}} for recid in recids])
+
+    states = _record_states(sharded_load)
+    loaded = {state["legacy_recid"] for state in states}
+    assert "1000" not in loaded
+    # the other worker loaded the entries it received
+    assert loaded and all(shard_of(recid, 2) == 1 for recid in loaded)
+    errors = [
+        row
+        for row in sharded_load.migration_logger.read_log()
+        if "load-shard-0" in (row.get("message") or "")
+    ]
+    assert errors
+    load._cleanup.assert_not_called()
+
+
+def test_sharded_load_worker_killed(app):
+    """A worker killed once all the entries are queued fails the run."""
+    sharded_load, load = _sharded_load(app, kill_on="1000")
+    # the even recids go to the killed worker, all fit in its queue
+    recids = [str(recid) for recid in range(1000, 1020)]
+
+    with pytest.raises(RuntimeError, match="load-shard-0 exited with code -9"):
+        sharded_load.run(
+            [{"record": {"recid": recid}} for recid in recids], cleanup=True
+        )
+
+    states = _record_states(sharded_load)
+    assert sorted(state["legacy_recid"] for state in states) == recids[1::2]
+    errors = sharded_load.migration_logger.read_log()
+    assert any("load-shard-0" in (row.get("message") or "") for row in errors)
+    # the entries left in the queue of the killed worker are named
+    assert (
+        sorted(
+            row["recid"]
+            for row in errors
+            if (row.get("message") or "").startswith("Not loaded")
+        )
+        == recids[2::2]
+    )
+    load._cleanup.assert_not_called()
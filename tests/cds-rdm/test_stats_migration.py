@@ -7,20 +7,37 @@
 
 """Tests for stats migration: event generation, query building, and load filtering."""
 
+import json
 import logging
 from copy import deepcopy
 from unittest.mock import MagicMock, call, patch
 
 import pytest
 
+from cds_migrator_kit.rdm.stats.aggregations import StatsAggregator
+from cds_migrator_kit.rdm.stats.checkpoint import StatsCheckpoint
 from cds_migrator_kit.rdm.stats.event_generator import (
+    compile_rec_context,
     flag_robots_and_COUNTER,
+    format_timestamps,
     prepare_new_doc,
     process_download_event,
     process_pageview_event,
 )
-from cds_migrator_kit.rdm.stats.load import _QUERY_VIEWS, CDSRecordStatsLoad
-from cds_migrator_kit.rdm.stats.search import generate_query
+from cds_migrator_kit.rdm.stats.extract import (
+    LegacyRecordStatsExtract,
+    read_record_states,
+)
+from cds_migrator_kit.rdm.stats.load import (
+    _QUERY_VIEWS,
+    CDSRecordStatsExportLoad,
+    CDSRecordStatsLoad,
+)
+from cds_migrator_kit.rdm.stats.search import (
+    BulkIndexer,
+    generate_batch_query,
+    generate_query,
+)
 
 # ---------------------------------------------------------------------------
 # Shared fixtures
@@ -138,6 +155,63 @@ def test_generate_query_does_not_mutate_template():
     assert LEGACY_TO_RDM_EVENTS_MAP == original
 
 
+# ---------------------------------------------------------------------------
+# format_timestamps
+# ---------------------------------------------------------------------------
+
+
+def test_format_timestamps_matches_per_event_conversion():
+    from datetime import datetime
+
+    timestamps = [1703779131037, 946684799999, 1735689600000, 0]
+    formatted, years = format_timestamps(timestamps)
+    assert formatted == [
+        datetime.utcfromtimestamp(ts / 1000).strftime("%Y-%m-%dT%H:%M:%S")
+        for ts in timestamps
+    ]
+    assert years == [2023, 1999, 2025, 1970]
+
+
+def test_prepare_new_doc_page_without_timestamp():
+    """A malformed event does not prevent the rest of the page to be processed."""
+    logger = MagicMock()
+    event = {k: v for k, v in PAGEVIEW_EVENT.items() if k != "event_type"}
+    broken = {k: v for k, v in event.items() if k != "timestamp"}
+    data = _make_os_response([event, broken], "events.pageviews")
+    docs = list(
+        prepare_new_doc(
+            data,
+            REC_WITH_FILES,
+            logger,
+            "events.pageviews",
+            LEGACY_TO_RDM_EVENTS_MAP,
+            "events-stats",
+        )
+    )
+    assert len(docs) == 1
+    assert docs[0]["_index"] == "events-stats-record-view-2023"
+    logger.error.assert_called_once()
+
+
+def test_bulk_indexer_flush_waits_for_queued_actions():
+    indexed = []
+
+    def streaming_bulk(client, actions, **kwargs):
+        for action in actions:
+            indexed.append(action["_id"])
+            yield True, {"create": {"status": 201}}
+
+    with patch(
+        "cds_migrator_kit.rdm.stats.search.streaming_bulk", side_effect=streaming_bulk
+    ):
+        with BulkIndexer(MagicMock(), MagicMock(), threads=3, queue_size=2) as indexer:
+            indexer.index({"_id": f"migrated_{i}"} for i in range(20))
+            indexer.flush()
+            assert len(indexed) == 20
+            indexer.index({"_id": f"migrated_{i}"} for i in range(20, 25))
+    assert len(indexed) == 25
+
+
 # ---------------------------------------------------------------------------
 # flag_robots_and_COUNTER
 # ---------------------------------------------------------------------------
@@ -329,6 +403,37 @@ def test_prepare_new_doc_skips_unmigrated_file():
     assert docs == []
 
 
+def test_prepare_new_doc_does_not_mutate_hits():
+    logger = MagicMock()
+    data = _make_os_response(
+        [{k: v for k, v in DOWNLOAD_EVENT.items() if k != "event_type"}],
+        "events.downloads",
+    )
+    original = deepcopy(data)
+    docs = list(
+        prepare_new_doc(
+            data,
+            compile_rec_context(REC_WITH_FILES),
+            logger,
+            "events.downloads",
+            LEGACY_TO_RDM_EVENTS_MAP,
+            "events-stats",
+        )
+    )
+    assert len(docs) == 1
+    assert docs[0]["_id"] == "migrated_hit-0"
+    assert data == original
+
+
+def test_compile_rec_context():
+    ctx = compile_rec_context(REC_WITH_FILES)
+    assert ctx["_versions"][1]["new_recid"] == "hk1ez-6ar45"
+    assert ctx["_files"][(1, "102798")]["file_key"] == "EPJC.54.365-370.pdf"
+    # compiling twice is a no-op and the original context is left untouched
+    assert compile_rec_context(ctx) is ctx
+    assert "_versions" not in REC_WITH_FILES
+
+
 def test_prepare_new_doc_year_in_index():
     """Index name includes the year extracted from the event timestamp."""
     logger = MagicMock()
@@ -416,44 +521,592 @@ def test_process_pageviews_passes_no_file_ids_to_search():
     assert kwargs.get("file_ids") is None
 
 
-def test_validate_downloads_uses_file_ids_in_legacy_count():
+# ---------------------------------------------------------------------------
+# CDSRecordStatsLoad — batched mode
+# ---------------------------------------------------------------------------
+
+
+def test_generate_batch_query():
+    q = generate_batch_query(
+        "events.downloads",
+        ["1156138", "1156137"],
+        LEGACY_TO_RDM_EVENTS_MAP,
+        LESS_THAN_DATE,
+        file_ids=[102798],
+    )
+    assert q["query"]["bool"]["must"][0] == {
+        "terms": {"id_bibrec": ["1156138", "1156137"]}
+    }
+    assert q["query"]["bool"]["must"][1]["match"]["event_type"] == "events.downloads"
+    assert {"terms": {"id_bibdoc": [102798]}} in q["query"]["bool"]["filter"]
+
+
+def test_batched_load_routes_hits_by_recid():
     load = _make_load()
-    migrated_file_ids = [
-        f["legacy_file_id"] for v in REC_WITH_FILES["versions"] for f in v["files"]
+    load.batch_size = 2
+    other_rec = {
+        **REC_WITH_FILES,
+        "legacy_recid": "2000",
+        "parent_recid": "abcde-12345",
+        "latest_version": "fghij-67890",
+    }
+    hits = _make_os_response(
+        [
+            {**PAGEVIEW_EVENT, "id_bibrec": 2000},
+            PAGEVIEW_EVENT,
+            {**PAGEVIEW_EVENT, "id_bibrec": 2000},
+        ],
+        "events.pageviews",
+    )
+
+    with patch(
+        "cds_migrator_kit.rdm.stats.load.os_search_query"
+    ) as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll, patch.object(
+        load, "validate_stats"
+    ) as mock_validate, patch.object(
+        load, "_index_new_events"
+    ) as mock_index:
+        mock_search.return_value = {
+            "_scroll_id": "sid1",
+            "hits": {**hits["hits"], "total": {"value": 3}},
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid1", "hits": {"hits": []}}
+        load.src_os_client.clear_scroll = MagicMock()
+
+        load.run(
+            [
+                ("events.pageviews", REC_WITH_FILES),
+                ("events.pageviews", other_rec),
+                ("events.downloads", REC_NO_FILES),
+            ]
+        )
+
+    # one scroll for both records
+    mock_search.assert_called_once()
+    q = mock_search.call_args.args[2]
+    assert q["query"]["bool"]["must"][0]["terms"]["id_bibrec"] == ["1156138", "2000"]
+    load.src_os_client.clear_scroll.assert_called_once_with(scroll_id="sid1")
+
+    docs = list(mock_index.call_args.args[0])
+    assert sorted(d["_source"]["parent_recid"] for d in docs) == [
+        "0m8n6-qnx43",
+        "abcde-12345",
+        "abcde-12345",
     ]
+    # records are validated once all are loaded, including the ones without
+    # migrated files whose downloads are not scanned
+    mock_validate.assert_called_once()
+    assert list(load._to_validate["events.pageviews"]) == ["1156138", "2000"]
+    assert list(load._to_validate["events.downloads"]) == ["1156137"]
 
-    with patch("cds_migrator_kit.rdm.stats.load.os_count") as mock_count, patch(
-        "cds_migrator_kit.rdm.stats.load.generate_query"
-    ) as mock_query:
 
-        mock_count.return_value = {"count": 5}
-        mock_query.return_value = {}
-        load.dest_os_client.indices.refresh = MagicMock()
+def test_heavy_record_is_scanned_with_sliced_scroll():
+    load = _make_load()
+    load.slices = 3
+    load.slice_threshold = 10
+    hits = _make_os_response([PAGEVIEW_EVENT], "events.pageviews")
 
-        load.validate_stats_for_recid(
-            REC_WITH_FILES["legacy_recid"], REC_WITH_FILES, "events.downloads"
+    with patch("cds_migrator_kit.rdm.stats.load.os_count") as mock_count, patch(
+        "cds_migrator_kit.rdm.stats.load.os_search"
+    ) as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_search_query"
+    ) as mock_search_query, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll, patch.object(
+        load, "_generate_new_events"
+    ) as mock_generate:
+        mock_count.return_value = {"count": 11}
+        mock_search_query.side_effect = lambda client, index, q, size, scroll: {
+            "_scroll_id": f"sid{q['slice']['id'] + 1}",
+            **hits,
+        }
+        mock_scroll.side_effect = lambda client, sid, scroll: {
+            "_scroll_id": sid,
+            "hits": {"hits": []},
+        }
+        load.src_os_client.clear_scroll = MagicMock()
+
+        load._process_legacy_events_for_recid(
+            REC_WITH_FILES["legacy_recid"], REC_WITH_FILES, "cds-2*", "events.pageviews"
         )
 
-    mock_query.assert_called_once()
-    _, kwargs = mock_query.call_args
-    assert kwargs.get("file_ids") == migrated_file_ids
+    # the record is counted, no sequential page is fetched
+    mock_count.assert_called_once()
+    mock_search.assert_not_called()
+    slices = sorted(c.args[2]["slice"]["id"] for c in mock_search_query.call_args_list)
+    assert slices == [0, 1, 2]
+    assert all(
+        c.args[2]["slice"]["max"] == 3 for c in mock_search_query.call_args_list
+    )
+    # one page per slice
+    assert mock_generate.call_count == 3
+    assert sorted(
+        c.kwargs["scroll_id"] for c in load.src_os_client.clear_scroll.call_args_list
+    ) == ["sid1", "sid2", "sid3"]
 
 
-def test_validate_pageviews_passes_no_file_ids():
+def test_light_record_is_scanned_sequentially():
     load = _make_load()
+    load.slices = 3
+    load.slice_threshold = 10
 
     with patch("cds_migrator_kit.rdm.stats.load.os_count") as mock_count, patch(
-        "cds_migrator_kit.rdm.stats.load.generate_query"
-    ) as mock_query:
+        "cds_migrator_kit.rdm.stats.load.os_search"
+    ) as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_search_query"
+    ) as mock_search_query, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll:
+        mock_count.return_value = {"count": 10}
+        mock_search.return_value = {
+            "_scroll_id": "sid1",
+            "hits": {"hits": [], "total": {"value": 10}},
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid1", "hits": {"hits": []}}
+        load.src_os_client.clear_scroll = MagicMock()
+
+        load._process_legacy_events_for_recid(
+            REC_WITH_FILES["legacy_recid"], REC_WITH_FILES, "cds-2*", "events.pageviews"
+        )
+
+    mock_search.assert_called_once()
+    mock_search_query.assert_not_called()
+    load.src_os_client.clear_scroll.assert_called_once_with(scroll_id="sid1")
 
-        mock_count.return_value = {"count": 3}
-        mock_query.return_value = {}
+
+# ---------------------------------------------------------------------------
+# CDSRecordStatsLoad — deferred validation
+# ---------------------------------------------------------------------------
+
+
+def test_validate_stats_writes_mismatches_report(tmp_path):
+    load = _make_load(dry_run=False)
+    report_filepath = tmp_path / "validation_mismatches.csv"
+    load.config["VALIDATION_REPORT_FILEPATH"] = str(report_filepath)
+    other_rec = {
+        **REC_WITH_FILES,
+        "legacy_recid": "2000",
+        "parent_recid": "abcde-12345",
+    }
+    load._add_to_validate(
+        {"1156138": REC_WITH_FILES, "2000": other_rec}, "events.downloads"
+    )
+    load._add_to_validate({"1156138": REC_WITH_FILES}, "events.pageviews")
+    # only what the validation needs is kept of the record contexts
+    assert load._to_validate["events.downloads"]["2000"] == {
+        "parent_recid": "abcde-12345",
+        "file_ids": [
+            f["legacy_file_id"] for v in REC_WITH_FILES["versions"] for f in v["files"]
+        ],
+    }
+    assert load._to_validate["events.pageviews"]["1156138"] == {
+        "parent_recid": REC_WITH_FILES["parent_recid"],
+        "file_ids": None,
+    }
+
+    def aggregate(client, index, q):
+        if index == "cds-2*":
+            buckets = [
+                {
+                    "key": 1156138,
+                    "doc_count": 7,
+                    "files": {
+                        "buckets": [
+                            {"key": 102798, "doc_count": 4},
+                            # file of another record, not counted
+                            {"key": 555, "doc_count": 3},
+                        ]
+                    },
+                },
+                {
+                    "key": 2000,
+                    "doc_count": 2,
+                    "files": {"buckets": [{"key": 102798, "doc_count": 2}]},
+                },
+            ]
+            return {"aggregations": {"recids": {"buckets": buckets}}}
+        return {
+            "aggregations": {
+                "parents": {"buckets": [{"key": "0m8n6-qnx43", "doc_count": 4}]}
+            }
+        }
+
+    with patch(
+        "cds_migrator_kit.rdm.stats.load.os_aggregate", side_effect=aggregate
+    ) as mock_aggregate:
         load.dest_os_client.indices.refresh = MagicMock()
+        load.validate_stats()
+
+    load.dest_os_client.indices.refresh.assert_called_once_with(index="events-stats-*")
+    # one legacy and one RDM aggregation per event type
+    assert mock_aggregate.call_count == 4
+    legacy_q = mock_aggregate.call_args_list[2].args[2]
+    assert legacy_q["aggs"]["recids"]["terms"] == {"field": "id_bibrec", "size": 2}
+
+    lines = report_filepath.read_text().splitlines()
+    assert lines == [
+        "legacy_recid,parent_recid,event_type,legacy_count,rdm_count",
+        "1156138,0m8n6-qnx43,events.pageviews,7,4",
+        "2000,abcde-12345,events.downloads,2,0",
+    ]
+    assert load._to_validate == {"events.pageviews": {}, "events.downloads": {}}
+
+
+# ---------------------------------------------------------------------------
+# BulkIndexer
+# ---------------------------------------------------------------------------
 
-        load.validate_stats_for_recid(
-            REC_WITH_FILES["legacy_recid"], REC_WITH_FILES, "events.pageviews"
+
+def test_bulk_indexer_keeps_failed_actions_for_retry(tmp_path):
+    retry_filepath = tmp_path / "failed_events.ndjson"
+    actions = [
+        {"_op_type": "create", "_index": "idx", "_id": f"migrated_{i}", "_source": {}}
+        for i in range(5)
+    ]
+
+    def streaming_bulk(client, actions, **kwargs):
+        for action in actions:
+            i = int(action["_id"].split("_")[1])
+            if i == 1:
+                yield False, {"create": {"status": 409, "error": "conflict"}}
+            elif i == 3:
+                yield False, {"create": {"status": 400, "error": "mapping"}}
+            else:
+                yield True, {"create": {"status": 201}}
+
+    logger = MagicMock()
+    with patch(
+        "cds_migrator_kit.rdm.stats.search.streaming_bulk", side_effect=streaming_bulk
+    ):
+        indexer = BulkIndexer(
+            MagicMock(), logger, threads=2, queue_size=2, retry_filepath=retry_filepath
         )
+        with indexer:
+            indexer.index(iter(actions))
 
-    mock_query.assert_called_once()
-    _, kwargs = mock_query.call_args
-    assert kwargs.get("file_ids") is None
+    # already migrated events are not failures
+    assert indexer.failed == 1
+    lines = retry_filepath.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [actions[3]]
+    logger.error.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Export and replay
+# ---------------------------------------------------------------------------
+
+
+def test_export_and_replay(tmp_path):
+    config = {
+        "SRC_SEARCH_HOSTS": [],
+        "DEST_SEARCH_HOSTS": [],
+        "SRC_SEARCH_SIZE": 10,
+        "SRC_SEARCH_SCROLL": "1h",
+        "DEST_SEARCH_INDEX_PREFIX": "events-stats",
+        "EXPORT_DIR": str(tmp_path / "snapshot"),
+        "EXPORT_SHARDS": 2,
+    }
+    download = {k: v for k, v in DOWNLOAD_EVENT.items() if k != "event_type"}
+    pageviews = _make_os_response(
+        [{k: v for k, v in PAGEVIEW_EVENT.items() if k != "event_type"}] * 2,
+        "events.pageviews",
+    )
+    downloads = _make_os_response(
+        [download, {**download, "id_bibdoc": 99999}], "events.downloads"
+    )
+    with patch("cds_migrator_kit.rdm.stats.load.OpenSearch"):
+        export_load = CDSRecordStatsExportLoad(
+            config=config, less_than_date=LESS_THAN_DATE
+        )
+    with patch("cds_migrator_kit.rdm.stats.load.os_search") as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll:
+        mock_search.side_effect = lambda client, index, event_type, *args, **kwargs: {
+            "_scroll_id": "sid",
+            "hits": {
+                **(pageviews if event_type == "events.pageviews" else downloads)[
+                    "hits"
+                ],
+                "total": {"value": 2},
+            },
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid", "hits": {"hits": []}}
+        export_load.run(
+            [
+                ("events.pageviews", REC_WITH_FILES),
+                ("events.downloads", REC_WITH_FILES),
+            ]
+        )
+
+    dry_run_filepath = tmp_path / "dry_run_events.ndjson"
+    replay_config = {
+        **config,
+        "REPLAY_DIR": config["EXPORT_DIR"],
+        "DRY_RUN_OUTPUT_FILEPATH": str(dry_run_filepath),
+    }
+    with patch("cds_migrator_kit.rdm.stats.load.OpenSearch"):
+        replay_load = CDSRecordStatsLoad(
+            config=replay_config, less_than_date=LESS_THAN_DATE, dry_run=True
+        )
+    with patch("cds_migrator_kit.rdm.stats.load.os_search") as mock_search:
+        replay_load.run(
+            [
+                ("events.pageviews", REC_WITH_FILES),
+                ("events.downloads", REC_WITH_FILES),
+            ]
+        )
+    # the source cluster is not queried
+    mock_search.assert_not_called()
+
+    docs = [json.loads(line) for line in dry_run_filepath.read_text().splitlines()]
+    assert sorted(doc["_index"] for doc in docs) == [
+        "events-stats-file-download-2023",
+        "events-stats-record-view-2023",
+        "events-stats-record-view-2023",
+    ]
+    # the events of files not migrated with the record are not legacy events
+    assert replay_load._replayed_counts["events.downloads"] == {"1156138": 1}
+    assert replay_load._replayed_counts["events.pageviews"] == {"1156138": 2}
+
+
+def test_export_ignores_aggregations(tmp_path):
+    config = {
+        "SRC_SEARCH_HOSTS": [],
+        "DEST_SEARCH_HOSTS": [],
+        "SRC_SEARCH_SIZE": 10,
+        "SRC_SEARCH_SCROLL": "1h",
+        "DEST_SEARCH_INDEX_PREFIX": "events-stats",
+        "DEST_AGGREGATIONS": True,
+        "EXPORT_DIR": str(tmp_path / "snapshot"),
+    }
+    pageviews = _make_os_response(
+        [{k: v for k, v in PAGEVIEW_EVENT.items() if k != "event_type"}],
+        "events.pageviews",
+    )
+    # no DEST_AGG_INDEX_PREFIX, nothing is aggregated on export
+    with patch("cds_migrator_kit.rdm.stats.load.OpenSearch"):
+        export_load = CDSRecordStatsExportLoad(
+            config=config, less_than_date=LESS_THAN_DATE
+        )
+    assert export_load.aggregator is None
+
+    with patch("cds_migrator_kit.rdm.stats.load.os_search") as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll:
+        mock_search.return_value = {
+            "_scroll_id": "sid",
+            "hits": {**pageviews["hits"], "total": {"value": 1}},
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid", "hits": {"hits": []}}
+        export_load.run([("events.pageviews", REC_WITH_FILES)])
+
+    # no bookmarks are written
+    export_load.dest_os_client.index.assert_not_called()
+    assert list((tmp_path / "snapshot").iterdir())
+
+
+# ---------------------------------------------------------------------------
+# Pre-aggregations
+# ---------------------------------------------------------------------------
+
+
+def test_stats_aggregator_daily_documents():
+    aggregator = StatsAggregator("cds-rdm-stats")
+    base = {
+        "recid": "hk1ez-6ar45",
+        "parent_recid": "0m8n6-qnx43",
+        "unique_id": "ui_hk1ez-6ar45",
+        "file_id": "f1",
+        "file_key": "a.pdf",
+        "bucket_id": "b1",
+        "size": "100",
+    }
+    events = [
+        {**base, "timestamp": "2023-12-28T10:00:00", "unique_session_id": "s1"},
+        {**base, "timestamp": "2023-12-28T12:00:00", "unique_session_id": "s1"},
+        {
+            **base,
+            "timestamp": "2023-12-28T11:00:00",
+            "unique_session_id": "s2",
+            "file_key": "b.pdf",
+        },
+        {**base, "timestamp": "2024-01-02T09:00:00", "unique_session_id": "s3"},
+    ]
+    new_docs = [{"_source": event} for event in events]
+    assert list(aggregator.observe("file-download", new_docs)) == new_docs
+
+    actions = {action["_id"]: action for action in aggregator.flush()}
+    assert set(actions) == {"ui_hk1ez-6ar45-2023-12-28", "ui_hk1ez-6ar45-2024-01-02"}
+    action = actions["ui_hk1ez-6ar45-2023-12-28"]
+    assert action["_index"] == "cds-rdm-stats-file-download-2023"
+    assert action["_op_type"] == "index"
+    source = action["_source"]
+    assert source["timestamp"] == "2023-12-28T00:00:00"
+    assert source["count"] == 3
+    assert source["unique_count"] == 2
+    assert source["volume"] == 300.0
+    # fields are copied from the latest event of the day
+    assert source["file_key"] == "a.pdf"
+    assert aggregator.flush() == []
+    # only the aggregations of the events observed are bookmarked
+    assert aggregator.bookmarks(LESS_THAN_DATE) == [
+        {"date": LESS_THAN_DATE, "aggregation_type": "file-download-agg"}
+    ]
+    assert StatsAggregator("cds-rdm-stats").bookmarks(LESS_THAN_DATE) == []
+
+
+def test_load_indexes_aggregations_per_record(tmp_path):
+    load = _make_load()
+    load.aggregator = StatsAggregator("cds-rdm-stats")
+    load.dry_run_filepath = str(tmp_path / "dry_run_events.ndjson")
+    data = _make_os_response(
+        [{k: v for k, v in PAGEVIEW_EVENT.items() if k != "event_type"}] * 2,
+        "events.pageviews",
+    )
+
+    with patch("cds_migrator_kit.rdm.stats.load.os_search") as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll:
+        mock_search.return_value = {
+            "_scroll_id": "sid",
+            "hits": {**data["hits"], "total": {"value": 2}},
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid", "hits": {"hits": []}}
+        load.run([("events.pageviews", REC_WITH_FILES)])
+
+    docs = [
+        json.loads(line)
+        for line in (tmp_path / "dry_run_events.ndjson").read_text().splitlines()
+    ]
+    assert [doc["_index"] for doc in docs] == [
+        "events-stats-record-view-2023",
+        "events-stats-record-view-2023",
+        "cds-rdm-stats-record-view-2023",
+    ]
+    assert docs[-1]["_source"]["count"] == 2
+    assert docs[-1]["_source"]["unique_count"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+
+def test_stats_checkpoint_roundtrip(tmp_path):
+    filepath = tmp_path / "checkpoints.jsonl"
+    checkpoint = StatsCheckpoint(str(filepath))
+    checkpoint.update(1156138, "events.pageviews", 1700000000000)
+    checkpoint.complete("1156138", "events.downloads")
+    checkpoint.update("1156137", "events.pageviews", 1600000000000)
+    checkpoint.complete("1156137", "events.pageviews")
+    # line of an interrupted run
+    with open(filepath, "a") as checkpoint_file:
+        checkpoint_file.write('{"recid": "1156')
+
+    checkpoint = StatsCheckpoint(str(filepath))
+    assert checkpoint.position("1156138", "events.pageviews") == 1700000000000
+    assert not checkpoint.is_done("1156138", "events.pageviews")
+    assert checkpoint.is_done("1156138", "events.downloads")
+    assert checkpoint.is_done(1156137, "events.pageviews")
+    assert checkpoint.position("1156137", "events.pageviews") is None
+    assert checkpoint.position("1", "events.pageviews") is None
+
+
+def test_load_skips_migrated_and_resumes_partial_records(tmp_path):
+    filepath = tmp_path / "checkpoints.jsonl"
+    recid = REC_WITH_FILES["legacy_recid"]
+    checkpoint = StatsCheckpoint(str(filepath))
+    checkpoint.complete(recid, "events.downloads")
+    checkpoint.update(recid, "events.pageviews", 1600000000000)
+
+    load = _make_load(dry_run=False)
+    load.checkpoint = StatsCheckpoint(str(filepath))
+    load.checkpoint_every = 1
+    load.indexer = MagicMock()
+    load.indexer.failed = 0
+    pageview = {k: v for k, v in PAGEVIEW_EVENT.items() if k != "event_type"}
+    data = _make_os_response([pageview], "events.pageviews")
+
+    with patch("cds_migrator_kit.rdm.stats.load.os_search") as mock_search, patch(
+        "cds_migrator_kit.rdm.stats.load.os_scroll"
+    ) as mock_scroll, patch.object(load, "validate_stats"):
+        mock_search.return_value = {
+            "_scroll_id": "sid",
+            "hits": {**data["hits"], "total": {"value": 1}},
+        }
+        mock_scroll.return_value = {"_scroll_id": "sid", "hits": {"hits": []}}
+        load.run(
+            [
+                ("events.downloads", REC_WITH_FILES),
+                ("events.pageviews", REC_WITH_FILES),
+            ]
+        )
+
+    # the downloads are not scanned again, the page views from the checkpoint
+    mock_search.assert_called_once()
+    assert mock_search.call_args.args[2] == "events.pageviews"
+    assert mock_search.call_args.kwargs["after"] == 1600000000000
+    assert mock_search.call_args.kwargs["sort"] == [{"timestamp": "asc"}]
+    assert load.indexer.index.called
+    assert load.indexer.flush.called
+
+    checkpoint = StatsCheckpoint(str(filepath))
+    assert checkpoint.is_done(recid, "events.pageviews")
+    assert checkpoint.is_done(recid, "events.downloads")
+
+
+# ---------------------------------------------------------------------------
+# Extract
+# ---------------------------------------------------------------------------
+
+
+def _write_record_states(filepath, states):
+    """Write the record states as ``RecordStateLogger.finalise`` does."""
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, state in enumerate(states):
+            comma = "," if i < len(states) - 1 else ""
+            f.write(f"{json.dumps(state, separators=(',', ':'))}{comma}\n")
+        f.write("]")
+
+
+def test_read_record_states_line_by_line(tmp_path):
+    filepath = tmp_path / "rdm_records_state.json"
+    states = [REC_WITH_FILES, REC_NO_FILES]
+    _write_record_states(filepath, states)
+    assert list(read_record_states(filepath)) == states
+
+    _write_record_states(filepath, [])
+    assert list(read_record_states(filepath)) == []
+
+    # indented state file
+    filepath.write_text(json.dumps(states, indent=2))
+    assert list(read_record_states(filepath)) == states
+
+    # one-line state file
+    filepath.write_text(json.dumps(states))
+    assert list(read_record_states(filepath)) == states
+
+
+def test_extract_filters_recids(tmp_path):
+    filepath = tmp_path / "rdm_records_state.json"
+    states = [
+        {**REC_WITH_FILES, "legacy_recid": str(recid)} for recid in (10, 20, 30, 40)
+    ]
+    _write_record_states(filepath, states)
+
+    def extracted_recids(**kwargs):
+        return [
+            record["legacy_recid"]
+            for event_type, record in LegacyRecordStatsExtract(filepath, **kwargs).run()
+            if event_type == "events.pageviews"
+        ]
+
+    assert extracted_recids() == ["10", "20", "30", "40"]
+    assert extracted_recids(from_recid=20, to_recid=30) == ["20", "30"]
+    assert extracted_recids(from_recid=25) == ["30", "40"]
+    assert extracted_recids(recids=[40, "10", 50]) == ["10", "40"]
+    assert extracted_recids(recids=["10", "30"], to_recid=20) == ["10"]
+    assert extracted_recids(recids=[]) == []
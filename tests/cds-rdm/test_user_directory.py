@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the user directory of the migration run."""
+
+from contextlib import contextmanager
+
+from invenio_accounts.models import UserIdentity
+from invenio_accounts.testutils import create_test_user
+from sqlalchemy import event
+
+from cds_migrator_kit.users.directory import UserDirectory
+
+
+@contextmanager
+def count_queries(db):
+    """Count the SQL statements executed."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_user_directory(app, db):
+    """The accounts are loaded once and looked up without queries."""
+    jose = create_test_user(
+        email="jose.munoz@cern.ch",
+        user_profile={"family_name": "Muñoz", "given_name": "José"},
+    )
+    jane = create_test_user(
+        email="jane.doe@cern.ch",
+        user_profile={"family_name": "Doe", "given_name": "Jane"},
+    )
+    db.session.add(UserIdentity(id="11112", method="cern", id_user=jose.id))
+    db.session.commit()
+
+    directory = UserDirectory()
+    directory.load()
+    with count_queries(db) as statements:
+        assert directory.get_id_by_email("jose.munoz@cern.ch") == jose.id
+        assert directory.get_id_by_person_id("11112") == jose.id
+        assert directory.get_ids_by_name("MUNOZ", "jose") == [jose.id]
+        assert directory.get_ids_by_name("Doe") == [jane.id]
+    assert statements == []
+
+    # accounts created since are read through
+    john = create_test_user(
+        email="john.doe@cern.ch",
+        user_profile={"family_name": "Doe", "given_name": "John"},
+    )
+    db.session.commit()
+    assert directory.get_id_by_email("john.doe@cern.ch") == john.id
+    assert directory.get_ids_by_name("Doe", "John") == [john.id]
+    assert directory.get_ids_by_name("Doe") == sorted([jane.id, john.id])
+    assert directory.get_id_by_email("nobody@cern.ch") is None
+    assert directory.get_ids_by_email(["jane.doe@cern.ch", "nobody@cern.ch", None]) == {
+        "jane.doe@cern.ch": jane.id
+    }
+    assert directory.get_ids_by_name("Nobody") == []
+
+    # accented names created since are read through, accents compared once
+    maria = create_test_user(
+        email="maria.nunez@cern.ch",
+        user_profile={"family_name": "Núñez", "given_name": "María"},
+    )
+    db.session.commit()
+    assert directory.get_ids_by_name("Núñez", "Maria") == [maria.id]
+    assert directory.get_ids_by_name("NUNEZ", "maría") == [maria.id]
+
+    # the accounts missing from the directory are read through at once
+    anna = create_test_user(email="anna.smith@cern.ch")
+    paul = create_test_user(email="paul.smith@cern.ch")
+    db.session.commit()
+    with count_queries(db) as statements:
+        assert directory.get_ids_by_email(
+            ["anna.smith@cern.ch", "paul.smith@cern.ch", "jose.munoz@cern.ch"]
+        ) == {
+            "anna.smith@cern.ch": anna.id,
+            "paul.smith@cern.ch": paul.id,
+            "jose.munoz@cern.ch": jose.id,
+        }
+    assert len(statements) == 1
+
+    # updated accounts are invalidated
+    john.user_profile = {"family_name": "Smith", "given_name": "John"}
+    db.session.add(UserIdentity(id="11113", method="cern", id_user=john.id))
+    db.session.commit()
+    directory.invalidate(john)
+    with count_queries(db) as statements:
+        assert directory.get_ids_by_name("Smith", "John") == [john.id]
+        assert directory.get_ids_by_name("Doe") == [jane.id]
+        assert directory.get_id_by_person_id("11113") == john.id
+    assert statements == []
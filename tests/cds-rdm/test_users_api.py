@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the batch creation of the migrated users."""
+
+from invenio_accounts.models import User, UserIdentity
+from invenio_accounts.testutils import create_test_user
+from invenio_oauthclient.models import RemoteAccount
+
+from cds_migrator_kit.rdm.users.api import CDSMigrationUserAPI
+
+
+def _user(email, username, person_id=None, name=None, **kwargs):
+    return {
+        "email": email,
+        "name": name,
+        "username": username,
+        "person_id": person_id,
+        "extra_data": {"migration": {"note": "MIGRATED INACTIVE ACCOUNT"}},
+        **kwargs,
+    }
+
+
+def test_create_users(app, db):
+    """The users are created at once, the usernames taken are renamed."""
+    create_test_user(email="existing@cern.ch", username="jdoe")
+    db.session.commit()
+
+    created, errors = CDSMigrationUserAPI().create_users(
+        [
+            _user("john.doe@cern.ch", "jdoe", person_id="1111", name="Doe John"),
+            _user("jane.doe@cern.ch", "janedoe", profile={"family_name": "Doe"}),
+            _user("jane.doe2@cern.ch", "janedoe"),
+            _user("invalid@cern.ch", "1-invalid"),
+        ]
+    )
+
+    assert list(errors) == ["invalid@cern.ch"]
+    assert sorted(created) == [
+        "jane.doe2@cern.ch",
+        "jane.doe@cern.ch",
+        "john.doe@cern.ch",
+    ]
+    john = User.query.filter_by(email="john.doe@cern.ch").one()
+    assert john.username == "duplicated_jdoe_johndoeatcernch"
+    assert john.active is False
+    assert john.user_profile["full_name"] == "Doe John"
+    assert john.user_profile["person_id"] == "1111"
+    assert UserIdentity.query.filter_by(id="1111").one().id_user == john.id
+    assert RemoteAccount.query.filter_by(user_id=john.id).one().extra_data == {
+        "migration": {"note": "MIGRATED INACTIVE ACCOUNT"}
+    }
+
+    jane = created["jane.doe@cern.ch"]
+    assert jane.username == "janedoe"
+    assert jane.user_profile["full_name"] == "Jane Doe"
+    assert jane.user_profile["family_name"] == "Doe"
+    assert (
+        created["jane.doe2@cern.ch"].username == "duplicated_janedoe_janedoe2atcernch"
+    )
+
+
+def test_create_users_errors(app, db):
+    """A failing batch is created user by user, to report the errors."""
+    created, errors = CDSMigrationUserAPI().create_users(
+        [
+            _user("first@cern.ch", "first", person_id="2222"),
+            _user("second@cern.ch", "second", person_id="2222"),
+            _user("third@cern.ch", "third"),
+        ]
+    )
+
+    assert sorted(created) == ["first@cern.ch", "third@cern.ch"]
+    assert list(errors) == ["second@cern.ch"]
+    assert User.query.filter_by(email="second@cern.ch").one_or_none() is None
+    assert UserIdentity.query.filter_by(id="2222").one().id_user == (
+        created["first@cern.ch"].id
+    )
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2026 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the missing users lookups of the submitters load."""
+
+import json
+from unittest.mock import Mock, patch
+
+from cds_migrator_kit.users.directory import normalize_person_name
+from cds_migrator_kit.users.load import CDSSubmitterLoad
+
+PEOPLE = """email,person_id,surname,given_names,department
+john.doe@cern.ch,1111,Doe,John
+jose.munoz@cern.ch,1112,Muñoz,José Luis,IT
+jane.doe@cern.ch,1113,Doe,Jane
+"""
+
+LEGACY_PEOPLE = [
+    {"active": None, "displayname": "Legacy User", "id": 1, "email": "legacy@cern.ch"}
+]
+
+
+def _load(tmp_path):
+    (tmp_path / "people.csv").write_text(PEOPLE, encoding="utf-8")
+    (tmp_path / "missing_users.json").write_text(json.dumps(LEGACY_PEOPLE))
+    return CDSSubmitterLoad(missing_users_dir=str(tmp_path))
+
+
+def test_normalize_person_name():
+    """Names are matched regardless of accents, case and spaces."""
+    assert normalize_person_name("  José   LUIS ") == "jose luis"
+    assert normalize_person_name("Muñoz") == normalize_person_name("munoz")
+    assert normalize_person_name(None) == ""
+
+
+def test_missing_users_indexes(tmp_path):
+    """The missing users files are read once and looked up by email and name."""
+    load = _load(tmp_path)
+    with patch("builtins.open", wraps=open) as open_:
+        assert load._find_person_email_by_name("Doe", "John") == "john.doe@cern.ch"
+        assert (
+            load._find_person_email_by_name("MUNOZ", "Jose Luis")
+            == "jose.munoz@cern.ch"
+        )
+        # family name only, the first person of the family
+        assert load._find_person_email_by_name("doe", "") == "john.doe@cern.ch"
+        assert load._find_person_email_by_name("Doe", "Someone") is None
+        assert load._find_person_email_by_name("Nobody", "") is None
+    assert open_.call_count == 2
+
+    assert load._people_by_email["jose.munoz@cern.ch"][4] == "IT"
+    assert load._legacy_people_by_email["legacy@cern.ch"]["id"] == 1
+    assert "unknown@cern.ch" not in load._people_by_email
+
+
+def test_missing_users_indexed_on_run(tmp_path):
+    """The files are indexed when the load starts, not on each user."""
+    load = _load(tmp_path)
+    with patch.object(load, "_load") as load_entry:
+        load.run([{"submitter": "john.doe@cern.ch"}, {"submitter": None}])
+    assert load_entry.call_count == 2
+    assert load._people_by_email["john.doe@cern.ch"][1] == "1111"
+
+
+def test_missing_users_created_by_batches(app, tmp_path):
+    """The missing users are created by batches, once each."""
+    load = _load(tmp_path)
+    load.batch_size = 2
+    load.user_api_cls = user_api_cls = Mock()
+    user_api = user_api_cls.return_value
+    user_api.check_person_id_exists.return_value = None
+    users = {}
+
+    def create_users(batch):
+        created = {user["email"]: Mock(id=len(users) + 1) for user in batch}
+        users.update(created)
+        return created, {}
+
+    user_api.create_users.side_effect = create_users
+
+    with patch("cds_migrator_kit.users.load.user_directory") as directory:
+        directory.get_id_by_email.side_effect = (
+            lambda email: users[email].id if email in users else None
+        )
+        directory.get_ids_by_name.return_value = []
+        load.run(
+            [
+                {"submitter": "john.doe@cern.ch", "reviewers": ["Muñoz, José Luis"]},
+                {"submitter": "john.doe@cern.ch", "reviewers": []},
+                {"submitter": "legacy@cern.ch", "reviewers": ["Smith, Anna"]},
+            ]
+        )
+
+    batches = [call.args[0] for call in user_api.create_users.call_args_list]
+    assert [[user["email"] for user in batch] for batch in batches] == [
+        ["john.doe@cern.ch", "jose.munoz@cern.ch"],
+        ["legacy@cern.ch", "anna.smith@cern.ch"],
+    ]
+    john, jose = batches[0]
+    assert john["person_id"] == "1111"
+    assert john["name"] == "Doe John"
+    assert jose["profile"] == {"family_name": "Muñoz", "given_name": "José Luis"}
+    assert batches[1][0]["name"] == "Legacy User"
+    assert directory.invalidate.call_count == 2